@@ -2,6 +2,8 @@
 ASGI config for NextStar project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests go to Django; websocket connections (the real-time maze
+channel) are dispatched by ``gameEngine.routing``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -13,4 +15,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'NextStar.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Import after Django is set up so models are ready
+from gameEngine.routing import websocket_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -123,6 +123,26 @@ if not DEBUG:
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Maze engine settings
+MAZE_LAYOUT_CACHE_SIZE = 256  # Layouts kept in each worker's LRU cache
+MAZE_CHUNK_CACHE_SIZE = 4096  # Infinite-mode chunks kept in each worker's LRU cache (~16x16 cells each)
+# Hot session store (gameEngine.maze.store). Off by default: every HTTP move is then
+# one UPDATE of the fields it changed. Turning it on keeps active sessions in memory
+# and batches their writes every MAZE_SESSION_FLUSH_INTERVAL seconds, which cuts
+# write volume in a running venture by orders of magnitude, but the copies are per
+# process. Only enable it when every maze request and websocket for a venture is
+# served by one worker process (e.g. a single ASGI worker behind the load balancer),
+# otherwise workers overwrite each other's moves.
+MAZE_SESSION_HOT_STORE = False
+MAZE_SESSION_FLUSH_INTERVAL = 2.0  # Seconds between write-behind flushes, and between websocket checkpoints when the hot store is off (0 = every move)
+MAZE_SESSION_FLUSH_BATCH_SIZE = 500
+MAZE_CHANNEL_LEASE = 30  # Seconds a websocket keeps its session lease without renewing it; HTTP moves are refused meanwhile
+MAZE_HEATMAP_FLUSH_INTERVAL = 30  # Seconds between merges of in-memory cell heatmaps into the database
+MAZE_LEADERBOARD_TTL = 30  # Seconds before a worker reloads a venture leaderboard from the database
+MAZE_MINIMAP_CACHE_DIR = BASE_DIR / 'cache' / 'minimaps'  # Rendered minimap PNGs, keyed by layout hash (None disables)
+MAZE_SPECTATOR_TICK = 1.0  # Seconds between spectator snapshots of a running venture
+
+
 # Authentication settings
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/game/'
@@ -0,0 +1,323 @@
+import asyncio
+import json
+import logging
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, load_backend
+from django.db import models
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.module_loading import import_string
+from http.cookies import SimpleCookie
+
+from .maze.grid import DIRECTIONS
+from .maze.spectator import Viewer, spectators
+from .maze.store import session_store
+from .models import MazeSession, Venture
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_INTERVAL = getattr(settings, 'MAZE_SESSION_FLUSH_INTERVAL', 2.0)
+CHANNEL_LEASE = max(getattr(settings, 'MAZE_CHANNEL_LEASE', 30), 3 * CHECKPOINT_INTERVAL)
+
+
+def _get_scope_user_id(scope):
+    """Resolve the logged-in user id from the Django session cookie in an ASGI scope"""
+    headers = dict(scope.get('headers', []))
+    cookie = SimpleCookie(headers.get(b'cookie', b'').decode('latin-1'))
+    morsel = cookie.get(settings.SESSION_COOKIE_NAME)
+    if morsel is None:
+        return None
+
+    engine = import_string(f'{settings.SESSION_ENGINE}.SessionStore')
+    session = engine(morsel.value)
+    user_id = session.get(SESSION_KEY)
+    backend_path = session.get(BACKEND_SESSION_KEY)
+    if user_id is None or backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return None
+
+    # Same session hash check as django.contrib.auth.get_user
+    user = load_backend(backend_path).get_user(user_id)
+    if user is None or not constant_time_compare(
+        session.get(HASH_SESSION_KEY, ''), user.get_session_auth_hash()
+    ):
+        return None
+    return user.pk
+
+
+def _load_session(session_id, user_id):
+    """
+    The session a socket plays on. With the hot store on, that is the shared
+    hot copy, so HTTP and socket moves in this single process see one state.
+    Otherwise the socket takes a lease on the row and holds a private copy
+    for the connection; None if someone else's session, over, or already
+    leased to another socket.
+    """
+    def loader():
+        return MazeSession.objects.select_related('venture', 'player__user').filter(id=session_id).first()
+
+    if session_store.enabled:
+        session = session_store.get(uuid.UUID(session_id), loader)
+    else:
+        now = timezone.now()
+        leased = MazeSession.objects.filter(
+            models.Q(channel_lease__isnull=True) | models.Q(channel_lease__lte=now),
+            id=session_id,
+            player__user_id=user_id,
+            status='active'
+        ).update(channel_lease=now + timezone.timedelta(seconds=CHANNEL_LEASE))
+        session = loader() if leased else None
+    if session is None or session.status != 'active' or session.player.user_id != user_id:
+        return None
+    return session
+
+
+def _checkpoint(session, dirty, release=False):
+    """
+    Write a leased session's ``dirty`` fields and renew (or release) the lease.
+    Only an active row is written, so a session the expiry sweeper timed out
+    keeps its final state; returns False in that case.
+    """
+    with session_store.lock(session.pk):
+        fields = set(dirty)
+        dirty.clear()
+        if 'move_log' in fields:
+            session.pack_move_log()
+        values = {field: getattr(session, field) for field in fields}
+    lease = None if release else timezone.now() + timezone.timedelta(seconds=CHANNEL_LEASE)
+    try:
+        written = MazeSession.objects.filter(pk=session.pk, status='active').update(channel_lease=lease, **values)
+    except Exception:
+        dirty.update(fields)  # Retried by the next checkpoint
+        raise
+    if not written:
+        session.refresh_from_db(fields=['status', 'completed_at', 'time_elapsed'])
+    return bool(written)
+
+
+def _can_spectate(venture_id, user_id):
+    from django.contrib.auth.models import User
+
+    venture = Venture.objects.filter(pk=venture_id).first()
+    user = User.objects.filter(pk=user_id).first()
+    return venture is not None and user is not None and venture.can_spectate(user)
+
+
+def _apply_move(session, direction, seq, dirty=None):
+    """
+    Apply a move under the session lock; returns (changed, pattern_found, completed).
+    Leased sessions collect their changed fields in ``dirty`` for the next
+    checkpoint instead of handing them to the session store.
+    """
+    with session_store.lock(session.pk):
+        patterns_before = session.patterns_found
+        changed = session.apply_move(direction)
+        if not changed:
+            return changed, False, False
+
+        if isinstance(seq, int) and seq > session.last_move_seq:
+            session.last_move_seq = seq
+            changed.append('last_move_seq')
+
+        if session.check_completion():
+            # Completions are written synchronously, not via the flusher
+            session.channel_lease = None
+            session.complete_session(success=True)
+            session_store.discard(session.pk)
+            return changed, session.patterns_found > patterns_before, True
+
+        if dirty is not None:
+            dirty.update(changed)
+        else:
+            session_store.mark_dirty(session, changed)
+        return changed, session.patterns_found > patterns_before, False
+
+
+class MazeSessionSocket:
+    """
+    WebSocket channel for a single maze session.
+
+    Moves are validated against the cached layout and answered from memory.
+    With MAZE_SESSION_HOT_STORE on, the socket plays on the shared hot copy
+    and the store's flusher persists it. Otherwise the socket leases the
+    row for the connection: its copy is authoritative, HTTP moves are
+    refused while the lease is held, and the socket itself checkpoints the
+    changed fields every MAZE_SESSION_FLUSH_INTERVAL seconds, renewing the
+    lease as it goes. Completion is written synchronously and disconnect
+    writes a final checkpoint and releases the lease. A lease left behind
+    by a crashed worker lapses after MAZE_CHANNEL_LEASE seconds.
+    """
+
+    def __init__(self, scope, receive, send, session_id):
+        self.scope = scope
+        self.receive = receive
+        self.send = send
+        self.session_id = session_id
+        self.session = None
+        self.leased = not session_store.enabled
+        self.dirty = set()
+
+    async def __call__(self):
+        message = await self.receive()
+        if message['type'] != 'websocket.connect':
+            return
+
+        user_id = await sync_to_async(_get_scope_user_id)(self.scope)
+        if user_id is not None:
+            self.session = await sync_to_async(_load_session)(self.session_id, user_id)
+        if self.session is None:
+            await self.send({'type': 'websocket.close', 'code': 4403})
+            return
+
+        await self.send({'type': 'websocket.accept'})
+        await self.send_event('state', **self.state())
+
+        checkpoints = asyncio.ensure_future(self.checkpoint_periodically()) if self.leased else None
+        try:
+            while True:
+                message = await self.receive()
+                if message['type'] == 'websocket.disconnect':
+                    break
+                if message['type'] == 'websocket.receive':
+                    if not await self.handle_frame(message.get('text') or ''):
+                        await self.send({'type': 'websocket.close', 'code': 1000})
+                        break
+        finally:
+            if checkpoints is not None:
+                checkpoints.cancel()
+            await self.checkpoint(release=True)
+
+    async def handle_frame(self, text):
+        """Process one client frame; returns False once the session is over"""
+        try:
+            frame = json.loads(text)
+        except json.JSONDecodeError:
+            await self.send_event('error', error='Invalid JSON frame')
+            return True
+
+        if frame.get('type') != 'move':
+            await self.send_event('error', error='Unknown frame type')
+            return True
+
+        seq = frame.get('seq')
+        direction = frame.get('direction')
+        if direction not in DIRECTIONS:
+            await self.send_event('rejected', seq=seq, reason='Invalid direction')
+            return True
+
+        session = self.session
+        dirty = self.dirty if self.leased else None
+        changed, pattern_found, completed = await sync_to_async(_apply_move)(session, direction, seq, dirty)
+        if not changed:
+            reason = 'Blocked by a wall' if session.is_active else 'Maze session is not active'
+            await self.send_event('rejected', seq=seq, reason=reason, position=session.current_position)
+            return session.is_active
+
+        if self.leased and CHECKPOINT_INTERVAL <= 0 and not completed:
+            await self.checkpoint()
+
+        await self.send_event('position', seq=seq, **self.state())
+        if pattern_found:
+            await self.send_event(
+                'pattern',
+                pattern=session.layout.pattern_at(session.current_position['x'], session.current_position['y']),
+                patternsFound=session.patterns_found
+            )
+
+        if completed:
+            await self.send_event('completed', **self.state())
+            return False
+        return True
+
+    async def checkpoint_periodically(self):
+        # With a zero interval every move is checkpointed; the loop only renews the lease
+        interval = CHECKPOINT_INTERVAL if CHECKPOINT_INTERVAL > 0 else CHANNEL_LEASE / 3
+        while True:
+            await asyncio.sleep(interval)
+            if not await self.checkpoint():
+                # Timed out underneath us; tell the client and stop taking moves
+                await self.send_event('state', **self.state())
+                await self.send({'type': 'websocket.close', 'code': 1000})
+                return
+
+    async def checkpoint(self, release=False):
+        """
+        Persist moves not written yet; returns False once the session is no
+        longer active in the database
+        """
+        if self.session is None or self.session.status != 'active':
+            return False
+        try:
+            if self.leased:
+                return await sync_to_async(_checkpoint)(self.session, self.dirty, release)
+            await sync_to_async(session_store.flush_session)(self.session)
+        except Exception as e:
+            logger.error(f"Maze checkpoint failed for {self.session.pk}: {e}")
+        return True
+
+    def state(self):
+        session = self.session
+        return {
+            'position': session.current_position,
+            'movesMade': session.moves_made,
+            'patternsFound': session.patterns_found,
+            'timeRemaining': session.time_remaining,
+            'status': session.status,
+        }
+
+    async def send_event(self, event, **payload):
+        await self.send({
+            'type': 'websocket.send',
+            'text': json.dumps({'event': event, **payload}),
+        })
+
+
+class SpectatorSocket:
+    """
+    WebSocket spectator feed for a running venture. Every frame is the
+    shared tick snapshot from ``maze.spectator``; the socket closes after
+    the snapshot that reports the race as over.
+    """
+
+    def __init__(self, scope, receive, send, venture_id):
+        self.scope = scope
+        self.receive = receive
+        self.send = send
+        self.venture_id = int(venture_id)
+
+    async def __call__(self):
+        message = await self.receive()
+        if message['type'] != 'websocket.connect':
+            return
+
+        user_id = await sync_to_async(_get_scope_user_id)(self.scope)
+        if user_id is None or not await sync_to_async(_can_spectate)(self.venture_id, user_id):
+            await self.send({'type': 'websocket.close', 'code': 4403})
+            return
+
+        await self.send({'type': 'websocket.accept'})
+        viewer = Viewer(asyncio.get_running_loop())
+        spectators.subscribe(self.venture_id, viewer)
+        disconnected = asyncio.ensure_future(self.wait_for_disconnect())
+        try:
+            while True:
+                snapshot = asyncio.ensure_future(viewer.next())
+                await asyncio.wait({snapshot, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected.done():
+                    snapshot.cancel()
+                    break
+                snapshot = snapshot.result()
+                await self.send({'type': 'websocket.send', 'text': snapshot.payload})
+                if snapshot.final:
+                    await self.send({'type': 'websocket.close', 'code': 1000})
+                    break
+        finally:
+            spectators.unsubscribe(self.venture_id, viewer)
+            disconnected.cancel()
+
+    async def wait_for_disconnect(self):
+        """Spectators only listen; drain client frames until the socket goes away"""
+        while (await self.receive())['type'] != 'websocket.disconnect':
+            pass
@@ -0,0 +1,53 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from gameEngine.maze.generators import ALGORITHMS, generate_grid, place_patterns, reachable_cells
+
+
+class Command(BaseCommand):
+    help = 'Benchmark maze generation time per algorithm and grid size'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[10 + complexity * 2 for complexity in range(1, 11)],
+            help='Grid sizes to benchmark (default: every venture complexity, 12-30)'
+        )
+        parser.add_argument('--runs', type=int, default=50, help='Mazes generated per size and algorithm')
+        parser.add_argument(
+            '--algorithms',
+            nargs='+',
+            choices=list(ALGORITHMS),
+            default=list(ALGORITHMS),
+        )
+        parser.add_argument('--patterns', type=int, default=5, help='Patterns placed per maze')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        self.stdout.write(f"{'algorithm':<12} {'size':>5} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}")
+
+        for algorithm in options['algorithms']:
+            for size in options['sizes']:
+                timings = []
+                for _ in range(options['runs']):
+                    started = time.perf_counter()
+                    grid = generate_grid(size, algorithm, rng)
+                    place_patterns(grid, options['patterns'], rng)
+                    timings.append((time.perf_counter() - started) * 1000)
+
+                    if (size - 1, size - 1) not in reachable_cells(grid, (0, 0)):
+                        self.stderr.write(self.style.ERROR(f'Unsolvable {algorithm} maze at size {size}'))
+
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(
+                    f'{algorithm:<12} {size:>5} {statistics.mean(timings):>9.3f} {p95:>9.3f} {timings[-1]:>9.3f}'
+                )
+
+        self.stdout.write(self.style.SUCCESS('✅ Maze generation benchmark complete'))
@@ -0,0 +1,346 @@
+import json
+import statistics
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.cookiejar import CookieJar
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from gameEngine.maze.generators import ALGORITHMS
+from gameEngine.maze.store import session_store
+from gameEngine.models import MazeSession, create_demo_venture_game
+
+BOT_PASSWORD = 'maze-bench-password'
+
+
+def plan_route(layout):
+    """Moves that visit every pattern (nearest first) and then the exit"""
+    targets = {(p['location']['x'], p['location']['y']) for p in layout.patterns}
+    route, position = [], layout.start
+    while targets:
+        previous = _bfs(layout.grid, position)
+        reachable = [cell for cell in previous if cell in targets]  # BFS order, nearest first
+        if not reachable:
+            break
+        position = reachable[0]
+        targets.discard(position)
+        route += _path(previous, position)
+    previous = _bfs(layout.grid, position)
+    if layout.end in previous:
+        route += _path(previous, layout.end)
+    return route
+
+
+def _bfs(grid, start):
+    """Map of reachable cell -> (previous cell, direction), in BFS order"""
+    previous = {start: None}
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        for direction, x, y in grid.neighbors(*cell):
+            if (x, y) not in previous:
+                previous[(x, y)] = (cell, direction)
+                queue.append((x, y))
+    return previous
+
+
+def _path(previous, target):
+    path = []
+    while previous[target] is not None:
+        target, direction = previous[target]
+        path.append(direction)
+    return path[::-1]
+
+
+@contextmanager
+def default_database(alias):
+    """
+    Point the default connection at ``alias`` for the duration of a run, so
+    the fixtures and everything the views do (queries, transactions, row
+    locks, auth sessions) go to that database. Bot threads open their own
+    connections from the swapped settings.
+    """
+    if alias == DEFAULT_DB_ALIAS:
+        yield
+        return
+    original = connections.settings[DEFAULT_DB_ALIAS]
+    connections[DEFAULT_DB_ALIAS].close()
+    del connections[DEFAULT_DB_ALIAS]
+    connections.settings[DEFAULT_DB_ALIAS] = connections.settings[alias]
+    try:
+        yield
+    finally:
+        connections[DEFAULT_DB_ALIAS].close()
+        del connections[DEFAULT_DB_ALIAS]
+        connections.settings[DEFAULT_DB_ALIAS] = original
+
+
+class TestClientBot:
+    """Drives the views in-process through Django's test client"""
+
+    counts_queries = True
+
+    def __init__(self, user):
+        self.client = Client(HTTP_HOST='localhost')
+        self.client.force_login(user)
+
+    def post(self, path, payload):
+        response = self.client.post(path, json.dumps(payload), content_type='application/json')
+        return response.status_code, response.json()
+
+
+class LiveServerBot:
+    """Drives a running server (e.g. uvicorn NextStar.asgi:application) over HTTP"""
+
+    counts_queries = False
+
+    def __init__(self, user, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = build_opener(HTTPCookieProcessor(CookieJar()))
+        status, data = self.post('/api/auth/login/', {'username': user.username, 'password': BOT_PASSWORD})
+        if not data.get('success'):
+            raise RuntimeError(f'Login failed for {user.username}: {data}')
+
+    def post(self, path, payload):
+        request = Request(
+            self.base_url + path,
+            data=json.dumps(payload).encode(),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with self.opener.open(request) as response:
+            return response.status, json.loads(response.read())
+
+
+class Command(BaseCommand):
+    help = 'Benchmark maze move throughput with concurrent bot players driving the real views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--players', type=int, default=20, help='Bot players in the venture')
+        parser.add_argument('--concurrency', type=int, default=8, help='Bots moving at the same time')
+        parser.add_argument('--complexity', type=int, default=5, help='Venture maze complexity (1-10)')
+        parser.add_argument('--algorithm', choices=list(ALGORITHMS), default='backtracker')
+        parser.add_argument('--patterns', type=int, default=5, help='Patterns each bot must collect')
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=0,
+            help='Send moves in batches of this size to the batch endpoint (0 = one request per move)'
+        )
+        parser.add_argument(
+            '--url',
+            default=None,
+            help='Base URL of a live server to benchmark instead of the in-process test client'
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Configured (and migrated) database alias to run against; the views are pointed at it too'
+        )
+        parser.add_argument('--output', default=None, help='Write the results as JSON to this file')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark venture and players')
+
+    def handle(self, *args, **options):
+        if options['database'] not in connections:
+            raise CommandError(f"Unknown database alias '{options['database']}'")
+        if options['url'] and options['database'] != DEFAULT_DB_ALIAS:
+            raise CommandError('--database applies to the in-process test client; point the live server at it instead')
+
+        run_id = uuid.uuid4().hex[:8]
+        with default_database(options['database']):
+            database = f"{options['database']}: {connection.vendor} ({connection.settings_dict['NAME']})"
+            venture, users = self.create_fixtures(run_id, options)
+            try:
+                results = self.run(venture, users, options)
+            finally:
+                if not options['keep']:
+                    # Claimed calibrated layouts stay claimed; deleting the venture does not recycle them
+                    venture.delete()
+                    User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+        results.update({
+            'run_id': run_id,
+            'timestamp': timezone.now().isoformat(),
+            'database': database,
+            'mode': 'live' if options['url'] else 'test-client',
+            'players': options['players'],
+            'concurrency': options['concurrency'],
+            'complexity': options['complexity'],
+            'algorithm': options['algorithm'],
+            'batch': options['batch'],
+        })
+        self.report(results)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def create_fixtures(self, run_id, options):
+        self.stdout.write(f"Creating venture and {options['players']} bot players...")
+        venture = create_demo_venture_game(
+            name=f'Maze Benchmark {run_id}',
+            venture_type='Benchmark',
+            icon='🤖',
+            description='Throughput benchmark venture',
+            max_participants=options['players'],
+            maze_complexity=options['complexity'],
+            maze_algorithm=options['algorithm'],
+            required_patterns=options['patterns'],
+        )
+        if venture is None:
+            raise CommandError('Could not create the benchmark venture')
+
+        users = []
+        for i in range(options['players']):
+            user = User(username=f'mazebot_{run_id}_{i}')
+            if options['url']:
+                user.set_password(BOT_PASSWORD)
+            else:
+                user.set_unusable_password()
+            user.save()
+            # Enter through the real join path: tickets, counter and join records
+            venture.join(user.playerprofile)
+            users.append(user)
+        venture.start_venture()
+        return venture, users
+
+    def run(self, venture, users, options):
+        sessions = {
+            session.player.user_id: session
+            for session in MazeSession.objects.filter(venture=venture).select_related('player')
+        }
+        flushed_before = session_store.flushed_rows
+        latencies, errors = [], []
+        totals = {'moves': 0, 'requests': 0, 'queries': 0, 'completed': 0, 'rejected': 0}
+        lock = threading.Lock()
+
+        def bot(user):
+            try:
+                session = sessions[user.pk]
+                route = plan_route(session.layout)
+                if options['url']:
+                    client = LiveServerBot(user, options['url'])
+                else:
+                    client = TestClientBot(user)
+                timings, stats = self.play(client, session, route, options['batch'])
+                with lock:
+                    latencies.extend(timings)
+                    for key, value in stats.items():
+                        totals[key] += value
+            except Exception as e:
+                with lock:
+                    errors.append(f'{user.username}: {e}')
+            finally:
+                connection.close()
+
+        self.stdout.write(f"Running {len(users)} bots, {options['concurrency']} at a time...")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(bot, users))
+        elapsed = time.perf_counter() - started
+        session_store.flush()
+
+        moves = totals['moves']
+        return {
+            'elapsed_s': round(elapsed, 3),
+            'moves': moves,
+            'requests': totals['requests'],
+            'moves_per_sec': round(moves / elapsed, 1) if elapsed else 0.0,
+            'requests_per_sec': round(totals['requests'] / elapsed, 1) if elapsed else 0.0,
+            'latency_ms': self.percentiles(latencies),
+            'queries_per_move': (
+                round(totals['queries'] / moves, 3) if moves and not options['url'] else None
+            ),
+            # The hot store of a live server lives in that process, not this one
+            'flushed_rows': None if options['url'] else session_store.flushed_rows - flushed_before,
+            'completed': totals['completed'],
+            'rejected': totals['rejected'],
+            'errors': errors,
+        }
+
+    def play(self, client, session, route, batch):
+        """Walk the route; returns (per-request latencies in ms, counters)"""
+        stats = {'moves': 0, 'requests': 0, 'queries': 0, 'completed': 0, 'rejected': 0}
+        timings = []
+        base = f'/api/game/maze/{session.pk}'
+        if batch:
+            now_ms = int(time.time() * 1000)
+            chunks = [
+                ('/moves/', {'moves': [
+                    {'seq': seq + 1, 'ts': now_ms, 'direction': direction}
+                    for seq, direction in enumerate(route[i:i + batch], start=i)
+                ]}, len(route[i:i + batch]))
+                for i in range(0, len(route), batch)
+            ]
+        else:
+            chunks = [('/move/', {'direction': direction}, 1) for direction in route]
+
+        for path, payload, count in chunks:
+            if client.counts_queries:
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    status, data = client.post(base + path, payload)
+                    timings.append((time.perf_counter() - started) * 1000)
+                stats['queries'] += len(queries)
+            else:
+                started = time.perf_counter()
+                status, data = client.post(base + path, payload)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            stats['requests'] += 1
+            if not data.get('success'):
+                stats['rejected'] += 1
+                break
+            stats['moves'] += data.get('applied', count) if batch else 1
+            if data.get('completed'):
+                stats['completed'] += 1
+                break
+        return timings, stats
+
+    @staticmethod
+    def percentiles(samples):
+        if not samples:
+            return {}
+        if len(samples) == 1:
+            cuts = samples * 99
+        else:
+            cuts = statistics.quantiles(samples, n=100, method='inclusive')
+        return {
+            'mean': round(statistics.fmean(samples), 3),
+            'p50': round(cuts[49], 3),
+            'p95': round(cuts[94], 3),
+            'p99': round(cuts[98], 3),
+            'max': round(max(samples), 3),
+        }
+
+    def report(self, results):
+        latency = results['latency_ms']
+        self.stdout.write(f"{'database':<18} {results['database']}")
+        self.stdout.write(f"{'mode':<18} {results['mode']}")
+        self.stdout.write(f"{'moves':<18} {results['moves']} in {results['requests']} requests")
+        self.stdout.write(f"{'throughput':<18} {results['moves_per_sec']} moves/s")
+        if latency:
+            self.stdout.write(
+                f"{'latency ms':<18} p50 {latency['p50']}  p95 {latency['p95']}  "
+                f"p99 {latency['p99']}  max {latency['max']}"
+            )
+        if results['queries_per_move'] is not None:
+            self.stdout.write(f"{'queries / move':<18} {results['queries_per_move']}")
+        if results['flushed_rows'] is not None:
+            self.stdout.write(f"{'flushed rows':<18} {results['flushed_rows']}")
+        self.stdout.write(f"{'completed':<18} {results['completed']}/{results['players']}")
+        for error in results['errors']:
+            self.stdout.write(self.style.ERROR(error))
+        if not results['errors'] and results['completed'] == results['players']:
+            self.stdout.write(self.style.SUCCESS('✅ Benchmark finished'))
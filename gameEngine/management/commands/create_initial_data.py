@@ -206,7 +206,6 @@ class Command(BaseCommand):
                 icon=template['icon'],
                 description=template['description'],
                 hcs_topic_id=f"0.0.{1000000 + i}",
-                token_id=f"0.0.{2000000 + i}",
                 nft_collection_id=f"0.0.{3000000 + i}",
                 total_equity=100.0,
                 ceo_equity=template['ceo_equity'],
@@ -359,20 +358,18 @@ class Command(BaseCommand):
             for participation in participants[:random.randint(2, 5)]:  # Limit to few players per venture
                 player = participation.player
                 
-                # Create maze session
+                # Create maze session; the first patterns_found patterns count as discovered
+                patterns_found = random.randint(0, venture.required_patterns)
                 session = MazeSession.objects.create(
                     player=player,
                     venture=venture,
                     status=random.choice(['active', 'completed', 'failed']),
                     current_position={'x': random.randint(0, 5), 'y': random.randint(0, 5)},
                     moves_made=random.randint(10, 200),
-                    patterns_found=random.randint(0, venture.required_patterns),
+                    patterns_found=patterns_found,
                     time_elapsed=random.randint(60, venture.maze_time_limit // 2),
                     maze_configuration=venture.generate_maze_configuration(),
-                    discovered_patterns=[
-                        {'pattern_id': i+1, 'type': f'pattern_{random.randint(1,5)}', 'discovered_at': timezone.now().isoformat()}
-                        for i in range(random.randint(0, 3))
-                    ],
+                    discovered_mask=(1 << patterns_found) - 1,
                     used_hints=random.randint(0, 3),
                     started_at=timezone.now() - timezone.timedelta(minutes=random.randint(5, 60)),
                     completed_at=timezone.now() if random.choice([True, False]) else None
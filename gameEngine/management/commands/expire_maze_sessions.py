@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from gameEngine.models import MazeSession
+
+
+class Command(BaseCommand):
+    help = 'Time out active maze sessions that are past their deadline'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Seconds between sweeps; 0 runs a single sweep and exits'
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            expired = MazeSession.expire_overdue()
+            if expired or not interval:
+                self.stdout.write(f'⏱️  {timezone.now():%H:%M:%S} expired {expired} maze sessions')
+            if not interval:
+                break
+            time.sleep(interval)
+            close_old_connections()
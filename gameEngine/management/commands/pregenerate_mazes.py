@@ -0,0 +1,131 @@
+import os
+import statistics
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from gameEngine.maze.difficulty import score_layout
+from gameEngine.maze.generators import ALGORITHMS
+from gameEngine.maze.layout import build_layout
+from gameEngine.models import CalibratedLayout
+
+
+def score_candidate(args):
+    """Build and score one candidate layout (runs in a worker process)"""
+    seed, complexity, algorithm, patterns = args
+    return (complexity, algorithm), seed, score_layout(build_layout(seed, complexity, algorithm, patterns))
+
+
+class Command(BaseCommand):
+    help = 'Pre-generate pools of maze layouts with calibrated difficulty for each complexity band'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--complexities', type=int, nargs='+', default=list(range(1, 11)))
+        parser.add_argument(
+            '--algorithms',
+            nargs='+',
+            choices=list(ALGORITHMS),
+            default=list(ALGORITHMS),
+        )
+        parser.add_argument('--patterns', type=int, default=5, help='Patterns per layout')
+        parser.add_argument('--pool-size', type=int, default=20, help='Unused layouts to keep per band')
+        parser.add_argument('--candidates', type=int, default=200, help='Candidates generated per band')
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.1,
+            help='Keep candidates within this fraction of the band target difficulty'
+        )
+        parser.add_argument(
+            '--target',
+            type=float,
+            default=None,
+            help='Target difficulty for every band (default: median of the band\'s stored layouts, else of this batch)'
+        )
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+
+    def handle(self, *args, **options):
+        patterns = options['patterns']
+        bands = {}
+        for complexity in options['complexities']:
+            for algorithm in options['algorithms']:
+                missing = options['pool_size'] - CalibratedLayout.available(complexity, algorithm, patterns)
+                if missing > 0:
+                    bands[(complexity, algorithm)] = missing
+
+        if not bands:
+            self.stdout.write(self.style.SUCCESS('✅ Every layout pool is already full'))
+            return
+
+        tasks = [
+            (uuid.uuid4().hex, complexity, algorithm, patterns)
+            for complexity, algorithm in bands
+            for _ in range(options['candidates'])
+        ]
+        self.stdout.write(f"🏗️  Scoring {len(tasks)} candidate layouts on {options['workers']} workers...")
+
+        started = time.perf_counter()
+        candidates = defaultdict(list)
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            for band, seed, metrics in pool.map(score_candidate, tasks, chunksize=16):
+                candidates[band].append((seed, metrics))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{'complexity':>10} {'algorithm':<12} {'target':>7} {'kept':>5} {'pool':>5} "
+            f"{'median len':>10} {'spread':>15}"
+        )
+        for (complexity, algorithm), missing in sorted(bands.items()):
+            scored = candidates[(complexity, algorithm)]
+            target = options['target']
+            if target is None:
+                target = self.band_target(complexity, algorithm, patterns, scored)
+            band_width = target * options['tolerance']
+            matching = sorted(
+                (item for item in scored if abs(item[1]['difficulty'] - target) <= band_width),
+                key=lambda item: abs(item[1]['difficulty'] - target)
+            )[:missing]
+
+            CalibratedLayout.objects.bulk_create([
+                CalibratedLayout(
+                    seed=seed,
+                    complexity=complexity,
+                    algorithm=algorithm,
+                    required_patterns=patterns,
+                    **metrics
+                )
+                for seed, metrics in matching
+            ], ignore_conflicts=True)
+
+            difficulties = [metrics['difficulty'] for _, metrics in scored]
+            self.stdout.write(
+                f"{complexity:>10} {algorithm:<12} {target:>7.3f} {len(matching):>5} "
+                f"{CalibratedLayout.available(complexity, algorithm, patterns):>5} "
+                f"{statistics.median(m['solution_length'] for _, m in scored):>10.0f} "
+                f"{min(difficulties):>7.3f}-{max(difficulties):<7.3f}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Scored {len(tasks)} candidates in {elapsed:.1f}s ({len(tasks) / elapsed:.0f} layouts/s)'
+        ))
+
+    @staticmethod
+    def band_target(complexity, algorithm, patterns, scored):
+        """
+        Without --target a band is calibrated against itself: the median
+        difficulty of the layouts it already holds or, for an empty band, of
+        this batch of candidates. That keeps each band's typical maze and
+        drops outliers, so ventures of one complexity get comparable mazes,
+        but it does not pull a band towards any absolute difficulty.
+        """
+        existing = list(CalibratedLayout.objects.filter(
+            complexity=complexity,
+            algorithm=algorithm,
+            required_patterns=patterns
+        ).values_list('difficulty', flat=True))
+        if existing:
+            return statistics.median(existing)
+        return statistics.median(metrics['difficulty'] for _, metrics in scored)
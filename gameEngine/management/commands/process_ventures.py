@@ -1,9 +1,9 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from gameEngine.models import Venture
+from gameEngine.models import MazeSession, Venture
 
 class Command(BaseCommand):
-    help = 'Process venture status transitions and auto-start ventures'
+    help = 'Process venture status transitions and auto-start ventures (one-shot; see run_venture_scheduler)'
     
     def handle(self, *args, **options):
         self.stdout.write('🔄 Processing venture status transitions...')
@@ -17,30 +17,20 @@ class Command(BaseCommand):
                 self.stdout.write(f'   🚀 Started: {venture.name}')
                 started_count += 1
         
-        # Check for completed ventures (time-based)
-        running_ventures = Venture.objects.filter(status='running')
+        # Time out overdue maze sessions in one set-based update
+        expired_count = MazeSession.expire_overdue()
+        if expired_count:
+            self.stdout.write(f'   ⏱️  Timed out {expired_count} maze sessions')
+        
+        # Close running ventures whose clock ran out
+        now = timezone.now()
         completed_count = 0
         
-        for venture in running_ventures:
-            if venture.end_time and venture.end_time <= timezone.now():
-                # Auto-complete if time expired
-                if not venture.winning_player:
-                    # No winner found, distribute equity among participants
-                    venture.status = 'completed'
-                    venture.completion_time = timezone.now()
-                    venture.save()
-                    
-                    # Distribute equity to all participants
-                    participant_share = venture.participant_equity / max(1, venture.current_participants)
-                    for participation in venture.participants.all():
-                        participation.equity_earned = participant_share
-                        participation.player.total_equity += participant_share
-                        participation.player.save()
-                        participation.save()
-                
+        for venture in Venture.objects.filter(status='running', end_time__lte=now):
+            if venture.close_expired(now):
                 self.stdout.write(f'   ✅ Completed: {venture.name}')
                 completed_count += 1
         
         self.stdout.write(self.style.SUCCESS(
             f'✅ Processed {started_count} started and {completed_count} completed ventures'
-        ))
\ No newline at end of file
+        ))
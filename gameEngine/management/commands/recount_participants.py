@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import models
+from django.db.models.functions import Coalesce
+
+from gameEngine.models import Venture, VentureParticipation
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized Venture.participant_count from the participations table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report ventures whose counter drifted')
+
+    def handle(self, *args, **options):
+        drifted = list(
+            Venture.objects.annotate(actual=models.Count('participants'))
+            .exclude(participant_count=models.F('actual'))
+            .values_list('id', 'name', 'participant_count', 'actual')
+        )
+        for venture_id, name, stored, actual in drifted:
+            self.stdout.write(f'   🔧 {name} (#{venture_id}): {stored} -> {actual}')
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('✅ Every participant counter is correct'))
+            return
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'⚠️  {len(drifted)} counters drifted (dry run, nothing written)'))
+            return
+
+        # One UPDATE from a correlated COUNT; joins racing the repair stay consistent
+        Venture.objects.filter(pk__in=[row[0] for row in drifted]).update(
+            participant_count=Coalesce(
+                models.Subquery(
+                    VentureParticipation.objects.filter(venture=models.OuterRef('pk'))
+                    .values('venture')
+                    .annotate(count=models.Count('pk'))
+                    .values('count')[:1]
+                ),
+                0
+            )
+        )
+        self.stdout.write(self.style.SUCCESS(f'✅ Repaired {len(drifted)} participant counters'))
@@ -0,0 +1,34 @@
+import signal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from gameEngine.scheduler import venture_scheduler
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the event-driven venture scheduler, starting and closing ventures exactly on their deadlines. '
+        'Active ventures without a start_time are never started automatically'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--refresh',
+            type=float,
+            default=30.0,
+            help='Seconds between reloads of ventures changed by other processes'
+        )
+
+    def handle(self, *args, **options):
+        venture_scheduler.refresh_interval = options['refresh']
+        signal.signal(signal.SIGTERM, lambda *_: venture_scheduler.stop())
+
+        self.stdout.write(f"🗓️  Venture scheduler running (refresh every {options['refresh']:g}s)")
+        try:
+            venture_scheduler.run(
+                on_event=lambda message: self.stdout.write(f'   {timezone.now():%H:%M:%S} {message}')
+            )
+        except KeyboardInterrupt:
+            venture_scheduler.stop()
+        self.stdout.write(self.style.SUCCESS(f'✅ Scheduler stopped after {venture_scheduler.fired} transitions'))
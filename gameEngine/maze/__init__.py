@@ -0,0 +1 @@
+"""Maze engine used by venture competitions"""
@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .infinite import InfiniteMaze
+from .layout import build_layout
+
+
+class LayoutCache:
+    """Thread-safe in-process LRU cache of built maze layouts"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_build(self, key, factory):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Build outside the lock; a concurrent miss on the same key just
+        # produces an identical layout
+        value = factory()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+layout_cache = LayoutCache(getattr(settings, 'MAZE_LAYOUT_CACHE_SIZE', 256))
+chunk_cache = LayoutCache(getattr(settings, 'MAZE_CHUNK_CACHE_SIZE', 4096))
+
+
+def get_layout(seed, complexity, algorithm='backtracker', required_patterns=5):
+    """Return the layout for a seed, rebuilding it on a cache miss"""
+    key = (str(seed), complexity, algorithm, required_patterns)
+    return layout_cache.get_or_build(
+        key,
+        lambda: build_layout(seed, complexity, algorithm, required_patterns)
+    )
+
+
+def get_infinite_maze(seed, algorithm='backtracker'):
+    """Return the chunked world for a seed; chunks are generated lazily through chunk_cache"""
+    return layout_cache.get_or_build(
+        ('infinite', str(seed), algorithm),
+        lambda: InfiniteMaze(seed, algorithm, chunk_cache)
+    )
@@ -0,0 +1,77 @@
+"""
+Difficulty metrics for fixed maze layouts.
+
+Grid size alone is a poor difficulty measure: two mazes of the same size
+can need very different amounts of walking and searching. A layout is
+scored on
+
+* solution length - moves for a greedy nearest-pattern-first tour from
+  the entrance through every pattern to the exit,
+* dead ends       - open cells with a single open neighbour,
+* branching       - extra exits per open cell at junctions (degree > 2),
+
+and these are folded into one ``difficulty`` number used to calibrate
+layout pools.
+"""
+from collections import deque
+
+# Weights of the normalised metrics in the combined difficulty score
+SOLUTION_WEIGHT = 1.0
+DEAD_END_WEIGHT = 2.0
+BRANCHING_WEIGHT = 4.0
+
+
+def _distances_from(grid, start):
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        for _, x, y in grid.neighbors(*cell):
+            if (x, y) not in distances:
+                distances[(x, y)] = distances[cell] + 1
+                queue.append((x, y))
+    return distances
+
+
+def solution_length(layout):
+    """Moves for a greedy tour: nearest remaining pattern first, then the exit"""
+    targets = {(p['location']['x'], p['location']['y']) for p in layout.patterns}
+    position, total = layout.start, 0
+    while targets:
+        distances = _distances_from(layout.grid, position)
+        reachable = [cell for cell in targets if cell in distances]
+        if not reachable:
+            break
+        position = min(reachable, key=distances.get)
+        total += distances[position]
+        targets.discard(position)
+    exit_distance = _distances_from(layout.grid, position).get(layout.end)
+    return total + (exit_distance or 0)
+
+
+def score_layout(layout):
+    """Difficulty metrics for one layout"""
+    grid = layout.grid
+    open_cells = dead_ends = extra_branches = 0
+    for x, y in grid.open_cells():
+        degree = sum(1 for _ in grid.neighbors(x, y))
+        open_cells += 1
+        if degree == 1:
+            dead_ends += 1
+        elif degree > 2:
+            extra_branches += degree - 2
+
+    length = solution_length(layout)
+    open_cells = max(open_cells, 1)
+    branching = extra_branches / open_cells
+    difficulty = (
+        SOLUTION_WEIGHT * length / open_cells
+        + DEAD_END_WEIGHT * dead_ends / open_cells
+        + BRANCHING_WEIGHT * branching
+    )
+    return {
+        'solution_length': length,
+        'dead_ends': dead_ends,
+        'branching_factor': round(branching, 4),
+        'difficulty': round(difficulty, 4),
+    }
@@ -0,0 +1,78 @@
+"""
+Shortest-path distance fields.
+
+A distance field stores, for every cell, the number of moves to a target
+cell (the maze exit) as a packed array of unsigned 16-bit integers. It is
+computed once per layout with a level-synchronous BFS over flat cell
+indices and answers distance and next-step queries in O(1).
+"""
+from array import array
+
+from .grid import DIRECTIONS
+
+UNREACHABLE = 0xFFFF
+
+
+class DistanceField:
+    """Moves-to-target for every cell of a grid"""
+
+    __slots__ = ('width', 'height', 'distances')
+
+    def __init__(self, width, height, distances):
+        self.width = width
+        self.height = height
+        self.distances = distances
+
+    @classmethod
+    def compute(cls, grid, target):
+        """Breadth-first search outwards from target, one frontier level at a time"""
+        width, height = grid.width, grid.height
+        distances = array('H', [UNREACHABLE]) * (width * height)
+        tx, ty = target
+        if grid.is_wall(tx, ty):
+            return cls(width, height, distances)
+
+        # Open-cell mask by flat index, so the inner loop avoids bit twiddling
+        open_cells = bytearray(width * height)
+        for y in range(height):
+            for x in range(width):
+                if grid.is_open(x, y):
+                    open_cells[y * width + x] = 1
+
+        start = ty * width + tx
+        distances[start] = 0
+        frontier = [start]
+        level = 0
+        while frontier:
+            level += 1
+            next_frontier = []
+            for index in frontier:
+                x = index % width
+                for neighbour, valid in (
+                    (index - width, index >= width),
+                    (index + width, index < width * (height - 1)),
+                    (index - 1, x > 0),
+                    (index + 1, x < width - 1),
+                ):
+                    if valid and open_cells[neighbour] and distances[neighbour] == UNREACHABLE:
+                        distances[neighbour] = level
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        return cls(width, height, distances)
+
+    def distance(self, x, y):
+        """Moves from (x, y) to the target, or None if unreachable/out of bounds"""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        value = self.distances[y * self.width + x]
+        return None if value == UNREACHABLE else value
+
+    def next_step(self, x, y):
+        """Direction of a move that gets one step closer to the target"""
+        current = self.distance(x, y)
+        if not current:
+            return None
+        for direction, (dx, dy) in DIRECTIONS.items():
+            if self.distance(x + dx, y + dy) == current - 1:
+                return direction
+        return None
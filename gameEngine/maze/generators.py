@@ -0,0 +1,170 @@
+"""
+Perfect-maze generators.
+
+Cells live on even coordinates of the grid and the odd rows/columns in
+between hold the walls that get carved away. Every algorithm produces a
+spanning tree over the cells, so every open cell is reachable from every
+other one and the exit is always solvable.
+"""
+import random
+from collections import deque
+
+from .grid import MazeGrid, DIRECTIONS
+
+
+def _cell_lattice(size):
+    """Number of cells per side when cells sit on even coordinates"""
+    return (size + 1) // 2
+
+
+def _open_cell(grid, cx, cy):
+    grid.set_wall(cx * 2, cy * 2, False)
+
+
+def _open_between(grid, a, b):
+    """Knock down the wall between two adjacent lattice cells"""
+    (ax, ay), (bx, by) = a, b
+    grid.set_wall(ax + bx, ay + by, False)
+
+
+def carve_backtracker(n, grid, rng):
+    """Recursive backtracker (iterative, so large mazes don't hit the recursion limit)"""
+    visited = bytearray(n * n)
+    stack = [(0, 0)]
+    visited[0] = 1
+    _open_cell(grid, 0, 0)
+    while stack:
+        cx, cy = stack[-1]
+        options = [
+            (cx + dx, cy + dy)
+            for dx, dy in DIRECTIONS.values()
+            if 0 <= cx + dx < n and 0 <= cy + dy < n and not visited[(cy + dy) * n + cx + dx]
+        ]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny = rng.choice(options)
+        visited[ny * n + nx] = 1
+        _open_cell(grid, nx, ny)
+        _open_between(grid, (cx, cy), (nx, ny))
+        stack.append((nx, ny))
+
+
+def carve_kruskal(n, grid, rng):
+    """Randomised Kruskal over all lattice edges with a union-find forest"""
+    parent = list(range(n * n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # Path halving
+            i = parent[i]
+        return i
+
+    edges = []
+    for cy in range(n):
+        for cx in range(n):
+            _open_cell(grid, cx, cy)
+            if cx + 1 < n:
+                edges.append(((cx, cy), (cx + 1, cy)))
+            if cy + 1 < n:
+                edges.append(((cx, cy), (cx, cy + 1)))
+    rng.shuffle(edges)
+
+    remaining = n * n - 1
+    for a, b in edges:
+        root_a, root_b = find(a[1] * n + a[0]), find(b[1] * n + b[0])
+        if root_a != root_b:
+            parent[root_a] = root_b
+            _open_between(grid, a, b)
+            remaining -= 1
+            if not remaining:
+                break
+
+
+def carve_prim(n, grid, rng):
+    """Randomised Prim growing the maze from the entrance cell"""
+    visited = bytearray(n * n)
+    frontier = []
+
+    def add_cell(cx, cy):
+        visited[cy * n + cx] = 1
+        _open_cell(grid, cx, cy)
+        for dx, dy in DIRECTIONS.values():
+            nx, ny = cx + dx, cy + dy
+            if 0 <= nx < n and 0 <= ny < n and not visited[ny * n + nx]:
+                frontier.append(((cx, cy), (nx, ny)))
+
+    add_cell(0, 0)
+    while frontier:
+        # Swap-remove a random frontier edge
+        index = rng.randrange(len(frontier))
+        frontier[index], frontier[-1] = frontier[-1], frontier[index]
+        source, (nx, ny) = frontier.pop()
+        if visited[ny * n + nx]:
+            continue
+        _open_between(grid, source, (nx, ny))
+        add_cell(nx, ny)
+
+
+ALGORITHMS = {
+    'backtracker': carve_backtracker,
+    'kruskal': carve_kruskal,
+    'prim': carve_prim,
+}
+
+
+def generate_grid(size, algorithm='backtracker', rng=None):
+    """Generate a solvable size x size maze with its exit at the far corner"""
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown maze algorithm: {algorithm}")
+    rng = rng or random.Random()
+    grid = MazeGrid(size)
+    grid.fill(wall=True)
+    ALGORITHMS[algorithm](_cell_lattice(size), grid, rng)
+
+    if size % 2 == 0:
+        # Even sizes leave the last row/column as border, so link the
+        # corner exit to the nearest lattice cell
+        grid.set_wall(size - 1, size - 2, False)
+        grid.set_wall(size - 1, size - 1, False)
+    return grid
+
+
+def reachable_cells(grid, start):
+    """Breadth-first list of every open cell reachable from start"""
+    if grid.is_wall(*start):
+        return []
+    seen = {start}
+    order = [start]
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for _, nx, ny in grid.neighbors(x, y):
+            if (nx, ny) not in seen:
+                seen.add((nx, ny))
+                order.append((nx, ny))
+                queue.append((nx, ny))
+    return order
+
+
+def place_patterns(grid, count, rng=None, start=(0, 0), end=None):
+    """
+    Spread pattern cells over the reachable part of the maze.
+
+    Reachable cells are split into ``count`` bands in row-major order and
+    one cell is drawn from each band, so patterns cover the whole grid
+    instead of clustering.
+    """
+    rng = rng or random.Random()
+    end = end or (grid.width - 1, grid.height - 1)
+    candidates = sorted(
+        (cell for cell in reachable_cells(grid, start) if cell not in (start, end)),
+        key=lambda cell: (cell[1], cell[0])
+    )
+    count = min(count, len(candidates))
+    locations = []
+    for band in range(count):
+        lo = band * len(candidates) // count
+        hi = (band + 1) * len(candidates) // count
+        locations.append(candidates[rng.randrange(lo, hi)])
+    return locations
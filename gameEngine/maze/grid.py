@@ -0,0 +1,168 @@
+import base64
+
+# Direction name -> (dx, dy) offset on the grid
+DIRECTIONS = {
+    'up': (0, -1),
+    'down': (0, 1),
+    'left': (-1, 0),
+    'right': (1, 0),
+}
+
+
+class MazeGrid:
+    """Packed wall bitmap for a maze, one bit per cell in row-major order"""
+
+    __slots__ = ('width', 'height', 'bits')
+
+    def __init__(self, width, height=None, bits=None):
+        self.width = width
+        self.height = width if height is None else height
+        nbytes = (self.width * self.height + 7) // 8
+        if bits is None:
+            bits = bytearray(nbytes)
+        elif len(bits) != nbytes:
+            raise ValueError(f"Expected {nbytes} bytes for a {self.width}x{self.height} grid, got {len(bits)}")
+        self.bits = bytearray(bits)
+
+    def __eq__(self, other):
+        return (isinstance(other, MazeGrid) and
+                (self.width, self.height, self.bits) == (other.width, other.height, other.bits))
+
+    def __repr__(self):
+        return f"<MazeGrid {self.width}x{self.height} walls={self.wall_count()}>"
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_wall(self, x, y):
+        """Walls and out-of-bounds cells both block movement"""
+        if not self.in_bounds(x, y):
+            return True
+        index = y * self.width + x
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def is_open(self, x, y):
+        return not self.is_wall(x, y)
+
+    def set_wall(self, x, y, wall=True):
+        index = y * self.width + x
+        if wall:
+            self.bits[index >> 3] |= 1 << (index & 7)
+        else:
+            self.bits[index >> 3] &= ~(1 << (index & 7))
+
+    def fill(self, wall=True):
+        """Set every cell to wall (or open) in one pass"""
+        self.bits = bytearray(b'\xff' if wall else b'\x00') * len(self.bits)
+        if wall:
+            # Keep the padding bits past the last cell clear
+            extra = len(self.bits) * 8 - self.width * self.height
+            if extra:
+                self.bits[-1] &= 0xff >> extra
+
+    def neighbors(self, x, y):
+        """Yield (direction, x, y) for each open cell next to (x, y)"""
+        for direction, (dx, dy) in DIRECTIONS.items():
+            nx, ny = x + dx, y + dy
+            if self.is_open(nx, ny):
+                yield direction, nx, ny
+
+    def open_cells(self):
+        for y in range(self.height):
+            for x in range(self.width):
+                if self.is_open(x, y):
+                    yield x, y
+
+    def wall_count(self):
+        return sum(bin(byte).count('1') for byte in self.bits)
+
+    def region(self, x, y, width, height):
+        """Copy of a rectangular window; cells outside the maze come back as walls"""
+        region = MazeGrid(width, height)
+        for ry in range(height):
+            for rx in range(width):
+                if self.is_wall(x + rx, y + ry):
+                    region.set_wall(rx, ry)
+        return region
+
+    def to_base64(self):
+        return base64.b64encode(bytes(self.bits)).decode('ascii')
+
+    def to_rle(self):
+        """
+        Row-major run lengths of alternating open/wall cells (open first, so the
+        first run may be 0), as base64 LEB128 varints
+        """
+        out = bytearray()
+        run, wall = 0, False
+        for index in range(self.width * self.height):
+            if bool(self.bits[index >> 3] & (1 << (index & 7))) == wall:
+                run += 1
+                continue
+            _write_varint(out, run)
+            run, wall = 1, not wall
+        _write_varint(out, run)
+        return base64.b64encode(bytes(out)).decode('ascii')
+
+    @classmethod
+    def from_rle(cls, data, width, height=None):
+        grid = cls(width, height)
+        raw = base64.b64decode(data)
+        index, offset, wall = 0, 0, False
+        while offset < len(raw):
+            run, offset = _read_varint(raw, offset)
+            if wall:
+                for cell in range(index, index + run):
+                    grid.bits[cell >> 3] |= 1 << (cell & 7)
+            index += run
+            wall = not wall
+        return grid
+
+    def encode(self, encoding='bitmap'):
+        """Serialise for clients as 'bitmap' (base64 bits) or 'rle'"""
+        if encoding == 'rle':
+            return self.to_rle()
+        return self.to_base64()
+
+    @classmethod
+    def from_base64(cls, data, width, height=None):
+        return cls(width, height, base64.b64decode(data))
+
+    @classmethod
+    def from_wall_list(cls, walls, width, height=None):
+        """Build a grid from the legacy [{'x': .., 'y': ..}] wall list"""
+        grid = cls(width, height)
+        for wall in walls:
+            if grid.in_bounds(wall['x'], wall['y']):
+                grid.set_wall(wall['x'], wall['y'])
+        return grid
+
+    @classmethod
+    def from_layout(cls, layout):
+        """Read the grid out of a stored layout dict, old or new format"""
+        size = layout.get('size', 0)
+        width = layout.get('width', size)
+        height = layout.get('height', size)
+        if 'grid' in layout:
+            if layout.get('encoding') == 'rle':
+                return cls.from_rle(layout['grid'], width, height)
+            return cls.from_base64(layout['grid'], width, height)
+        return cls.from_wall_list(layout.get('walls', []), width, height)
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
@@ -0,0 +1,165 @@
+"""
+Per-venture cell heatmaps.
+
+Every accepted move on a fixed layout bumps two per-cell counters in
+process memory: visits of the cell entered and milliseconds spent in the
+cell left. Counters are packed ``array('I')`` buffers, one per venture,
+so recording a move is two array increments and never writes a row.
+Pending counts are merged into the venture's VentureHeatmap row every
+MAZE_HEATMAP_FLUSH_INTERVAL seconds from the session store's flusher.
+"""
+import atexit
+import io
+import logging
+import math
+import sys
+import threading
+import time
+from array import array
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .store import session_store
+
+logger = logging.getLogger(__name__)
+
+# Arrival times of sessions nobody has moved for this long are dropped
+ARRIVAL_TTL = 3600
+
+
+def pack_counters(counters):
+    """Little-endian bytes for an array('I')"""
+    if sys.byteorder == 'big':
+        counters = array('I', counters)
+        counters.byteswap()
+    return counters.tobytes()
+
+
+def unpack_counters(data, cells):
+    counters = array('I')
+    counters.frombytes(bytes(data or b''))
+    if sys.byteorder == 'big':
+        counters.byteswap()
+    if len(counters) != cells:
+        counters = array('I', [0]) * cells
+    return counters
+
+
+def add_counters(target, delta):
+    for index, value in enumerate(delta):
+        if value:
+            target[index] = min(target[index] + value, 0xFFFFFFFF)
+
+
+class HeatmapAccumulator:
+    """Process-local visit and dwell counters awaiting a flush"""
+
+    def __init__(self, flush_interval=30):
+        self.flush_interval = flush_interval
+        self._pending = {}   # venture_id -> (width, height, visits, dwell_ms)
+        self._arrivals = {}  # session_id -> (venture_id, cell index, monotonic arrival time)
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record_move(self, session, width, height, x, y, now=None):
+        """Count a visit to (x, y) and charge the time since the last move to the previous cell"""
+        now = time.monotonic() if now is None else now
+        cells = width * height
+        index = y * width + x
+        with self._lock:
+            pending = self._pending.get(session.venture_id)
+            if pending is None:
+                pending = (width, height, array('I', [0]) * cells, array('I', [0]) * cells)
+                self._pending[session.venture_id] = pending
+            visits, dwell = pending[2], pending[3]
+            visits[index] = min(visits[index] + 1, 0xFFFFFFFF)
+
+            arrival = self._arrivals.get(session.pk)
+            if arrival is not None and arrival[0] == session.venture_id:
+                elapsed_ms = int((now - arrival[2]) * 1000)
+                dwell[arrival[1]] = min(dwell[arrival[1]] + elapsed_ms, 0xFFFFFFFF)
+            self._arrivals[session.pk] = (session.venture_id, index, now)
+
+    def forget(self, session_id):
+        with self._lock:
+            self._arrivals.pop(session_id, None)
+
+    def discard(self):
+        """Drop all unflushed counters, e.g. before the database they belong to goes away"""
+        with self._lock:
+            self._pending.clear()
+            self._arrivals.clear()
+
+    def pending(self, venture_id):
+        """Copy of the unflushed (visits, dwell_ms) counters for a venture, if any"""
+        with self._lock:
+            pending = self._pending.get(venture_id)
+            if pending is None:
+                return None
+            return array('I', pending[2]), array('I', pending[3])
+
+    def flush_if_due(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Merge pending counters into each venture's heatmap row"""
+        from gameEngine.models import VentureHeatmap
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            cutoff = self._last_flush - ARRIVAL_TTL
+            for session_id, arrival in list(self._arrivals.items()):
+                if arrival[2] < cutoff:
+                    del self._arrivals[session_id]
+
+        for venture_id, (width, height, visits, dwell) in pending.items():
+            try:
+                with transaction.atomic():
+                    heatmap, _ = VentureHeatmap.objects.select_for_update().get_or_create(
+                        venture_id=venture_id,
+                        defaults={'width': width, 'height': height}
+                    )
+                    heatmap.add(visits, dwell)
+                    heatmap.save(update_fields=['visits', 'dwell_ms', 'total_visits', 'updated_at'])
+            except IntegrityError:
+                # The venture was deleted; retrying would fail on every flush
+                logger.warning(f"Dropping heatmap counters of deleted venture {venture_id}")
+            except Exception as e:
+                logger.error(f"Heatmap flush failed for venture {venture_id}: {e}")
+                with self._lock:
+                    current = self._pending.setdefault(venture_id, (width, height, visits, dwell))
+                    if current[2] is not visits:
+                        add_counters(current[2], visits)
+                        add_counters(current[3], dwell)
+
+
+def render_png(grid, values, scale=12):
+    """
+    Render counters over a wall grid as a PNG: walls dark, open cells from
+    cold blue to hot red on a log scale.
+    """
+    from PIL import Image
+
+    width, height = grid.width, grid.height
+    peak = math.log1p(max(values) if values else 0) or 1.0
+    image = Image.new('RGB', (width, height), (24, 24, 32))
+    pixels = image.load()
+    for y in range(height):
+        for x in range(width):
+            if grid.is_wall(x, y):
+                continue
+            heat = math.log1p(values[y * width + x]) / peak
+            pixels[x, y] = (int(255 * heat), int(96 * (1 - abs(2 * heat - 1))), int(255 * (1 - heat)))
+
+    image = image.resize((width * scale, height * scale), Image.NEAREST)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+heatmaps = HeatmapAccumulator(getattr(settings, 'MAZE_HEATMAP_FLUSH_INTERVAL', 30))
+session_store.add_flush_hook(heatmaps.flush_if_due)
+atexit.register(heatmaps.flush)
@@ -0,0 +1,186 @@
+"""
+Infinite maze mode.
+
+The world is an unbounded grid split into CHUNK_SIZE x CHUNK_SIZE chunks.
+Each chunk is carved on its own from ``random.Random(f'{seed}:{algorithm}:{cx}:{cy}')``
+with the venture's algorithm, so any chunk can be rebuilt from the seed
+alone and nothing about the world is ever stored.
+
+Inside a chunk, cells sit on even local coordinates exactly like a fixed
+layout, which leaves the last column and row (local 15) as the seams to
+the east and south neighbours. A chunk owns those two seams and opens at
+least one gap in each, so neighbouring chunks always agree on their
+shared edge and the whole world stays connected.
+"""
+import hashlib
+import random
+
+from .generators import ALGORITHMS
+from .grid import DIRECTIONS, MazeGrid
+from .layout import CHUNK_SIZE  # World chunks double as delivery chunks; must stay even
+
+SEAM_OPENINGS = (1, 2)  # Min/max gaps carved in each seam
+PATTERN_CHANCE = 0.5    # Probability that a chunk holds a pattern
+
+
+class MazeChunk:
+    __slots__ = ('cx', 'cy', 'grid', 'pattern')
+
+    def __init__(self, cx, cy, grid, pattern):
+        self.cx = cx
+        self.cy = cy
+        self.grid = grid
+        self.pattern = pattern
+
+    @property
+    def key(self):
+        return f'{self.cx},{self.cy}'
+
+
+def build_chunk(seed, algorithm, cx, cy):
+    """Carve one chunk of the world deterministically from its coordinates"""
+    rng = random.Random(f'{seed}:{algorithm}:{cx}:{cy}')
+    grid = MazeGrid(CHUNK_SIZE)
+    grid.fill(wall=True)
+    lattice = CHUNK_SIZE // 2
+    ALGORITHMS[algorithm](lattice, grid, rng)
+
+    # Open the east and south seams on lattice rows/columns
+    for _ in range(rng.randint(*SEAM_OPENINGS)):
+        grid.set_wall(CHUNK_SIZE - 1, rng.randrange(lattice) * 2, False)
+    for _ in range(rng.randint(*SEAM_OPENINGS)):
+        grid.set_wall(rng.randrange(lattice) * 2, CHUNK_SIZE - 1, False)
+
+    pattern = None
+    if rng.random() < PATTERN_CHANCE:
+        lx, ly = rng.randrange(lattice) * 2, rng.randrange(lattice) * 2
+        if (cx, cy, lx, ly) != (0, 0, 0, 0):  # Never on the entrance
+            pattern = {
+                'id': f'{cx},{cy}',
+                'type': f'pattern_{rng.randint(1, 5)}',
+                'location': {'x': cx * CHUNK_SIZE + lx, 'y': cy * CHUNK_SIZE + ly},
+                'solution_required': True
+            }
+    return MazeChunk(cx, cy, grid, pattern)
+
+
+def chunk_of(x, y):
+    """Chunk coordinates holding world cell (x, y); floor division handles negatives"""
+    return x // CHUNK_SIZE, y // CHUNK_SIZE
+
+
+class InfiniteGrid:
+    """MazeGrid-compatible view of the unbounded world"""
+
+    __slots__ = ('maze',)
+
+    def __init__(self, maze):
+        self.maze = maze
+
+    def in_bounds(self, x, y):
+        return True
+
+    def is_wall(self, x, y):
+        chunk = self.maze.chunk(*chunk_of(x, y))
+        return chunk.grid.is_wall(x % CHUNK_SIZE, y % CHUNK_SIZE)
+
+    def is_open(self, x, y):
+        return not self.is_wall(x, y)
+
+    def neighbors(self, x, y):
+        for direction, (dx, dy) in DIRECTIONS.items():
+            if self.is_open(x + dx, y + dy):
+                yield direction, x + dx, y + dy
+
+    def region(self, x, y, width, height):
+        region = MazeGrid(width, height)
+        for ry in range(height):
+            for rx in range(width):
+                if self.is_wall(x + rx, y + ry):
+                    region.set_wall(rx, ry)
+        return region
+
+
+class InfiniteMaze:
+    """
+    Layout-like facade over the chunked world, so sessions, replays and
+    the maze views can treat both modes alike. There is no exit: a run is
+    won by collecting the required number of patterns.
+    """
+
+    start = (0, 0)
+    end = None
+    patterns = []
+    size = None
+    chunks_per_side = None
+    min_moves = None
+
+    def __init__(self, seed, algorithm, cache):
+        self.seed = seed
+        self.algorithm = algorithm if algorithm in ALGORITHMS else 'backtracker'
+        self.cache = cache
+        self.grid = InfiniteGrid(self)
+
+    def __repr__(self):
+        return f"<InfiniteMaze seed={self.seed}>"
+
+    def chunk(self, cx, cy):
+        return self.cache.get_or_build(
+            (self.seed, self.algorithm, cx, cy),
+            lambda: build_chunk(self.seed, self.algorithm, cx, cy)
+        )
+
+    def pattern_at(self, x, y):
+        pattern = self.chunk(*chunk_of(x, y)).pattern
+        if pattern is not None and (pattern['location']['x'], pattern['location']['y']) == (x, y):
+            return pattern
+        return None
+
+    def pattern_in(self, key):
+        """Pattern of the chunk with key 'cx,cy', if it has one"""
+        cx, cy = map(int, key.split(','))
+        return self.chunk(cx, cy).pattern
+
+    def distance_to_exit(self, x, y):
+        return None
+
+    def optimal_next_step(self, x, y):
+        return None
+
+    @property
+    def etag(self):
+        return hashlib.sha1(f'infinite:{self.seed}:{self.algorithm}'.encode()).hexdigest()[:20]
+
+    def to_dict(self, encoding='bitmap', region=None):
+        data = {
+            'mode': 'infinite',
+            'size': None,
+            'start': {'x': self.start[0], 'y': self.start[1]},
+            'end': None,
+            'encoding': encoding,
+            'etag': self.etag,
+            'chunkSize': CHUNK_SIZE,
+        }
+        if region is not None:
+            data['region'] = self.region_dict(*region, encoding=encoding)
+        return data
+
+    def region_dict(self, x, y, width, height, encoding='bitmap'):
+        return {
+            'x': x,
+            'y': y,
+            'width': width,
+            'height': height,
+            'encoding': encoding,
+            'grid': self.grid.region(x, y, width, height).encode(encoding),
+        }
+
+    def chunk_dict(self, cx, cy, encoding='bitmap'):
+        return {
+            'x': cx * CHUNK_SIZE,
+            'y': cy * CHUNK_SIZE,
+            'width': CHUNK_SIZE,
+            'height': CHUNK_SIZE,
+            'encoding': encoding,
+            'grid': self.chunk(cx, cy).grid.encode(encoding),
+        }
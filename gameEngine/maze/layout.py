@@ -0,0 +1,170 @@
+"""
+Seed-deterministic maze layouts.
+
+A layout is fully determined by (seed, complexity, algorithm, patterns),
+so sessions only persist those values and the server rebuilds the grid on
+demand through the LRU cache in ``gameEngine.maze.cache``.
+"""
+import hashlib
+import random
+
+from .grid import MazeGrid
+from .distance import DistanceField
+from .generators import generate_grid, place_patterns
+
+
+# Pattern ids must fit the signed 64-bit discovery bitmask on MazeSession
+MAX_PATTERNS = 63
+
+
+# Wire encodings for the wall grid and the side of a delivery chunk in cells
+ENCODINGS = ('bitmap', 'rle')
+CHUNK_SIZE = 16
+
+
+def maze_size(complexity):
+    return 10 + (complexity * 2)  # 12x12 to 30x30
+
+
+class MazeLayout:
+    """Immutable maze layout: wall grid, entrance, exit and pattern cells"""
+
+    __slots__ = (
+        'seed', 'complexity', 'algorithm', 'grid', 'start', 'end', 'patterns',
+        'pattern_index', '_distances', '_etag'
+    )
+
+    def __init__(self, grid, start, end, patterns, seed=None, complexity=None, algorithm=None):
+        self.grid = grid
+        self.start = start
+        self.end = end
+        self.patterns = patterns
+        self.seed = seed
+        self.complexity = complexity
+        self.algorithm = algorithm
+        self._distances = None
+        self._etag = None
+        # Patterns keyed by flat cell index, so a move checks its cell in O(1)
+        self.pattern_index = {
+            pattern['location']['y'] * grid.width + pattern['location']['x']: pattern
+            for pattern in patterns
+        }
+
+    def __repr__(self):
+        return f"<MazeLayout {self.size}x{self.size} seed={self.seed}>"
+
+    @property
+    def size(self):
+        return self.grid.width
+
+    def pattern_at(self, x, y):
+        """The pattern placed on (x, y), if any"""
+        if not self.grid.in_bounds(x, y):
+            return None
+        return self.pattern_index.get(y * self.grid.width + x)
+
+    @property
+    def distances(self):
+        """Distance field from the exit, computed once and kept with the cached layout"""
+        if self._distances is None:
+            self._distances = DistanceField.compute(self.grid, self.end)
+        return self._distances
+
+    def distance_to_exit(self, x, y):
+        return self.distances.distance(x, y)
+
+    def optimal_next_step(self, x, y):
+        return self.distances.next_step(x, y)
+
+    @property
+    def min_moves(self):
+        """Shortest possible entrance-to-exit run"""
+        return self.distances.distance(*self.start)
+
+    @property
+    def etag(self):
+        """Content hash of everything a client is sent about the layout"""
+        if self._etag is None:
+            digest = hashlib.sha1(f'{self.grid.width}x{self.grid.height}:{self.start}:{self.end}:'.encode())
+            digest.update(self.grid.bits)
+            self._etag = digest.hexdigest()[:20]
+        return self._etag
+
+    @property
+    def chunks_per_side(self):
+        return (self.size + CHUNK_SIZE - 1) // CHUNK_SIZE
+
+    def to_dict(self, encoding='bitmap', region=None):
+        """
+        Layout in the shape returned to clients as ``mazeLayout``. With
+        ``region=(x, y, width, height)`` only that window of the grid is
+        included, clipped to the maze.
+        """
+        data = {
+            'mode': 'fixed',
+            'size': self.size,
+            'start': {'x': self.start[0], 'y': self.start[1]},
+            'end': {'x': self.end[0], 'y': self.end[1]},
+            'encoding': encoding,
+            'etag': self.etag,
+        }
+        if region is None:
+            data['grid'] = self.grid.encode(encoding)
+        else:
+            data['region'] = self.region_dict(*region, encoding=encoding)
+        return data
+
+    def region_dict(self, x, y, width, height, encoding='bitmap'):
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(self.grid.width, x + width), min(self.grid.height, y + height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return {
+            'x': x0,
+            'y': y0,
+            'width': x1 - x0,
+            'height': y1 - y0,
+            'encoding': encoding,
+            'grid': self.grid.region(x0, y0, x1 - x0, y1 - y0).encode(encoding),
+        }
+
+    def chunk_dict(self, cx, cy, encoding='bitmap'):
+        """One CHUNK_SIZE square of the grid, or None past the edge"""
+        if cx < 0 or cy < 0:
+            return None
+        return self.region_dict(cx * CHUNK_SIZE, cy * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE, encoding)
+
+    @classmethod
+    def from_configuration(cls, config):
+        """Rebuild a layout persisted inside an older maze_configuration"""
+        layout = config.get('layout', {})
+        start = layout.get('start', {'x': 0, 'y': 0})
+        end = layout.get('end', {'x': 9, 'y': 9})
+        return cls(
+            grid=MazeGrid.from_layout(layout),
+            start=(start['x'], start['y']),
+            end=(end['x'], end['y']),
+            patterns=config.get('patterns', []),
+            seed=config.get('seed'),
+            complexity=config.get('complexity'),
+            algorithm=config.get('algorithm'),
+        )
+
+
+def build_layout(seed, complexity, algorithm='backtracker', required_patterns=5):
+    """Generate the layout for a seed from scratch (no caching)"""
+    rng = random.Random(f'{seed}:{complexity}:{algorithm}')
+    size = maze_size(complexity)
+    grid = generate_grid(size, algorithm, rng)
+    start, end = (0, 0), (size - 1, size - 1)
+
+    patterns = []
+    count = min(required_patterns, MAX_PATTERNS)
+    for i, (x, y) in enumerate(place_patterns(grid, count, rng, start, end)):
+        patterns.append({
+            'id': i + 1,
+            'type': f'pattern_{(i % 5) + 1}',
+            'location': {'x': x, 'y': y},
+            'solution_required': True
+        })
+    return MazeLayout(grid, start, end, patterns, seed, complexity, algorithm)
@@ -0,0 +1,128 @@
+"""
+In-memory race leaderboards.
+
+Each venture's finishers are kept in a list sorted by completion time, so
+top-N is a slice and a player's rank is a bisect. Boards are loaded with
+a single query on first use and updated in place whenever a session in
+this process completes. Like the hot session store they are per process,
+so each board is also rebuilt after MAZE_LEADERBOARD_TTL seconds to pick
+up completions recorded by other workers.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class LeaderboardEntry:
+    __slots__ = ('key', 'session_id', 'player_id', 'username', 'time_elapsed', 'moves_made', 'patterns_found')
+
+    def __init__(self, session_id, player_id, username, completed_at, time_elapsed, moves_made, patterns_found):
+        # Earlier finishers rank first; the session id breaks exact ties
+        self.key = (completed_at.timestamp(), str(session_id))
+        self.session_id = session_id
+        self.player_id = player_id
+        self.username = username
+        self.time_elapsed = time_elapsed
+        self.moves_made = moves_made
+        self.patterns_found = patterns_found
+
+
+class VentureLeaderboard:
+    """Finishers of one venture ordered by completion time"""
+
+    def __init__(self, entries=()):
+        self._keys = []
+        self._entries = {}
+        self._best = {}  # player_id -> key of the player's first finish
+        self.loaded_at = time.monotonic()
+        for entry in entries:
+            self.add(entry)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, entry):
+        if entry.key in self._entries:
+            return
+        insort(self._keys, entry.key)
+        self._entries[entry.key] = entry
+        best = self._best.get(entry.player_id)
+        if best is None or entry.key < best:
+            self._best[entry.player_id] = entry.key
+
+    def top(self, limit=10):
+        return [self._entries[key] for key in self._keys[:limit]]
+
+    def rank_of(self, player_id):
+        """1-based rank of the player's best finish, or None if they haven't finished"""
+        key = self._best.get(player_id)
+        if key is None:
+            return None
+        return bisect_left(self._keys, key) + 1
+
+    def entry_of(self, player_id):
+        key = self._best.get(player_id)
+        return self._entries.get(key) if key is not None else None
+
+
+def _load_entries(venture_id):
+    from gameEngine.models import MazeSession
+
+    rows = MazeSession.objects.filter(
+        venture_id=venture_id,
+        status='completed',
+        completed_at__isnull=False
+    ).values_list(
+        'id', 'player_id', 'player__user__username', 'completed_at',
+        'time_elapsed', 'moves_made', 'patterns_found'
+    )
+    return [LeaderboardEntry(*row) for row in rows]
+
+
+class LeaderboardRegistry:
+    """LRU of per-venture leaderboards"""
+
+    def __init__(self, maxsize=64, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._boards = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, venture_id):
+        with self._lock:
+            board = self._boards.get(venture_id)
+            if board is not None and time.monotonic() - board.loaded_at < self.ttl:
+                self._boards.move_to_end(venture_id)
+                return board
+
+        board = VentureLeaderboard(_load_entries(venture_id))
+        with self._lock:
+            self._boards[venture_id] = board
+            self._boards.move_to_end(venture_id)
+            while len(self._boards) > self.maxsize:
+                self._boards.popitem(last=False)
+        return board
+
+    def record(self, session, username):
+        """Insert a just-completed session into its venture's board, if loaded"""
+        entry = LeaderboardEntry(
+            session.pk, session.player_id, username, session.completed_at,
+            session.time_elapsed, session.moves_made, session.patterns_found
+        )
+        with self._lock:
+            board = self._boards.get(session.venture_id)
+            if board is not None:
+                board.add(entry)
+
+    def invalidate(self, venture_id=None):
+        with self._lock:
+            if venture_id is None:
+                self._boards.clear()
+            else:
+                self._boards.pop(venture_id, None)
+
+
+leaderboards = LeaderboardRegistry(ttl=getattr(settings, 'MAZE_LEADERBOARD_TTL', 30))
@@ -0,0 +1,109 @@
+"""
+Minimap thumbnails of fixed maze layouts.
+
+A minimap is a small palette PNG of the wall grid with the entrance and
+exit marked. Patterns are never drawn, so previews give nothing away.
+Base images depend only on the layout, so they are cached on disk under
+MAZE_MINIMAP_CACHE_DIR by layout etag and scale, and written once per
+layout across every worker. A player marker is drawn on a copy of the
+cached image per request.
+"""
+import io
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_SCALE = 8
+
+# Palette indices
+OPEN, WALL, START, END, PLAYER = range(5)
+PALETTE = [
+    235, 235, 240,  # open
+    30, 30, 42,     # wall
+    46, 204, 113,   # start
+    231, 76, 60,    # end
+    52, 152, 219,   # player
+]
+
+# Byte of 8 wall bits (lowest bit first) -> 8 palette indices
+_UNPACK = [bytes((byte >> bit) & 1 for bit in range(8)) for byte in range(256)]
+
+
+def minimap_scale(layout, size=None, scale=None):
+    """Pixels per cell: explicit ``scale``, else the largest that keeps the image within ``size`` pixels"""
+    if scale is None:
+        scale = (size or 128) // layout.grid.width
+    return max(1, min(int(scale), MAX_SCALE))
+
+
+def _cache_path(layout, scale):
+    root = getattr(settings, 'MAZE_MINIMAP_CACHE_DIR', None)
+    if not root:
+        return None
+    return Path(root) / layout.etag[:2] / f'{layout.etag}-{scale}.png'
+
+
+def _render(layout, scale):
+    from PIL import Image
+
+    grid = layout.grid
+    cells = grid.width * grid.height
+    pixels = bytearray(b''.join(_UNPACK[byte] for byte in grid.bits)[:cells])
+    pixels[layout.start[1] * grid.width + layout.start[0]] = START
+    pixels[layout.end[1] * grid.width + layout.end[0]] = END
+
+    image = Image.frombytes('P', (grid.width, grid.height), bytes(pixels))
+    image.putpalette(PALETTE)
+    if scale > 1:
+        image = image.resize((grid.width * scale, grid.height * scale), Image.NEAREST)
+    return image
+
+
+def _to_png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def minimap_png(layout, scale):
+    """PNG bytes of the layout's base minimap, read from or written to the disk cache"""
+    path = _cache_path(layout, scale)
+    if path is not None:
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not read cached minimap {path}: {e}")
+            path = None
+
+    png = _to_png(_render(layout, scale))
+    if path is not None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(png)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not cache minimap {path}: {e}")
+    return png
+
+
+def minimap_with_player(layout, scale, position):
+    """Base minimap with a marker over the player's cell"""
+    from PIL import Image, ImageDraw
+
+    image = Image.open(io.BytesIO(minimap_png(layout, scale)))
+    x, y = position
+    ImageDraw.Draw(image).rectangle(
+        (x * scale, y * scale, (x + 1) * scale - 1, (y + 1) * scale - 1),
+        fill=PLAYER
+    )
+    return _to_png(image)
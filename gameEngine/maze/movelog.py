@@ -0,0 +1,147 @@
+"""
+Packed per-session move logs and replay.
+
+A move log stores every move of a session in one binary blob:
+
+    version:u8  count:u32  moves:ceil(count / 4) bytes  timestamps:u32 * ceil(count / 32)
+
+Moves are 2-bit direction codes, four per byte, lowest bits first. Every
+``TIMESTAMP_EVERY``-th move also records its time in milliseconds since the
+session started, which bounds the timing of any move to a 32-move window
+at 4 bytes per window. All integers are little-endian.
+"""
+import struct
+from array import array
+
+from .grid import DIRECTIONS
+
+LOG_VERSION = 1
+TIMESTAMP_EVERY = 32
+
+DIRECTION_CODES = {'up': 0, 'down': 1, 'left': 2, 'right': 3}
+CODE_DIRECTIONS = ['up', 'down', 'left', 'right']
+
+_HEADER = struct.Struct('<BI')
+
+
+class MoveLog:
+    """Append-only 2-bit move stream with periodic timestamps"""
+
+    __slots__ = ('count', 'moves', 'timestamps')
+
+    def __init__(self, count=0, moves=None, timestamps=None):
+        self.count = count
+        self.moves = moves if moves is not None else bytearray()
+        self.timestamps = timestamps if timestamps is not None else array('I')
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError('move index out of range')
+        return CODE_DIRECTIONS[(self.moves[index >> 2] >> ((index & 3) * 2)) & 3]
+
+    def append(self, direction, timestamp_ms):
+        index = self.count
+        if index & 3 == 0:
+            self.moves.append(0)
+        self.moves[index >> 2] |= DIRECTION_CODES[direction] << ((index & 3) * 2)
+        if index % TIMESTAMP_EVERY == 0:
+            self.timestamps.append(max(0, min(int(timestamp_ms), 0xFFFFFFFF)))
+        self.count += 1
+
+    def timestamp_before(self, index):
+        """Time of the latest recorded checkpoint at or before move ``index``"""
+        if not self.timestamps:
+            return None
+        return self.timestamps[min(index // TIMESTAMP_EVERY, len(self.timestamps) - 1)]
+
+    def to_path(self):
+        """Moves as a string of U/D/L/R characters"""
+        return ''.join(direction[0].upper() for direction in self)
+
+    def to_bytes(self):
+        return (
+            _HEADER.pack(LOG_VERSION, self.count)
+            + bytes(self.moves)
+            + struct.pack(f'<{len(self.timestamps)}I', *self.timestamps)
+        )
+
+    @classmethod
+    def from_bytes(cls, data):
+        if not data:
+            return cls()
+        data = bytes(data)
+        version, count = _HEADER.unpack_from(data)
+        if version != LOG_VERSION:
+            raise ValueError(f'Unsupported move log version {version}')
+        moves_end = _HEADER.size + (count + 3) // 4
+        checkpoints = (count + TIMESTAMP_EVERY - 1) // TIMESTAMP_EVERY
+        timestamps = array('I', struct.unpack_from(f'<{checkpoints}I', data, moves_end))
+        return cls(count, bytearray(data[_HEADER.size:moves_end]), timestamps)
+
+
+class ReplayState:
+    """Session state after replaying a prefix of a move log"""
+
+    __slots__ = ('step', 'position', 'discovered_mask', 'patterns_found', 'timestamp_ms', 'invalid_at', 'found')
+
+    def __init__(self, position):
+        self.step = 0
+        self.position = position
+        self.discovered_mask = 0
+        self.patterns_found = 0
+        self.timestamp_ms = 0
+        self.invalid_at = None
+        self.found = set()  # Pattern ids, which are chunk keys in infinite mode
+
+    def to_dict(self):
+        return {
+            'step': self.step,
+            'position': {'x': self.position[0], 'y': self.position[1]},
+            'patternsFound': self.patterns_found,
+            'discoveredMask': self.discovered_mask,
+            'timestampMs': self.timestamp_ms,
+            'invalidAt': self.invalid_at,
+        }
+
+
+def iter_replay(layout, log, stop=None):
+    """
+    Replay a move log against its layout, yielding the state after each move.
+    Replay halts at the first move that walks into a wall and flags it in
+    ``invalid_at``, since no honest client can produce one.
+    """
+    state = ReplayState(layout.start)
+    stop = log.count if stop is None else max(0, min(stop, log.count))
+    for index in range(stop):
+        dx, dy = DIRECTIONS[log[index]]
+        x, y = state.position[0] + dx, state.position[1] + dy
+        if not layout.grid.is_open(x, y):
+            state.invalid_at = index
+            yield state
+            return
+
+        state.position = (x, y)
+        state.step = index + 1
+        state.timestamp_ms = log.timestamp_before(index) or 0
+        pattern = layout.pattern_at(x, y)
+        if pattern is not None and pattern['id'] not in state.found:
+            state.found.add(pattern['id'])
+            state.patterns_found += 1
+            if isinstance(pattern['id'], int):
+                state.discovered_mask |= 1 << (pattern['id'] - 1)
+        yield state
+
+
+def replay(layout, log, stop=None):
+    """State after the first ``stop`` moves (all moves by default)"""
+    state = ReplayState(layout.start)
+    for state in iter_replay(layout, log, stop):
+        pass
+    return state
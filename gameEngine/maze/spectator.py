@@ -0,0 +1,207 @@
+"""
+Spectator feeds for running venture races.
+
+Each watched venture gets one feed thread. Every MAZE_SPECTATOR_TICK
+seconds it samples all of the venture's sessions (one query, with
+positions of hot sessions taken from the session store), encodes a
+single compact JSON snapshot and hands that same string to every
+viewer. The cost of a tick depends on the number of players, not on the
+number of viewers, and a feed with no viewers stops ticking.
+
+Snapshot format::
+
+    {"venture": 7, "tick": 42, "status": "running",
+     "columns": ["player", "x", "y", "patterns", "moves", "status"],
+     "players": [["alice", 4, 10, 2, 57, "active"], ...]}
+
+Viewers keep only the newest snapshot, so a slow viewer skips ticks
+instead of building up a backlog.
+"""
+import asyncio
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .store import session_store
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ['player', 'x', 'y', 'patterns', 'moves', 'status']
+
+
+class Snapshot:
+    __slots__ = ('tick', 'payload', 'final')
+
+    def __init__(self, tick, payload, final):
+        self.tick = tick
+        self.payload = payload
+        self.final = final  # The race is over; viewers should disconnect
+
+
+def build_snapshot(venture_id, tick):
+    """Sample every session of a venture into one encoded snapshot"""
+    from gameEngine.models import MazeSession, Venture
+
+    status = Venture.objects.values_list('status', flat=True).filter(pk=venture_id).first()
+    rows = MazeSession.objects.filter(venture_id=venture_id).values_list(
+        'id', 'player__user__username', 'current_position', 'patterns_found', 'moves_made', 'status'
+    )
+
+    players = []
+    for session_id, username, position, patterns_found, moves_made, session_status in rows:
+        # The hot copy is ahead of the row until the next flush
+        hot = session_store.peek(session_id)
+        if hot is not None:
+            position, patterns_found = hot.current_position, hot.patterns_found
+            moves_made, session_status = hot.moves_made, hot.status
+        players.append([
+            username,
+            position.get('x', 0),
+            position.get('y', 0),
+            patterns_found,
+            moves_made,
+            session_status
+        ])
+    players.sort(key=lambda player: (-player[3], player[4]))
+
+    payload = json.dumps({
+        'venture': venture_id,
+        'tick': tick,
+        'status': status,
+        'columns': COLUMNS,
+        'players': players,
+    }, separators=(',', ':'))
+    return Snapshot(tick, payload, status != 'running')
+
+
+class Viewer:
+    """
+    Newest-snapshot mailbox for one spectator. Pass the running event loop
+    for async consumers (websocket, ASGI streaming); without one the viewer
+    blocks a thread in ``wait()``.
+    """
+
+    def __init__(self, loop=None):
+        self.loop = loop
+        self._snapshot = None
+        self._last_tick = None
+        self._ready = asyncio.Event() if loop is not None else threading.Event()
+
+    def deliver(self, snapshot):
+        """Called from the feed thread"""
+        self._snapshot = snapshot
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._ready.set)
+        else:
+            self._ready.set()
+
+    def _take(self):
+        self._ready.clear()
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.tick == self._last_tick:
+            return None
+        self._last_tick = snapshot.tick
+        return snapshot
+
+    async def next(self):
+        while True:
+            await self._ready.wait()
+            snapshot = self._take()
+            if snapshot is not None:
+                return snapshot
+
+    def wait(self, timeout):
+        """Next snapshot, or None if none arrived within ``timeout`` seconds"""
+        if not self._ready.wait(timeout):
+            return None
+        return self._take()
+
+
+class SpectatorFeed:
+    """Tick loop sampling one venture for its current viewers"""
+
+    def __init__(self, hub, venture_id, tick_interval):
+        self.hub = hub
+        self.venture_id = venture_id
+        self.tick_interval = tick_interval
+        self.viewers = set()
+        self.latest = None
+        self.ticks = 0
+        self._wake = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f'maze-spectator-{venture_id}',
+            daemon=True
+        )
+
+    def _run(self):
+        while True:
+            close_old_connections()
+            try:
+                snapshot = build_snapshot(self.venture_id, self.ticks)
+            except Exception as e:
+                logger.error(f"Spectator snapshot failed for venture {self.venture_id}: {e}")
+                snapshot = None
+
+            if snapshot is not None:
+                self.latest = snapshot
+                self.ticks += 1
+                with self.hub._lock:
+                    viewers = list(self.viewers)
+                for viewer in viewers:
+                    viewer.deliver(snapshot)
+
+            if self.hub._retire(self, finished=snapshot is not None and snapshot.final):
+                close_old_connections()
+                return
+            self._wake.wait(self.tick_interval)
+
+
+class SpectatorHub:
+    """Registry of live spectator feeds, one per watched venture"""
+
+    def __init__(self, tick_interval=1.0):
+        self.tick_interval = tick_interval
+        self._feeds = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, venture_id, viewer):
+        with self._lock:
+            feed = self._feeds.get(venture_id)
+            if feed is None:
+                feed = SpectatorFeed(self, venture_id, self.tick_interval)
+                self._feeds[venture_id] = feed
+                feed._thread.start()
+            feed.viewers.add(viewer)
+            latest = feed.latest
+        # Late joiners get the current picture without waiting for a tick
+        if latest is not None:
+            viewer.deliver(latest)
+
+    def unsubscribe(self, venture_id, viewer):
+        with self._lock:
+            feed = self._feeds.get(venture_id)
+            if feed is not None:
+                feed.viewers.discard(viewer)
+
+    def _retire(self, feed, finished):
+        """Drop a feed that has no viewers left or whose race ended; returns True if it should stop"""
+        with self._lock:
+            if not finished and feed.viewers:
+                return False
+            if self._feeds.get(feed.venture_id) is feed:
+                del self._feeds[feed.venture_id]
+            return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'feeds': len(self._feeds),
+                'viewers': sum(len(feed.viewers) for feed in self._feeds.values()),
+            }
+
+
+spectators = SpectatorHub(getattr(settings, 'MAZE_SPECTATOR_TICK', 1.0))
@@ -0,0 +1,222 @@
+"""
+Hot store for active maze sessions.
+
+Active MazeSession instances are kept in process memory while players are
+moving. Moves only mark fields dirty; a write-behind flusher thread
+persists the changed fields of all dirty sessions in batched
+``bulk_update`` calls every MAZE_SESSION_FLUSH_INTERVAL seconds.
+Completions bypass the flusher and are written synchronously.
+
+The store is per process: with several workers, moves for one session
+would land on different in-memory copies and the last flush would win.
+It is therefore only enabled by MAZE_SESSION_HOT_STORE = True, for
+deployments that serve maze sessions from a single process. Otherwise
+every move is loaded from and written straight to the database.
+
+Flushes only touch rows that are still active, so a checkpoint taken
+before a session completed (or was timed out) can never overwrite its
+final state.
+"""
+import atexit
+import copy
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class HotSessionStore:
+    """Process-local cache of active maze sessions with dirty-field tracking"""
+
+    def __init__(self, flush_interval=2.0, batch_size=500, idle_timeout=600, enabled=True):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._dirty = defaultdict(set)
+        self._last_used = {}
+        self._session_locks = defaultdict(threading.RLock)
+        self._lock = threading.RLock()
+        self._flusher = None
+        self._stop = threading.Event()
+        self._flush_hooks = []
+        self.flushed_rows = 0
+        self.flush_count = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, session_id, loader):
+        """Return the hot copy of a session, loading it with ``loader()`` on a miss"""
+        if not self.enabled:
+            return loader()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._last_used[session_id] = time.monotonic()
+                return session
+
+        session = loader()
+        if session is None or session.status != 'active':
+            return session
+
+        with self._lock:
+            # Another request may have loaded it meanwhile; keep the first copy
+            session = self._sessions.setdefault(session_id, session)
+            self._last_used[session_id] = time.monotonic()
+        return session
+
+    def peek(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    @contextmanager
+    def lock(self, session_id):
+        """Serialise moves on one session across request threads"""
+        with self._lock:
+            session_lock = self._session_locks[session_id]
+        with session_lock:
+            yield
+
+    def add_flush_hook(self, callback):
+        """Run ``callback()`` after every flush, e.g. to piggyback other write-behind buffers"""
+        self._flush_hooks.append(callback)
+
+    def mark_dirty(self, session, fields):
+        if not self.enabled:
+            # Write-through: the row is the only copy
+            session.save(update_fields=sorted(fields))
+            self.flushed_rows += 1
+            self._run_hooks()
+            return
+        with self._lock:
+            self._dirty[session.pk].update(fields)
+            self._last_used[session.pk] = time.monotonic()
+        if self.flush_interval <= 0:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def discard(self, session_id):
+        """Drop a session (e.g. once completed) without flushing it"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._dirty.pop(session_id, None)
+            self._last_used.pop(session_id, None)
+            self._session_locks.pop(session_id, None)
+
+    def flush_session(self, session):
+        """Synchronously persist one session's dirty fields"""
+        with self.lock(session.pk):
+            with self._lock:
+                fields = self._dirty.pop(session.pk, None)
+            if fields:
+                session.save(update_fields=sorted(fields))
+                self.flushed_rows += 1
+
+    def flush(self):
+        """Persist every dirty session, one bulk_update per distinct field set"""
+        from gameEngine.models import MazeSession
+
+        with self._lock:
+            dirty, self._dirty = self._dirty, defaultdict(set)
+            sessions = {session_id: self._sessions.get(session_id) for session_id in dirty}
+
+        groups = defaultdict(list)
+        for session_id, fields in dirty.items():
+            session = sessions[session_id]
+            # Completed sessions were written synchronously; their checkpoint is stale
+            if session is not None and session.status == 'active':
+                groups[frozenset(fields)].append(self._snapshot(session, fields))
+
+        for fields, sessions in groups.items():
+            try:
+                # The status filter keeps a snapshot from landing after a completion save
+                MazeSession.objects.filter(status='active').bulk_update(
+                    sessions, sorted(fields), batch_size=self.batch_size
+                )
+                self.flushed_rows += len(sessions)
+            except Exception as e:
+                logger.error(f"Maze session flush failed: {e}")
+                # Put the fields back so the next flush retries them
+                with self._lock:
+                    for session in sessions:
+                        self._dirty[session.pk].update(fields)
+        self.flush_count += 1
+        self._evict_idle()
+        self._run_hooks()
+
+    def _run_hooks(self):
+        for callback in self._flush_hooks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Maze flush hook {callback} failed: {e}")
+
+    def _snapshot(self, session, fields):
+        """Copy the dirty fields under the session lock so a flush never sees half a move"""
+        with self.lock(session.pk):
+            if 'move_log' in fields:
+                session.pack_move_log()
+            snapshot = copy.copy(session)
+            for field in fields:
+                setattr(snapshot, field, copy.deepcopy(getattr(session, field)))
+        return snapshot
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            for session_id, last_used in list(self._last_used.items()):
+                if last_used < cutoff and session_id not in self._dirty:
+                    self._sessions.pop(session_id, None)
+                    self._last_used.pop(session_id, None)
+                    self._session_locks.pop(session_id, None)
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(target=self._run, name='maze-session-flusher', daemon=True)
+            self._flusher.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Maze session flusher error: {e}")
+
+    def stop(self):
+        """Stop the flusher and write out whatever is still dirty"""
+        self._stop.set()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Final maze session flush failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'dirty': len(self._dirty),
+                'flushes': self.flush_count,
+                'flushed_rows': self.flushed_rows,
+            }
+
+
+session_store = HotSessionStore(
+    flush_interval=getattr(settings, 'MAZE_SESSION_FLUSH_INTERVAL', 2.0),
+    batch_size=getattr(settings, 'MAZE_SESSION_FLUSH_BATCH_SIZE', 500),
+    enabled=getattr(settings, 'MAZE_SESSION_HOT_STORE', False),
+)
+atexit.register(session_store.stop)
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameEngine', '0004_remove_venture_token_id'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='venture',
+            name='is_active',
+        ),
+        migrations.AddField(
+            model_name='venture',
+            name='maze_algorithm',
+            field=models.CharField(choices=[('backtracker', 'Backtracker'), ('kruskal', 'Kruskal'), ('prim', 'Prim')], default='backtracker', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameEngine', '0005_venture_maze_algorithm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venture',
+            name='maze_seed',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameEngine', '0006_venture_maze_seed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mazesession',
+            name='last_move_seq',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:39
+
+from django.db import migrations, models
+
+
+def backfill_deadlines(apps, schema_editor):
+    """Give existing sessions their venture's end_time so the sweeper can see them"""
+    MazeSession = apps.get_model('gameEngine', 'MazeSession')
+    Venture = apps.get_model('gameEngine', 'Venture')
+    db_alias = schema_editor.connection.alias
+    MazeSession.objects.using(db_alias).filter(deadline__isnull=True).update(
+        deadline=models.Subquery(
+            Venture.objects.filter(pk=models.OuterRef('venture_id')).values('end_time')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameEngine', '0007_mazesession_last_move_seq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mazesession',
+            name='deadline',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='mazesession',
+            index=models.Index(fields=['status', 'deadline'], name='maze_session_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venture',
+            index=models.Index(fields=['status', 'end_time'], name='venture_status_end_idx'),
+        ),
+        migrations.RunPython(backfill_deadlines, migrations.RunPython.noop),
+    ]
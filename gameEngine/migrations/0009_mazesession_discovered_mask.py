@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:41
+
+from django.db import migrations, models
+
+
+def patterns_to_mask(apps, schema_editor):
+    """Fold the old discovered_patterns lists into pattern id bitmasks"""
+    MazeSession = apps.get_model('gameEngine', 'MazeSession')
+    db_alias = schema_editor.connection.alias
+    sessions = []
+    for session in MazeSession.objects.using(db_alias).exclude(discovered_patterns=[]).only('id', 'discovered_patterns'):
+        mask = 0
+        for pattern in session.discovered_patterns or []:
+            pattern_id = pattern.get('pattern_id') if isinstance(pattern, dict) else None
+            if isinstance(pattern_id, int) and 1 <= pattern_id <= 63:
+                mask |= 1 << (pattern_id - 1)
+        session.discovered_mask = mask
+        sessions.append(session)
+    MazeSession.objects.using(db_alias).bulk_update(sessions, ['discovered_mask'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameEngine', '0008_mazesession_deadline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mazesession',
+            name='discovered_mask',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(patterns_to_mask, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='mazesession',
+            name='discovered_patterns',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameEngine', '0009_mazesession_discovered_mask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mazesession',
+            name='move_log',
+            field=models.BinaryField(default=bytes),
+        ),
+    ]
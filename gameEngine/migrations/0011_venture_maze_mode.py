@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameEngine', '0010_mazesession_move_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mazesession',
+            name='visited_chunks',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='venture',
+            name='maze_mode',
+            field=models.CharField(choices=[('fixed', 'Fixed'), ('infinite', 'Infinite')], default='fixed', max_length=10),
+        ),
+    ]
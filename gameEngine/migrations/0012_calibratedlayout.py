@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameEngine', '0011_venture_maze_mode'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalibratedLayout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seed', models.CharField(max_length=64, unique=True)),
+                ('complexity', models.IntegerField()),
+                ('algorithm', models.CharField(choices=[('backtracker', 'Backtracker'), ('kruskal', 'Kruskal'), ('prim', 'Prim')], max_length=20)),
+                ('required_patterns', models.IntegerField(default=5)),
+                ('solution_length', models.IntegerField()),
+                ('dead_ends', models.IntegerField()),
+                ('branching_factor', models.FloatField()),
+                ('difficulty', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('venture', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='calibrated_layouts', to='gameEngine.venture')),
+            ],
+            options={
+                'db_table': 'calibrated_layouts',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['complexity', 'algorithm', 'required_patterns', 'venture'], name='calibrated_layout_pool_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameEngine', '0012_calibratedlayout'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VentureHeatmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('width', models.IntegerField()),
+                ('height', models.IntegerField()),
+                ('visits', models.BinaryField(default=bytes)),
+                ('dwell_ms', models.BinaryField(default=bytes)),
+                ('total_visits', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('venture', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='heatmap', to='gameEngine.venture')),
+            ],
+            options={
+                'db_table': 'venture_heatmaps',
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:06
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_participant_counts(apps, schema_editor):
+    """Count existing participations once in a single UPDATE"""
+    Venture = apps.get_model('gameEngine', 'Venture')
+    VentureParticipation = apps.get_model('gameEngine', 'VentureParticipation')
+    Venture.objects.using(schema_editor.connection.alias).update(
+        participant_count=Coalesce(
+            models.Subquery(
+                VentureParticipation.objects.filter(venture=models.OuterRef('pk'))
+                .values('venture')
+                .annotate(count=models.Count('pk'))
+                .values('count')[:1]
+            ),
+            0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameEngine', '0013_ventureheatmap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venture',
+            name='participant_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_participant_counts, migrations.RunPython.noop),
+    ]
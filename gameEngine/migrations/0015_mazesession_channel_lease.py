@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameEngine', '0014_venture_participant_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mazesession',
+            name='channel_lease',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
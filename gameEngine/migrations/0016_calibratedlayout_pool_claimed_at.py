@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-19 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameEngine', '0015_mazesession_channel_lease'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='calibratedlayout',
+            name='calibrated_layout_pool_idx',
+        ),
+        migrations.AddIndex(
+            model_name='calibratedlayout',
+            index=models.Index(fields=['complexity', 'algorithm', 'required_patterns', 'claimed_at'], name='calibrated_layout_pool_idx'),
+        ),
+    ]
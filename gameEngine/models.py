@@ -1,12 +1,30 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
+from functools import cached_property
 import uuid
-import random
 import json
+import logging
+
+from .maze.grid import DIRECTIONS
+from .maze.generators import ALGORITHMS
+from .maze.layout import MazeLayout
+from .maze.cache import get_infinite_maze, get_layout
+from .maze.infinite import chunk_of
+from .maze.movelog import MoveLog, replay
+from .maze.leaderboard import leaderboards
+from .maze.heatmap import add_counters, heatmaps, pack_counters, unpack_counters
+from .scheduler import venture_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class VentureJoinError(Exception):
+    """A join was refused; the message is safe to show to the player"""
+
 
 class PlayerProfile(models.Model):
     user = models.OneToOneField(
@@ -229,11 +247,23 @@ class Venture(models.Model):
     # Entry Requirements
     entry_ticket_cost = models.IntegerField(default=1)  # STAR tokens required
     max_participants = models.IntegerField(default=100)
+    participant_count = models.IntegerField(default=0, editable=False)  # Kept in step with participants via signals
     min_level_required = models.IntegerField(default=1)
     
     # Maze Configuration
     maze_complexity = models.IntegerField(default=5)  # 1-10 scale
+    maze_algorithm = models.CharField(
+        max_length=20,
+        choices=[(name, name.title()) for name in ALGORITHMS],
+        default='backtracker'
+    )
+    maze_mode = models.CharField(
+        max_length=10,
+        choices=[('fixed', 'Fixed'), ('infinite', 'Infinite')],
+        default='fixed'
+    )
     maze_time_limit = models.IntegerField(default=3600)  # 1 hour in seconds
+    maze_seed = models.CharField(max_length=64, blank=True, null=True)  # Shared layout for every session
     required_patterns = models.IntegerField(default=5)   # Patterns to find
     
     # Status and Timing
@@ -258,13 +288,22 @@ class Venture(models.Model):
     class Meta:
         db_table = 'ventures'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'end_time'], name='venture_status_end_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.venture_type}) - {self.status}"
     
     @property
     def current_participants(self):
-        return self.participants.count()
+        return self.participant_count
+    
+    def recount_participants(self):
+        """Recompute the denormalized participant counter from the participations table"""
+        self.participant_count = self.participants.count()
+        Venture.objects.filter(pk=self.pk).update(participant_count=self.participant_count)
+        return self.participant_count
     
     @property
     def available_slots(self):
@@ -280,100 +319,152 @@ class Venture(models.Model):
     def is_running(self):
         return self.status == 'running'
     
-    def start_venture(self):
-        """Start the venture maze competition"""
-        if self.status == 'active' and self.current_participants > 0:
-            self.status = 'running'
-            self.start_time = timezone.now()
-            self.end_time = self.start_time + timezone.timedelta(seconds=self.maze_time_limit)
-            self.save()
-            
-            # Create maze sessions for all participants
-            for participant in self.participants.all():
-                MazeSession.objects.create(
-                    player=participant.player,
-                    venture=self,
-                    maze_configuration=self.generate_maze_configuration()
-                )
+    @property
+    def time_remaining(self):
+        """Seconds left on the venture clock (the full limit until it starts)"""
+        if self.status == 'active':
+            return self.maze_time_limit
+        if self.status != 'running' or self.end_time is None:
+            return 0
+        return max(0, int((self.end_time - timezone.now()).total_seconds()))
     
-    def complete_venture(self, winner):
-        """Complete venture and assign CEO"""
-        self.status = 'completed'
-        self.winning_player = winner
-        self.completion_time = timezone.now()
-        self.save()
-        
-        # Make winner CEO
-        winner.is_ceo = True
-        winner.ceo_of_venture = self
-        winner.total_ceo_wins += 1
-        winner.total_equity += self.ceo_equity
-        winner.save()
-        
-        # Distribute participant equity
-        participant_share = self.participant_equity / max(1, self.current_participants)
-        for participation in self.participants.all():
-            participation.equity_earned = participant_share
-            participation.player.total_equity += participant_share
-            participation.player.save()
-            participation.save()
+    def can_spectate(self, user):
+        """Staff, or anyone not racing in this venture; live positions would give the shared maze away"""
+        return user.is_staff or not self.maze_sessions.filter(player__user=user, status='active').exists()
+    
+    def claim_victory(self, winner):
+        """
+        Atomically elect the first finisher as CEO.
         
-        # Mint NFT Badge for CEO
-        NFTBadge.objects.create(
-            player=winner,
-            venture=self,
-            badge_type='ceo',
-            name=f"CEO of {self.name}",
-            description=f"Awarded for winning the {self.name} venture maze",
-            rarity='legendary'
+        A single conditional UPDATE claims winning_player only while it is
+        still empty, so with any number of concurrent finishers exactly one
+        caller gets a row back. No table locks are taken.
+        """
+        completion_time = timezone.now()
+        claimed = Venture.objects.filter(
+            pk=self.pk,
+            status='running',
+            winning_player__isnull=True
+        ).update(
+            status='completed',
+            winning_player=winner,
+            completion_time=completion_time,
+            updated_at=completion_time
+        )
+        if claimed:
+            self.status = 'completed'
+            self.winning_player = winner
+            self.completion_time = completion_time
+        return bool(claimed)
+    
+    def complete_venture(self, winner):
+        """Complete venture and assign CEO; returns False if someone else already won"""
+        with transaction.atomic():
+            if not self.claim_victory(winner):
+                return False
+            
+            # Make winner CEO
+            PlayerProfile.objects.filter(pk=winner.pk).update(
+                is_ceo=True,
+                ceo_of_venture=self,
+                total_ceo_wins=models.F('total_ceo_wins') + 1,
+                total_equity=models.F('total_equity') + self.ceo_equity
+            )
+            self.distribute_participant_equity(winner, self.completion_time)
+            winner.refresh_from_db(fields=['is_ceo', 'ceo_of_venture', 'total_ceo_wins', 'total_equity'])
+            
+            # Mint NFT Badge for CEO (serial number is assigned by the mint signal)
+            NFTBadge.objects.create(
+                player=winner,
+                venture=self,
+                badge_type='ceo',
+                name=f"CEO of {self.name}",
+                description=f"Awarded for winning the {self.name} venture maze",
+                rarity='legendary',
+                serial_number=0
+            )
+        return True
+    
+    def ensure_maze_seed(self):
+        """Pick the venture's shared maze seed once; every session reuses it"""
+        if not self.maze_seed:
+            self.maze_seed = str(uuid.uuid4())
+            Venture.objects.filter(pk=self.pk, maze_seed__isnull=True).update(maze_seed=self.maze_seed)
+            # Another worker may have won the race; use whatever is stored
+            self.maze_seed = Venture.objects.values_list('maze_seed', flat=True).get(pk=self.pk)
+        return self.maze_seed
+    
+    @property
+    def maze_layout(self):
+        """The single layout shared by all of this venture's maze sessions"""
+        return get_layout(
+            self.ensure_maze_seed(),
+            self.maze_complexity,
+            self.maze_algorithm,
+            self.required_patterns
         )
     
     def generate_maze_configuration(self):
-        """Generate unique maze configuration for this venture"""
-        return {
+        """Maze configuration referencing the venture's shared layout"""
+        config = {
             'venture_id': self.id,
             'complexity': self.maze_complexity,
+            'algorithm': self.maze_algorithm,
             'time_limit': self.maze_time_limit,
             'required_patterns': self.required_patterns,
-            'seed': str(uuid.uuid4()),  # Unique seed for this venture's maze
-            'layout': self.generate_maze_layout(),
-            'patterns': self.generate_pattern_locations()
-        }
-    
-    def generate_maze_layout(self):
-        """Generate maze layout based on complexity"""
-        size = 10 + (self.maze_complexity * 2)  # 12x12 to 30x30
-        return {
-            'size': size,
-            'start': {'x': 0, 'y': 0},
-            'end': {'x': size-1, 'y': size-1},
-            'walls': self.generate_walls(size)
+            'seed': self.ensure_maze_seed(),  # Layout is derived from this seed
+            'mode': self.maze_mode,
         }
+        # Warm the layout cache so the first move doesn't pay for generation
+        get_session_layout(config)
+        return config
+    
+    def close_expired(self, now=None):
+        """
+        Close a running venture whose clock ran out without a winner and
+        share the participant equity; returns False if it is not due or was
+        already closed elsewhere.
+        """
+        now = now or timezone.now()
+        with transaction.atomic():
+            closed = Venture.objects.filter(
+                pk=self.pk,
+                status='running',
+                end_time__lte=now,
+                winning_player__isnull=True
+            ).update(status='completed', completion_time=now, updated_at=now)
+            if not closed:
+                return False
+            
+            self.status = 'completed'
+            self.completion_time = now
+            self.distribute_participant_equity(now=now)
+        return True
     
-    def generate_walls(self, size):
-        """Generate random walls for the maze"""
-        walls = []
-        # Simplified wall generation
-        for x in range(size):
-            for y in range(size):
-                if random.random() > 0.7:  # 30% chance of wall
-                    walls.append({'x': x, 'y': y})
-        return walls
-    
-    def generate_pattern_locations(self):
-        """Generate pattern locations throughout the maze"""
-        patterns = []
-        for i in range(self.required_patterns):
-            patterns.append({
-                'id': i + 1,
-                'type': f'pattern_{(i % 5) + 1}',
-                'location': {
-                    'x': random.randint(2, 8),
-                    'y': random.randint(2, 8)
-                },
-                'solution_required': True
-            })
-        return patterns
+    def distribute_participant_equity(self, winner=None, now=None):
+        """
+        Split participant_equity evenly across all participants with a fixed
+        number of set-based UPDATEs, whatever the participant count. Call
+        inside the completing transaction; returns the per-player share.
+        """
+        now = now or timezone.now()
+        participant_count = self.participants.count()
+        participant_share = self.participant_equity / max(1, participant_count)
+        
+        if participant_count:
+            PlayerProfile.objects.filter(venture_participations__venture=self).update(
+                total_equity=models.F('total_equity') + participant_share
+            )
+            self.participants.update(equity_earned=participant_share)
+        
+        is_winner = models.Value(False)
+        if winner is not None:
+            is_winner = models.Case(
+                models.When(player_id=winner.pk, then=models.Value(True)),
+                default=models.Value(False)
+            )
+        PlayerVenture.objects.filter(venture=self).update(completed_at=now, is_winner=is_winner)
+        return participant_share
     
     @property
     def should_start(self):
@@ -440,47 +531,148 @@ class Venture(models.Model):
     
     def start_venture(self):
         """Start the venture maze competition"""
-        print(f"🔍 Attempting to start venture: {self.name}, Status: {self.status}, Participants: {self.current_participants}")
+        if self.status != 'active' or self.current_participants == 0:
+            logger.info("Venture %s not started (status: %s, participants: %s)",
+                        self.name, self.status, self.current_participants)
+            return False
+        
+        start_time = timezone.now()
+        end_time = start_time + timezone.timedelta(seconds=self.maze_time_limit)
         
-        if self.status == 'active' and self.current_participants > 0:
+        with transaction.atomic():
+            # Prefer a pre-generated layout of calibrated difficulty
+            maze_seed = self.maze_seed
+            if not maze_seed and self.maze_mode == 'fixed':
+                maze_seed = CalibratedLayout.claim(self)
+            maze_seed = maze_seed or str(uuid.uuid4())
+            
+            # Only one caller may move the venture from active to running
+            started = Venture.objects.filter(pk=self.pk, status='active').update(
+                status='running',
+                start_time=start_time,
+                end_time=end_time,
+                maze_seed=maze_seed,
+                updated_at=start_time
+            )
+            if not started:
+                transaction.set_rollback(True)  # Hand any claimed layout back to the pool
+                return False
+            
             self.status = 'running'
-            self.start_time = timezone.now()
-            self.end_time = self.start_time + timezone.timedelta(seconds=self.maze_time_limit)
-            self.save()
+            self.start_time = start_time
+            self.end_time = end_time
+            self.maze_seed = maze_seed
             
-            print(f"✅ Venture status changed to: {self.status}")
+            # One layout for the whole venture, generated once
+            maze_config = self.generate_maze_configuration()
+            start_position = session_start_position(maze_config)
+            players = [
+                participation.player
+                for participation in self.participants.select_related('player')
+            ]
             
-            # Create maze sessions for all participants
-            maze_sessions_created = 0
-            for participation in self.participants.all():
-                try:
-                    maze_config = self.generate_maze_configuration()
-                    maze_session = MazeSession.objects.create(
-                        player=participation.player,
-                        venture=self,
-                        maze_configuration=maze_config,
-                        current_position=maze_config['layout']['start']
-                    )
-                    maze_sessions_created += 1
-                    print(f"✅ Created maze session for {participation.player.user.username}")
-                    
-                    # Create activity for participant
-                    Activity.objects.create(
-                        player=participation.player,
-                        activity_type='venture_join',
-                        icon='🎮',
-                        description=f'{self.name} maze competition has started!',
-                        venture=self
+            # Create maze sessions and start activities for all participants in bulk
+            MazeSession.objects.bulk_create([
+                MazeSession(
+                    player=player,
+                    venture=self,
+                    maze_configuration=maze_config,
+                    current_position=start_position,
+                    deadline=end_time
+                )
+                for player in players
+            ])
+            Activity.objects.bulk_create([
+                Activity(
+                    player=player,
+                    activity_type='venture_join',
+                    icon='🎮',
+                    description=f'{self.name} maze competition has started!',
+                    venture=self
+                )
+                for player in players
+            ])
+        
+        logger.info("Venture %s started with %s maze sessions", self.name, len(players))
+        return True
+    
+    def join(self, player):
+        """
+        Enter ``player`` in one transaction built from conditional UPDATEs:
+        tickets are deducted only while the balance covers the cost and a
+        slot is claimed only while participant_count < max_participants,
+        so concurrent joins can neither overfill the venture nor spend the
+        same tickets twice. The contended venture row is written last to
+        keep its lock as short as possible. Raises VentureJoinError.
+        """
+        cost = self.entry_ticket_cost
+        now = timezone.now()
+        with transaction.atomic():
+            paid = PlayerProfile.objects.filter(
+                pk=player.pk,
+                tickets__gte=cost,
+                level__gte=self.min_level_required
+            ).update(
+                tickets=models.F('tickets') - cost,
+                xp=models.F('xp') + 10,
+                total_ventures_joined=models.F('total_ventures_joined') + 1
+            )
+            if not paid:
+                player.refresh_from_db(fields=['tickets', 'level'])
+                if player.level < self.min_level_required:
+                    raise VentureJoinError(
+                        f'Level {self.min_level_required} required to join this venture (Current: {player.level})'
                     )
-                    
-                except Exception as e:
-                    print(f"❌ Failed to create maze session for {participation.player.user.username}: {e}")
+                raise VentureJoinError(f'Not enough tickets. Required: {cost}, You have: {player.tickets}')
             
-            print(f"✅ Created {maze_sessions_created} maze sessions total")
-            return True
+            player.refresh_from_db(fields=['tickets', 'xp', 'level', 'total_ventures_joined'])
+            if player.xp >= player.xp_required_for_next_level:
+                # Rare level-up path: lock the player row and let add_xp apply the rewards
+                player = PlayerProfile.objects.select_for_update().get(pk=player.pk)
+                player.add_xp(0)
+            
+            participation = VentureParticipation(
+                player=player,
+                venture=self,
+                entry_tickets_used=cost,
+                equity_earned=0.0  # Will be calculated when venture completes
+            )
+            participation.slot_reserved = True  # The counter is claimed below, not by the signal
+            try:
+                with transaction.atomic():
+                    participation.save()
+            except IntegrityError:
+                raise VentureJoinError(f'You have already joined {self.name}')
+            
+            PlayerVenture.objects.create(
+                player=player,
+                venture=self,
+                equity_share=self.participant_equity / self.max_participants,
+                initial_investment=cost * 100,
+                current_value=cost * 100
+            )
+            Activity.objects.create(
+                player=player,
+                activity_type='venture_join',
+                icon='⚔️',
+                description=f'Joined venture: {self.name}',
+                venture=self
+            )
+            
+            claimed = Venture.objects.filter(
+                models.Q(start_time__isnull=True) | models.Q(start_time__gt=now),
+                pk=self.pk,
+                status='active',
+                participant_count__lt=models.F('max_participants')
+            ).update(participant_count=models.F('participant_count') + 1)
+            if not claimed:
+                self.refresh_from_db(fields=['status', 'participant_count', 'max_participants'])
+                if self.participant_count >= self.max_participants:
+                    raise VentureJoinError(f'{self.name} is full')
+                raise VentureJoinError(f'{self.name} is not currently accepting new participants')
         
-        print(f"❌ Venture not started. Status: {self.status}, Participants: {self.current_participants}")
-        return False
+        self.participant_count += 1
+        return participation
     
 class VentureParticipation(models.Model):
     """Track player participation in ventures"""
@@ -534,107 +726,374 @@ class MazeSession(models.Model):
     maze_configuration = models.JSONField(default=dict)
     
     # Session data
-    discovered_patterns = models.JSONField(default=list)
+    discovered_mask = models.BigIntegerField(default=0)  # Bit (id - 1) set for each pattern found
+    move_log = models.BinaryField(default=bytes, editable=False)  # Packed 2-bit moves, see maze.movelog
+    visited_chunks = models.JSONField(default=dict)  # Infinite mode: {'cx,cy': 1 if its pattern was found else 0}
     used_hints = models.IntegerField(default=0)
+    last_move_seq = models.IntegerField(default=0)  # Highest client sequence number applied
+    channel_lease = models.DateTimeField(null=True, blank=True)  # A websocket owns the live state until then
     
     # Timestamps
     started_at = models.DateTimeField(auto_now_add=True)
+    deadline = models.DateTimeField(null=True, blank=True)  # Venture end_time when the session started
     completed_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         db_table = 'maze_sessions'
         ordering = ['-started_at']
+        indexes = [
+            # Serves the expiry sweeper's status='active' AND deadline <= now scan
+            models.Index(fields=['status', 'deadline'], name='maze_session_expiry_idx'),
+        ]
     
     def __str__(self):
         return f"{self.player.user.username} - {self.venture.name} ({self.status})"
     
+    @property
+    def time_limit(self):
+        return self.maze_configuration.get('time_limit', 3600)
+    
+    @property
+    def expires_at(self):
+        """Wall-clock moment the session runs out of time"""
+        if self.deadline is not None:
+            return self.deadline
+        started_at = self.started_at or timezone.now()
+        return started_at + timezone.timedelta(seconds=self.time_limit)
+    
+    def elapsed_seconds(self, now=None):
+        """Real seconds spent in the maze, capped at the time limit"""
+        if self.started_at is None:
+            return 0
+        elapsed = int(((now or timezone.now()) - self.started_at).total_seconds())
+        return max(0, min(elapsed, self.time_limit))
+    
     @property
     def is_active(self):
-        return self.status == 'active' and self.time_elapsed < self.maze_configuration.get('time_limit', 3600)
+        return self.status == 'active' and timezone.now() < self.expires_at
+    
+    @property
+    def has_live_channel(self):
+        """A websocket holds the authoritative state; the row may lag it by a checkpoint"""
+        return self.channel_lease is not None and self.channel_lease > timezone.now()
     
     @property
     def time_remaining(self):
-        time_limit = self.maze_configuration.get('time_limit', 3600)
-        return max(0, time_limit - self.time_elapsed)
+        if self.status != 'active':
+            return 0
+        return max(0, int((self.expires_at - timezone.now()).total_seconds()))
+    
+    @classmethod
+    def expire_overdue(cls, now=None):
+        """
+        Time out every active session past its deadline in one UPDATE.
+        Returns the number of sessions expired.
+        """
+        now = now or timezone.now()
+        return cls.objects.filter(status='active', deadline__lte=now).update(
+            status='timeout',
+            completed_at=now,
+            time_elapsed=models.Subquery(
+                Venture.objects.filter(pk=models.OuterRef('venture_id')).values('maze_time_limit')[:1]
+            )
+        )
     
-    def make_move(self, direction):
-        """Process player move in the maze"""
-        if not self.is_active:
+    @cached_property
+    def layout(self):
+        """This session's maze layout, rebuilt from its seed via the layout cache"""
+        return get_session_layout(self.maze_configuration)
+    
+    @property
+    def maze_grid(self):
+        return self.layout.grid
+    
+    def can_move(self, direction):
+        """Check the target cell against the wall bitmap"""
+        if direction not in DIRECTIONS:
             return False
+        dx, dy = DIRECTIONS[direction]
+        return self.maze_grid.is_open(
+            self.current_position.get('x', 0) + dx,
+            self.current_position.get('y', 0) + dy
+        )
+    
+    def apply_move(self, direction):
+        """
+        Apply one move to the in-memory session state without saving.
+        Returns the names of the fields that changed (empty if the move was rejected).
+        """
+        if not self.is_active or not self.can_move(direction):
+            return []
+        changed = ['current_position', 'moves_made', 'time_elapsed', 'move_log']
         
+        now = timezone.now()
         self.moves_made += 1
-        self.time_elapsed = min(
-            self.time_elapsed + 1, 
-            self.maze_configuration.get('time_limit', 3600)
-        )
+        self.time_elapsed = self.elapsed_seconds(now)
+        self.record_move(direction, now)
         
         # Update position based on direction
-        current_x = self.current_position.get('x', 0)
-        current_y = self.current_position.get('y', 0)
+        dx, dy = DIRECTIONS[direction]
+        self.current_position = {
+            'x': self.current_position.get('x', 0) + dx,
+            'y': self.current_position.get('y', 0) + dy
+        }
         
-        if direction == 'up':
-            self.current_position = {'x': current_x, 'y': current_y - 1}
-        elif direction == 'down':
-            self.current_position = {'x': current_x, 'y': current_y + 1}
-        elif direction == 'left':
-            self.current_position = {'x': current_x - 1, 'y': current_y}
-        elif direction == 'right':
-            self.current_position = {'x': current_x + 1, 'y': current_y}
+        if self.is_infinite:
+            return changed + self.visit_chunk(self.current_position['x'], self.current_position['y'])
         
-        # Check for pattern discovery
-        if random.random() > 0.8:  # 20% chance to find pattern
-            self.patterns_found = min(
-                self.patterns_found + 1, 
-                self.maze_configuration.get('required_patterns', 5)
-            )
-            self.discovered_patterns.append({
-                'pattern_id': len(self.discovered_patterns) + 1,
-                'type': f'pattern_{random.randint(1, 5)}',
-                'discovered_at': timezone.now().isoformat()
-            })
+        grid = self.maze_grid
+        heatmaps.record_move(self, grid.width, grid.height, self.current_position['x'], self.current_position['y'])
+        
+        # Discover the pattern placed on the new cell, once
+        pattern = self.layout.pattern_at(self.current_position['x'], self.current_position['y'])
+        if pattern is not None:
+            bit = 1 << (pattern['id'] - 1)
+            if not self.discovered_mask & bit:
+                self.discovered_mask |= bit
+                self.patterns_found += 1
+                changed += ['patterns_found', 'discovered_mask']
+        return changed
+    
+    @property
+    def is_infinite(self):
+        return self.maze_configuration.get('mode') == 'infinite'
+    
+    def visit_chunk(self, x, y):
+        """
+        Infinite mode: note the chunk holding (x, y) and collect its pattern if
+        (x, y) is the pattern cell. Only chunk coordinates are stored, never
+        the chunks themselves. Returns the changed field names.
+        """
+        key = '{},{}'.format(*chunk_of(x, y))
+        changed = []
+        if key not in self.visited_chunks:
+            self.visited_chunks[key] = 0
+            changed.append('visited_chunks')
+        
+        if not self.visited_chunks[key] and self.layout.pattern_at(x, y) is not None:
+            self.visited_chunks[key] = 1
+            self.patterns_found += 1
+            changed += ['patterns_found', 'visited_chunks']
+        return changed
+    
+    @cached_property
+    def move_history(self):
+        """Decoded move_log; moves are appended here and packed back only when the row is written"""
+        return MoveLog.from_bytes(self.move_log)
+    
+    def record_move(self, direction, at):
+        started_at = self.started_at or at
+        self.move_history.append(direction, (at - started_at).total_seconds() * 1000)
+    
+    def pack_move_log(self):
+        """Encode the in-memory move history into move_log ahead of a write"""
+        if 'move_history' in self.__dict__:
+            self.move_log = self.move_history.to_bytes()
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'move_log' in update_fields:
+            self.pack_move_log()
+        super().save(*args, **kwargs)
+    
+    def replay(self, stop=None):
+        """Rebuild the session state after ``stop`` moves from the layout and move log"""
+        return replay(self.layout, self.move_history, stop)
+    
+    @property
+    def discovered_patterns(self):
+        """Layout patterns whose bit is set in discovered_mask, in id order"""
+        if self.is_infinite:
+            return [self.layout.pattern_in(key) for key, found in self.visited_chunks.items() if found]
+        return [
+            pattern for pattern in self.layout.patterns
+            if self.discovered_mask >> (pattern['id'] - 1) & 1
+        ]
+    
+    def make_move(self, direction):
+        """Process player move in the maze"""
+        changed = self.apply_move(direction)
+        if not changed:
+            return False
         
         if self.check_completion():
             self.complete_session(success=True)
-        
-        self.save()
+        else:
+            self.save(update_fields=changed)
         return True
     
     def check_completion(self):
         """Check if player has completed the maze"""
-        config = self.maze_configuration
-        end_pos = config.get('layout', {}).get('end', {})
-        patterns_required = config.get('required_patterns', 5)
+        patterns_required = self.maze_configuration.get('required_patterns', 5)
+        if self.is_infinite:
+            # No exit in an endless world; collecting the patterns wins
+            return self.patterns_found >= patterns_required
         
-        return (self.current_position == end_pos and 
+        end_x, end_y = self.layout.end
+        return (self.current_position == {'x': end_x, 'y': end_y} and
                 self.patterns_found >= patterns_required)
     
+    @property
+    def distance_to_exit(self):
+        """Moves left on the shortest path from the current position"""
+        return self.layout.distance_to_exit(self.current_position['x'], self.current_position['y'])
+    
     def complete_session(self, success=True):
         """Complete the maze session"""
         self.status = 'completed' if success else 'failed'
         self.completed_at = timezone.now()
+        self.time_elapsed = self.elapsed_seconds(self.completed_at)
+        heatmaps.forget(self.pk)
         
         if success:
-            # Check if this player is the first to complete
-            existing_winners = MazeSession.objects.filter(
-                venture=self.venture,
-                status='completed',
-                completed_at__lt=self.completed_at
-            ).exists()
-            
-            if not existing_winners:
-                # This player is the first to complete - they become CEO!
+            with transaction.atomic():
+                self.save()
+                
+                # Record completion for participation
+                VentureParticipation.objects.filter(
+                    player=self.player, 
+                    venture=self.venture
+                ).update(completed_maze=True, completion_time=self.time_elapsed)
+                
+                # The first player to claim the venture becomes CEO
                 self.venture.complete_venture(self.player)
-            
-            # Record completion for participation
-            participation = VentureParticipation.objects.get(
-                player=self.player, 
-                venture=self.venture
-            )
-            participation.completed_maze = True
-            participation.completion_time = self.time_elapsed
-            participation.save()
-        
-        self.save()
+                
+                # Session loaders select player__user, so this costs no query on the hot path
+                username = self.player.user.username
+                transaction.on_commit(lambda: leaderboards.record(self, username))
+        else:
+            self.save()
+
+def get_session_layout(config):
+    """Resolve a maze_configuration to its layout, supporting stored legacy layouts"""
+    if 'layout' in config:
+        return MazeLayout.from_configuration(config)
+    if config.get('mode') == 'infinite':
+        return get_infinite_maze(config['seed'], config.get('algorithm', 'backtracker'))
+    return get_layout(
+        config['seed'],
+        config.get('complexity', 5),
+        config.get('algorithm', 'backtracker'),
+        config.get('required_patterns', 5)
+    )
+
+def session_start_position(config):
+    """Starting cell of a maze_configuration's layout, as stored in current_position"""
+    x, y = get_session_layout(config).start
+    return {'x': x, 'y': y}
+
+class CalibratedLayout(models.Model):
+    """Pre-generated maze seed with measured difficulty, waiting to be used by a venture"""
+    
+    seed = models.CharField(max_length=64, unique=True)
+    complexity = models.IntegerField()
+    algorithm = models.CharField(max_length=20, choices=[(name, name.title()) for name in ALGORITHMS])
+    required_patterns = models.IntegerField(default=5)
+    
+    # Difficulty metrics, see gameEngine.maze.difficulty
+    solution_length = models.IntegerField()
+    dead_ends = models.IntegerField()
+    branching_factor = models.FloatField()
+    difficulty = models.FloatField()
+    
+    venture = models.ForeignKey(
+        Venture,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='calibrated_layouts'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)  # Set once; a layout is never reused, even if its venture is deleted
+    
+    class Meta:
+        db_table = 'calibrated_layouts'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['complexity', 'algorithm', 'required_patterns', 'claimed_at'],
+                name='calibrated_layout_pool_idx'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.algorithm} c{self.complexity} difficulty {self.difficulty:.2f}"
+    
+    @classmethod
+    def claim(cls, venture, attempts=3):
+        """
+        Take an unused layout matching the venture's maze settings.
+        Returns its seed, or None when the pool is empty.
+        """
+        pool = cls.objects.filter(
+            complexity=venture.maze_complexity,
+            algorithm=venture.maze_algorithm,
+            required_patterns=venture.required_patterns,
+            claimed_at__isnull=True
+        )
+        for _ in range(attempts):
+            candidate = pool.values_list('pk', 'seed').first()
+            if candidate is None:
+                return None
+            # Conditional update so two starting ventures never share a layout
+            if cls.objects.filter(pk=candidate[0], claimed_at__isnull=True).update(
+                venture=venture, claimed_at=timezone.now()
+            ):
+                return candidate[1]
+        return None
+    
+    @classmethod
+    def available(cls, complexity, algorithm, required_patterns):
+        return cls.objects.filter(
+            complexity=complexity,
+            algorithm=algorithm,
+            required_patterns=required_patterns,
+            claimed_at__isnull=True
+        ).count()
+
+class VentureHeatmap(models.Model):
+    """Per-cell visit counts and dwell time accumulated over a venture's maze sessions"""
+    
+    venture = models.OneToOneField(Venture, on_delete=models.CASCADE, related_name='heatmap')
+    width = models.IntegerField()
+    height = models.IntegerField()
+    
+    # Row-major little-endian uint32 counters, see gameEngine.maze.heatmap
+    visits = models.BinaryField(default=bytes)
+    dwell_ms = models.BinaryField(default=bytes)
+    total_visits = models.BigIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'venture_heatmaps'
+    
+    def __str__(self):
+        return f"Heatmap for {self.venture.name} ({self.total_visits} visits)"
+    
+    @property
+    def cells(self):
+        return self.width * self.height
+    
+    def add(self, visits, dwell_ms):
+        """Merge a batch of counters into the stored ones"""
+        stored_visits = unpack_counters(self.visits, self.cells)
+        stored_dwell = unpack_counters(self.dwell_ms, self.cells)
+        add_counters(stored_visits, visits)
+        add_counters(stored_dwell, dwell_ms)
+        self.visits = pack_counters(stored_visits)
+        self.dwell_ms = pack_counters(stored_dwell)
+        self.total_visits += sum(visits)
+    
+    def counters(self):
+        """(visits, dwell_ms) including counts this process has not flushed yet"""
+        visits = unpack_counters(self.visits, self.cells)
+        dwell_ms = unpack_counters(self.dwell_ms, self.cells)
+        pending = heatmaps.pending(self.venture_id)
+        if pending is not None and len(pending[0]) == self.cells:
+            add_counters(visits, pending[0])
+            add_counters(dwell_ms, pending[1])
+        return visits, dwell_ms
 
 class NFTBadge(models.Model):
     """NFT badges awarded for achievements"""
@@ -855,6 +1314,28 @@ def create_venture_hcs_topic(sender, instance, created, **kwargs):
             instance.hcs_topic_id = f"0.0.{1000000 + instance.id}"
             instance.save()
 
+@receiver(post_save, sender=Venture)
+def schedule_venture_deadline(sender, instance, **kwargs):
+    """Hand new or changed start/end times to a venture scheduler running in this process"""
+    if venture_scheduler.running:
+        transaction.on_commit(lambda: venture_scheduler.notify(instance))
+
+@receiver(post_save, sender=VentureParticipation)
+def increment_participant_count(sender, instance, created, **kwargs):
+    """Bump the venture's participant counter in SQL so concurrent joins cannot lose updates"""
+    if created and not getattr(instance, 'slot_reserved', False):
+        Venture.objects.filter(pk=instance.venture_id).update(participant_count=models.F('participant_count') + 1)
+        if VentureParticipation.venture.is_cached(instance):
+            instance.venture.participant_count += 1
+
+@receiver(post_delete, sender=VentureParticipation)
+def decrement_participant_count(sender, instance, **kwargs):
+    Venture.objects.filter(pk=instance.venture_id, participant_count__gt=0).update(
+        participant_count=models.F('participant_count') - 1
+    )
+    if VentureParticipation.venture.is_cached(instance):
+        instance.venture.participant_count = max(0, instance.venture.participant_count - 1)
+
 @receiver(post_save, sender=NFTBadge)
 def mint_hedera_nft(sender, instance, created, **kwargs):
     """Mint NFT on Hedera when badge is created"""
@@ -907,25 +1388,26 @@ def distribute_equity_on_hedera(venture, player, equity_amount):
         return None
 
 # Admin function to create demo venture games
-def create_demo_venture_game():
-    """Create a demo venture game for testing"""
+def create_demo_venture_game(**fields):
+    """Create a demo venture game for testing; ``fields`` override the defaults"""
     try:
-        venture = Venture.objects.create(
-            name='Quantum CEO Challenge',
-            venture_type='Technology',
-            icon='🌌',
-            description='First player to escape the quantum maze becomes CEO with 20% equity',
-            status='active',
-            entry_ticket_cost=1,
-            max_participants=10,
-            maze_complexity=5,
-            ceo_equity=20,
-            participant_equity=80,
-            maze_time_limit=1800,  # 30 minutes
-            required_patterns=3,
-            hcs_topic_id=f"0.0.{1000000 + Venture.objects.count()}",
-            token_id=f"0.0.{2000000 + Venture.objects.count()}"
-        )
+        defaults = {
+            'name': 'Quantum CEO Challenge',
+            'venture_type': 'Technology',
+            'icon': '🌌',
+            'description': 'First player to escape the quantum maze becomes CEO with 20% equity',
+            'status': 'active',
+            'entry_ticket_cost': 1,
+            'max_participants': 10,
+            'maze_complexity': 5,
+            'ceo_equity': 20,
+            'participant_equity': 80,
+            'maze_time_limit': 1800,  # 30 minutes
+            'required_patterns': 3,
+            'hcs_topic_id': f"0.0.{1000000 + Venture.objects.count()}",
+        }
+        defaults.update(fields)
+        venture = Venture.objects.create(**defaults)
         return venture
     except Exception as e:
         print(f"Error creating demo venture: {e}")
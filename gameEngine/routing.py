@@ -0,0 +1,22 @@
+import re
+
+from .consumers import MazeSessionSocket, SpectatorSocket
+
+# WebSocket routes, matched against the full request path
+websocket_urlpatterns = [
+    (re.compile(r'^/ws/maze/(?P<session_id>[0-9a-f-]{36})/$'), MazeSessionSocket),
+    (re.compile(r'^/ws/ventures/(?P<venture_id>[0-9]+)/spectate/$'), SpectatorSocket),
+]
+
+
+async def websocket_application(scope, receive, send):
+    """Dispatch an ASGI websocket connection to the matching handler"""
+    for pattern, handler in websocket_urlpatterns:
+        match = pattern.match(scope['path'])
+        if match:
+            await handler(scope, receive, send, **match.groupdict())()
+            return
+
+    # Reject unknown paths before the handshake completes
+    await receive()
+    await send({'type': 'websocket.close', 'code': 4404})
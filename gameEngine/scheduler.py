@@ -0,0 +1,175 @@
+"""
+Event-driven venture scheduler.
+
+Instead of periodically scanning every venture, the scheduler keeps a
+min-heap of (deadline, venture id) entries loaded from indexed queries:
+the start time of active ventures and the end time of running ones. It
+sleeps until the earliest deadline, re-reads that venture and applies
+whatever transition is due:
+
+* active  -> running    at ``start_time`` if it has participants,
+* running -> completed  at ``end_time`` when nobody has won, timing out
+  the remaining maze sessions.
+
+Active ventures without a ``start_time`` are left alone: they stay open
+for joins until started explicitly, rather than starting on the first
+join. Ventures saved in the scheduler's own process are pushed in
+through a post_save signal. Changes made by other processes are picked up
+by a refresh every ``refresh_interval`` seconds that reloads only the
+ventures touched since the previous one.
+"""
+import heapq
+import logging
+import threading
+
+from django.db import close_old_connections, models
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class VentureScheduler:
+    """Min-heap of upcoming venture deadlines with a single worker loop"""
+
+    def __init__(self, refresh_interval=30.0):
+        self.refresh_interval = refresh_interval
+        self.running = False
+        self.fired = 0
+        self._heap = []
+        self._scheduled = {}  # venture_id -> earliest pending deadline
+        self._wake = threading.Condition()
+        self._stop = threading.Event()
+        self._last_refresh = None
+
+    def __len__(self):
+        return len(self._scheduled)
+
+    @staticmethod
+    def deadline_of(venture):
+        """When a venture next needs attention, or None if it does not"""
+        if venture.status == 'active':
+            return venture.start_time
+        if venture.status == 'running' and venture.end_time:
+            return venture.end_time
+        return None
+
+    def schedule(self, venture_id, when):
+        """Queue ``venture_id`` for ``when``; an earlier pending entry wins"""
+        if when is None:
+            return
+        with self._wake:
+            current = self._scheduled.get(venture_id)
+            if current is not None and current <= when:
+                return
+            self._scheduled[venture_id] = when
+            heapq.heappush(self._heap, (when, venture_id))
+            if self._heap[0] == (when, venture_id):
+                self._wake.notify()
+
+    def notify(self, venture):
+        """Signal entry point; a no-op unless the scheduler runs in this process"""
+        if self.running:
+            self.schedule(venture.pk, self.deadline_of(venture))
+
+    def load(self, since=None):
+        """Queue deadlines of every active/running venture, or only those changed since ``since``"""
+        from gameEngine.models import Venture
+
+        ventures = Venture.objects.filter(
+            models.Q(status='active', start_time__isnull=False) |
+            models.Q(status='running', end_time__isnull=False)
+        )
+        if since is not None:
+            ventures = ventures.filter(updated_at__gte=since)
+
+        count = 0
+        for venture in ventures.only('id', 'status', 'start_time', 'end_time'):
+            when = self.deadline_of(venture)
+            if when is not None:
+                self.schedule(venture.pk, when)
+                count += 1
+        return count
+
+    def fire(self, venture_id, now=None):
+        """Apply whatever transition is due for one venture; returns a description or None"""
+        from gameEngine.models import MazeSession, Venture
+
+        now = now or timezone.now()
+        venture = Venture.objects.filter(pk=venture_id).first()
+        if venture is None:
+            return None
+
+        if venture.status == 'active':
+            if venture.start_time is None:
+                return None
+            if venture.start_time > now:
+                self.schedule(venture.pk, venture.start_time)
+            elif venture.check_and_start():
+                self.schedule(venture.pk, venture.end_time)
+                return f'🚀 Started: {venture.name}'
+            return None
+
+        if venture.status == 'running' and venture.end_time:
+            if venture.end_time > now:
+                self.schedule(venture.pk, venture.end_time)
+                return None
+            expired = MazeSession.expire_overdue(now)
+            if venture.close_expired(now):
+                return f'✅ Completed: {venture.name} (timed out {expired} maze sessions)'
+        return None
+
+    def _pop_due(self, now):
+        due = []
+        with self._wake:
+            while self._heap and self._heap[0][0] <= now:
+                when, venture_id = heapq.heappop(self._heap)
+                # Skip entries superseded by an earlier deadline
+                if self._scheduled.get(venture_id) == when:
+                    del self._scheduled[venture_id]
+                    due.append(venture_id)
+        return due
+
+    def run(self, on_event=None):
+        """Serve deadlines until ``stop()``; ``on_event`` receives each transition message"""
+        self.running = True
+        self._stop.clear()
+        self._last_refresh = timezone.now()
+        self.load()
+        try:
+            while not self._stop.is_set():
+                close_old_connections()
+                now = timezone.now()
+
+                if (now - self._last_refresh).total_seconds() >= self.refresh_interval:
+                    # Overlap the window slightly so nothing saved mid-refresh is missed
+                    since = self._last_refresh - timezone.timedelta(seconds=1)
+                    self._last_refresh = now
+                    self.load(since)
+
+                for venture_id in self._pop_due(now):
+                    try:
+                        message = self.fire(venture_id, now)
+                    except Exception as e:
+                        logger.error(f"Scheduler failed on venture {venture_id}: {e}")
+                        message = None
+                    if message:
+                        self.fired += 1
+                        if on_event:
+                            on_event(message)
+
+                with self._wake:
+                    timeout = self.refresh_interval
+                    if self._heap:
+                        timeout = min(timeout, (self._heap[0][0] - timezone.now()).total_seconds())
+                    if timeout > 0 and not self._stop.is_set():
+                        self._wake.wait(timeout)
+        finally:
+            self.running = False
+
+    def stop(self):
+        self._stop.set()
+        with self._wake:
+            self._wake.notify()
+
+
+venture_scheduler = VentureScheduler()
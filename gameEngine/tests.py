@@ -1,3 +1,1438 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .consumers import MazeSessionSocket
+from .maze import minimap
+from .maze.cache import LayoutCache, get_infinite_maze
+from .maze.distance import DistanceField
+from .maze.generators import ALGORITHMS, generate_grid, reachable_cells
+from .maze.grid import DIRECTIONS, MazeGrid
+from .maze.heatmap import heatmaps
+from .maze.infinite import build_chunk, chunk_of
+from .maze.layout import CHUNK_SIZE, build_layout
+from .maze.leaderboard import leaderboards
+from .maze.movelog import TIMESTAMP_EVERY, MoveLog, replay
+from .maze.spectator import COLUMNS, SpectatorHub, Viewer, build_snapshot
+from .maze.store import HotSessionStore
+from .models import (
+    Activity, CalibratedLayout, MazeSession, NFTBadge, PlayerProfile, PlayerVenture, Venture, VentureJoinError,
+    VentureHeatmap, VentureParticipation
+)
+from .scheduler import VentureScheduler
+
+
+def tearDownModule():
+    # The test database is gone by the time the atexit flush would write these
+    heatmaps.discard()
+
+
+def make_open_venture(players=1, **fields):
+    """Active venture with ``players`` participants that has not started yet"""
+    defaults = {
+        'name': 'Test Venture',
+        'venture_type': 'Technology',
+        'icon': '🧪',
+        'description': 'Test venture',
+        'status': 'active',
+        'max_participants': max(players, 1),
+        'maze_complexity': 1,
+    }
+    defaults.update(fields)
+    venture = Venture.objects.create(**defaults)
+    for i in range(players):
+        user = User.objects.create(username=f'{venture.pk}-player{i}')
+        VentureParticipation.objects.create(player=user.playerprofile, venture=venture)
+    return venture
+
+
+def make_running_venture(players=1, **fields):
+    """Started venture with ``players`` participants, one maze session each"""
+    venture = make_open_venture(players, **fields)
+    venture.start_venture()
+    return venture
+
+
+def open_direction(session):
+    return next(direction for direction in DIRECTIONS if session.can_move(direction))
+
+
+class ConcurrentCEOElectionTests(TransactionTestCase):
+    """Hundreds of players reaching the exit at once must crown exactly one CEO"""
+
+    players = 200
+
+    def setUp(self):
+        self.venture = Venture.objects.create(
+            name='Stress Venture',
+            venture_type='Technology',
+            icon='🧪',
+            description='Concurrency stress test',
+            status='active',
+            max_participants=self.players,
+            required_patterns=0,
+            maze_complexity=1,
+        )
+        for i in range(self.players):
+            user = User.objects.create(username=f'racer{i}')
+            VentureParticipation.objects.create(player=user.playerprofile, venture=self.venture)
+        self.assertTrue(self.venture.start_venture())
+
+    def finish(self, session, barrier, errors):
+        try:
+            barrier.wait()
+            for attempt in range(30):
+                try:
+                    session.complete_session(success=True)
+                    return
+                except OperationalError:
+                    # SQLite serialises writers; back off and retry on a fresh connection
+                    connection.close()
+                    time.sleep(random.uniform(0, 0.01 * 2 ** min(attempt, 8)))
+            errors.append(f'{session.pk} never completed')
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    def test_exactly_one_winner_under_concurrent_completions(self):
+        sessions = list(MazeSession.objects.select_related('venture', 'player'))
+        barrier = threading.Barrier(len(sessions))
+        errors = []
+        threads = [
+            threading.Thread(target=self.finish, args=(session, barrier, errors))
+            for session in sessions
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.venture.refresh_from_db()
+        self.assertEqual(self.venture.status, 'completed')
+        self.assertIsNotNone(self.venture.winning_player)
+
+        ceos = PlayerProfile.objects.filter(is_ceo=True)
+        self.assertEqual(list(ceos), [self.venture.winning_player])
+        self.assertEqual(ceos.get().total_ceo_wins, 1)
+        self.assertEqual(NFTBadge.objects.filter(venture=self.venture, badge_type='ceo').count(), 1)
+        self.assertEqual(
+            MazeSession.objects.filter(venture=self.venture, status='completed').count(),
+            self.players
+        )
+
+
+class ClaimVictoryTests(TestCase):
+    def setUp(self):
+        self.venture = Venture.objects.create(
+            name='Claim Venture',
+            venture_type='Technology',
+            icon='🏁',
+            description='Claim test',
+            status='running',
+        )
+        self.first = User.objects.create(username='first').playerprofile
+        self.second = User.objects.create(username='second').playerprofile
+
+    def test_second_claim_is_rejected(self):
+        self.assertTrue(self.venture.claim_victory(self.first))
+        self.assertFalse(Venture.objects.get(pk=self.venture.pk).claim_victory(self.second))
+        self.venture.refresh_from_db()
+        self.assertEqual(self.venture.winning_player, self.first)
+
+    def test_no_claim_after_timeout_completion(self):
+        Venture.objects.filter(pk=self.venture.pk).update(status='completed')
+        self.assertFalse(self.venture.claim_victory(self.first))
+
+
+class HotSessionStoreTests(TestCase):
+    def setUp(self):
+        self.venture = make_running_venture()
+        self.session_id = MazeSession.objects.get(venture=self.venture).pk
+        self.store = HotSessionStore(flush_interval=3600, enabled=True)
+        self.addCleanup(self.store.stop)
+
+    def load(self):
+        return MazeSession.objects.filter(pk=self.session_id).first()
+
+    def move(self, session):
+        with self.store.lock(session.pk):
+            self.store.mark_dirty(session, session.apply_move(open_direction(session)))
+
+    def test_moves_are_written_on_flush(self):
+        session = self.store.get(self.session_id, self.load)
+        self.move(session)
+        self.assertIs(self.store.get(self.session_id, self.load), session)
+        self.assertEqual(self.load().moves_made, 0)
+
+        self.store.flush()
+        stored = self.load()
+        self.assertEqual(stored.moves_made, 1)
+        self.assertEqual(stored.current_position, session.current_position)
+
+    def test_flush_never_overwrites_a_completed_session(self):
+        session = self.store.get(self.session_id, self.load)
+        self.move(session)
+        # Completion is saved synchronously while the dirty checkpoint is still queued
+        MazeSession.objects.filter(pk=self.session_id).update(status='completed', moves_made=42)
+
+        self.store.flush()
+        stored = self.load()
+        self.assertEqual(stored.status, 'completed')
+        self.assertEqual(stored.moves_made, 42)
+
+    def test_disabled_store_writes_through(self):
+        store = HotSessionStore(enabled=False)
+        session = store.get(self.session_id, self.load)
+        with store.lock(session.pk):
+            store.mark_dirty(session, session.apply_move(open_direction(session)))
+
+        self.assertEqual(self.load().moves_made, 1)
+        self.assertIsNot(store.get(self.session_id, self.load), session)
+        self.assertIsNone(store.peek(self.session_id))
+
+
+class MazeGridTests(TestCase):
+    def test_walls_round_trip_through_base64(self):
+        grid = MazeGrid(7, 5)
+        grid.set_wall(0, 0)
+        grid.set_wall(6, 4)
+        grid.set_wall(3, 2)
+        grid.set_wall(3, 2, False)
+
+        copy = MazeGrid.from_base64(grid.to_base64(), 7, 5)
+        self.assertEqual(copy, grid)
+        self.assertTrue(copy.is_wall(0, 0))
+        self.assertTrue(copy.is_wall(6, 4))
+        self.assertFalse(copy.is_wall(3, 2))
+        self.assertEqual(copy.wall_count(), 2)
+
+    def test_out_of_bounds_cells_are_walls(self):
+        grid = MazeGrid(3)
+        self.assertTrue(grid.is_wall(-1, 0))
+        self.assertTrue(grid.is_wall(0, 3))
+        self.assertEqual([(x, y) for _, x, y in grid.neighbors(0, 0)], [(0, 1), (1, 0)])
+
+    def test_fill_leaves_padding_bits_clear(self):
+        grid = MazeGrid(3)
+        grid.fill(wall=True)
+        self.assertEqual(grid.wall_count(), 9)
+        self.assertEqual(list(grid.open_cells()), [])
+
+    def test_legacy_wall_list_layout(self):
+        grid = MazeGrid.from_layout({'size': 4, 'walls': [{'x': 1, 'y': 1}, {'x': 9, 'y': 9}]})
+        self.assertEqual(grid.wall_count(), 1)
+        self.assertTrue(grid.is_wall(1, 1))
+
+
+class MazeGeneratorTests(TestCase):
+    """Every algorithm must carve a perfect, solvable maze and be reproducible from its seed"""
+
+    def test_every_open_cell_is_reachable_and_the_exit_is_solvable(self):
+        for algorithm in ALGORITHMS:
+            for size in (9, 10, 21):
+                with self.subTest(algorithm=algorithm, size=size):
+                    grid = generate_grid(size, algorithm, random.Random(size))
+                    reachable = set(reachable_cells(grid, (0, 0)))
+                    self.assertIn((size - 1, size - 1), reachable)
+                    self.assertEqual(reachable, set(grid.open_cells()))
+
+    def test_layout_is_deterministic_per_seed(self):
+        for algorithm in ALGORITHMS:
+            with self.subTest(algorithm=algorithm):
+                first = build_layout('seed-a', 4, algorithm, required_patterns=5)
+                again = build_layout('seed-a', 4, algorithm, required_patterns=5)
+                other = build_layout('seed-b', 4, algorithm, required_patterns=5)
+                self.assertEqual(first.grid, again.grid)
+                self.assertEqual(first.patterns, again.patterns)
+                self.assertNotEqual(first.grid, other.grid)
+
+    def test_patterns_sit_on_reachable_cells(self):
+        layout = build_layout('patterns', 6, 'prim', required_patterns=8)
+        reachable = set(reachable_cells(layout.grid, layout.start))
+        self.assertEqual(len(layout.patterns), 8)
+        for pattern in layout.patterns:
+            cell = (pattern['location']['x'], pattern['location']['y'])
+            self.assertIn(cell, reachable)
+            self.assertNotIn(cell, (layout.start, layout.end))
+
+    def test_unknown_algorithm_is_rejected(self):
+        with self.assertRaises(ValueError):
+            generate_grid(9, 'wilson')
+
+
+class MoveBatchTests(TestCase):
+    def setUp(self):
+        self.venture = make_running_venture()
+        self.session = MazeSession.objects.get(venture=self.venture)
+        self.client.force_login(self.session.player.user)
+        self.url = f'/api/game/maze/{self.session.pk}/moves/'
+
+    def post(self, moves):
+        return self.client.post(self.url, {'moves': moves}, content_type='application/json').json()
+
+    def move(self, seq, direction):
+        return {'seq': seq, 'ts': int(time.time() * 1000), 'direction': direction}
+
+    def test_resent_batch_is_not_applied_twice(self):
+        batch = [self.move(1, open_direction(self.session))]
+        first = self.post(batch)
+        self.assertEqual(first['applied'], 1)
+        self.assertEqual(first['lastSeq'], 1)
+
+        resent = self.post(batch)
+        self.assertTrue(resent['success'])
+        self.assertEqual(resent['applied'], 0)
+        self.assertIsNone(resent['firstRejected'])
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.moves_made, 1)
+        self.assertEqual(self.session.last_move_seq, 1)
+
+    def test_batch_stops_at_the_first_wall(self):
+        blocked = next(d for d in DIRECTIONS if not self.session.can_move(d))
+        result = self.post([
+            self.move(1, blocked),
+            self.move(2, open_direction(self.session)),
+        ])
+        self.assertEqual(result['applied'], 0)
+        self.assertEqual(result['firstRejected'], 0)
+        self.assertEqual(result['rejectReason'], 'Blocked by a wall')
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.moves_made, 0)
+        self.assertEqual(self.session.last_move_seq, 0)
+
+    def test_expired_session_is_not_reported_as_a_wall(self):
+        MazeSession.objects.filter(pk=self.session.pk).update(deadline=timezone.now())
+        result = self.post([self.move(1, open_direction(self.session))])
+        self.assertEqual(result['applied'], 0)
+        self.assertEqual(result['rejectReason'], 'Maze session is not active')
+
+        single = self.client.post(
+            f'/api/game/maze/{self.session.pk}/move/',
+            {'direction': open_direction(self.session)},
+            content_type='application/json'
+        ).json()
+        self.assertFalse(single['success'])
+        self.assertEqual(single['error'], 'Maze session is not active')
+
+
+class MoveLogTests(TestCase):
+    def test_round_trip_through_bytes(self):
+        rng = random.Random(7)
+        log = MoveLog()
+        directions = [rng.choice(list(DIRECTIONS)) for _ in range(TIMESTAMP_EVERY * 2 + 5)]
+        for index, direction in enumerate(directions):
+            log.append(direction, index * 250)
+
+        decoded = MoveLog.from_bytes(log.to_bytes())
+        self.assertEqual(list(decoded), directions)
+        self.assertEqual(list(decoded.timestamps), [0, TIMESTAMP_EVERY * 250, TIMESTAMP_EVERY * 2 * 250])
+        self.assertEqual(decoded.timestamp_before(TIMESTAMP_EVERY + 3), TIMESTAMP_EVERY * 250)
+        self.assertEqual(len(MoveLog.from_bytes(b'')), 0)
+
+    def test_replay_matches_the_live_session(self):
+        venture = make_running_venture()
+        session = MazeSession.objects.get(venture=venture)
+        rng = random.Random(3)
+        for _ in range(60):
+            session.apply_move(rng.choice([d for d in DIRECTIONS if session.can_move(d)]))
+        session.save()
+
+        stored = MazeSession.objects.get(pk=session.pk)
+        state = stored.replay()
+        self.assertIsNone(state.invalid_at)
+        self.assertEqual(state.step, 60)
+        self.assertEqual(state.position, (session.current_position['x'], session.current_position['y']))
+        self.assertEqual(state.patterns_found, session.patterns_found)
+        self.assertEqual(state.discovered_mask, session.discovered_mask)
+        self.assertEqual(stored.replay(stop=0).position, stored.layout.start)
+
+    def test_log_is_packed_only_when_the_row_is_written(self):
+        venture = make_running_venture()
+        session = MazeSession.objects.get(venture=venture)
+        directions = []
+        for _ in range(5):
+            direction = open_direction(session)
+            directions.append(direction)
+            session.apply_move(direction)
+        self.assertEqual(bytes(session.move_log), b'')
+
+        session.save(update_fields=['moves_made'])
+        self.assertEqual(bytes(session.move_log), b'')
+        session.save(update_fields=['moves_made', 'move_log'])
+        self.assertEqual(list(MazeSession.objects.get(pk=session.pk).move_history), directions)
+
+        store = HotSessionStore(flush_interval=3600, enabled=True)
+        self.addCleanup(store.stop)
+        hot = store.get(session.pk, lambda: MazeSession.objects.get(pk=session.pk))
+        with store.lock(hot.pk):
+            store.mark_dirty(hot, hot.apply_move(open_direction(hot)))
+        store.flush()
+        self.assertEqual(len(MazeSession.objects.get(pk=session.pk).move_history), 6)
+
+    def test_replay_flags_a_move_into_a_wall(self):
+        layout = build_layout('walls', 1, 'backtracker', required_patterns=0)
+        x, y = layout.start
+        blocked = next(
+            direction for direction, (dx, dy) in DIRECTIONS.items()
+            if not layout.grid.is_open(x + dx, y + dy)
+        )
+        log = MoveLog()
+        log.append(blocked, 0)
+        state = replay(layout, log)
+        self.assertEqual(state.invalid_at, 0)
+        self.assertEqual(state.position, layout.start)
+
+
+class InfiniteMazeTests(TestCase):
+    def test_chunks_are_rebuilt_identically(self):
+        for cx, cy in ((0, 0), (-1, 0), (3, -7)):
+            first = build_chunk('world', 'prim', cx, cy)
+            again = build_chunk('world', 'prim', cx, cy)
+            self.assertEqual(first.grid, again.grid)
+            self.assertEqual(first.pattern, again.pattern)
+
+    def test_chunk_of_floors_negative_coordinates(self):
+        self.assertEqual(chunk_of(0, 0), (0, 0))
+        self.assertEqual(chunk_of(CHUNK_SIZE - 1, CHUNK_SIZE), (0, 1))
+        self.assertEqual(chunk_of(-1, -1), (-1, -1))
+        self.assertEqual(chunk_of(-CHUNK_SIZE, -CHUNK_SIZE - 1), (-1, -2))
+
+    def test_world_is_connected_across_negative_chunks(self):
+        maze = get_infinite_maze('connected', 'backtracker')
+        low, high = -2 * CHUNK_SIZE, 2 * CHUNK_SIZE
+
+        seen = {maze.start}
+        frontier = [maze.start]
+        while frontier:
+            x, y = frontier.pop()
+            for _, nx, ny in maze.grid.neighbors(x, y):
+                if low <= nx < high and low <= ny < high and (nx, ny) not in seen:
+                    seen.add((nx, ny))
+                    frontier.append((nx, ny))
+
+        open_cells = {
+            (x, y) for y in range(low, high) for x in range(low, high)
+            if maze.grid.is_open(x, y)
+        }
+        self.assertEqual(seen, open_cells)
+        self.assertIn((-2 * CHUNK_SIZE, -2 * CHUNK_SIZE), seen)
+
+    def test_patterns_lie_inside_their_chunk(self):
+        maze = get_infinite_maze('patterns', 'prim')
+        for cx in range(-3, 3):
+            for cy in range(-3, 3):
+                pattern = maze.chunk(cx, cy).pattern
+                if pattern is None:
+                    continue
+                x, y = pattern['location']['x'], pattern['location']['y']
+                self.assertEqual(chunk_of(x, y), (cx, cy))
+                self.assertIs(maze.pattern_at(x, y), pattern)
+                self.assertTrue(maze.grid.is_open(x, y))
+
+
+class EquityDistributionTests(TestCase):
+    players = 3
+
+    def setUp(self):
+        self.venture = Venture.objects.create(
+            name='Equity Venture',
+            venture_type='Technology',
+            icon='💰',
+            description='Equity test',
+            status='active',
+            max_participants=self.players,
+            maze_complexity=1,
+            ceo_equity=25.0,
+            participant_equity=75.0,
+        )
+        self.profiles = []
+        for i in range(self.players):
+            profile = User.objects.create(username=f'investor{i}').playerprofile
+            self.venture.join(profile)
+            self.profiles.append(profile)
+        self.assertTrue(self.venture.start_venture())
+        self.share = 75.0 / self.players
+
+    def equity(self, profile):
+        return PlayerProfile.objects.values_list('total_equity', flat=True).get(pk=profile.pk)
+
+    def test_winner_gets_ceo_equity_plus_a_share(self):
+        winner = self.profiles[0]
+        self.assertTrue(self.venture.complete_venture(winner))
+
+        self.assertAlmostEqual(self.equity(winner), 25.0 + self.share)
+        for profile in self.profiles[1:]:
+            self.assertAlmostEqual(self.equity(profile), self.share)
+        earned = VentureParticipation.objects.filter(venture=self.venture).values_list('equity_earned', flat=True)
+        self.assertAlmostEqual(sum(earned), 75.0)
+
+        relations = PlayerVenture.objects.filter(venture=self.venture)
+        self.assertEqual(list(relations.filter(is_winner=True).values_list('player', flat=True)), [winner.pk])
+        self.assertFalse(relations.filter(completed_at__isnull=True).exists())
+
+    def test_timed_out_venture_shares_equity_without_a_winner(self):
+        now = timezone.now()
+        Venture.objects.filter(pk=self.venture.pk).update(end_time=now)
+        self.venture.end_time = now
+        self.assertTrue(self.venture.close_expired(now))
+        self.assertFalse(self.venture.close_expired(now))
+
+        for profile in self.profiles:
+            self.assertAlmostEqual(self.equity(profile), self.share)
+        relations = PlayerVenture.objects.filter(venture=self.venture)
+        self.assertFalse(relations.filter(is_winner=True).exists())
+        self.assertEqual(relations.filter(completed_at=now).count(), self.players)
+
+
+class ParticipantCountTests(TestCase):
+    def setUp(self):
+        self.venture = Venture.objects.create(
+            name='Counter Venture',
+            venture_type='Technology',
+            icon='🔢',
+            description='Counter test',
+            status='active',
+            max_participants=5,
+        )
+        self.profiles = [User.objects.create(username=f'counter{i}').playerprofile for i in range(3)]
+
+    def stored_count(self):
+        return Venture.objects.values_list('participant_count', flat=True).get(pk=self.venture.pk)
+
+    def test_counter_follows_created_and_deleted_participations(self):
+        participations = [
+            VentureParticipation.objects.create(player=profile, venture=self.venture)
+            for profile in self.profiles
+        ]
+        self.assertEqual(self.stored_count(), 3)
+        self.assertEqual(self.venture.participant_count, 3)
+
+        participations[0].delete()
+        self.assertEqual(self.stored_count(), 2)
+        self.venture.participants.all().delete()
+        self.assertEqual(self.stored_count(), 0)
+
+    def test_join_claims_its_slot_only_once(self):
+        self.venture.join(self.profiles[0])
+        self.assertEqual(self.stored_count(), 1)
+        self.assertEqual(self.venture.available_slots, 4)
+
+    def test_recount_repairs_a_drifted_counter(self):
+        VentureParticipation.objects.create(player=self.profiles[0], venture=self.venture)
+        Venture.objects.filter(pk=self.venture.pk).update(participant_count=9)
+        self.assertEqual(self.venture.recount_participants(), 1)
+        self.assertEqual(self.stored_count(), 1)
+
+
+class ConcurrentJoinTests(TransactionTestCase):
+    """A burst of joins must never overfill a venture or charge a rejected player"""
+
+    players = 40
+    slots = 10
+
+    def setUp(self):
+        self.venture = Venture.objects.create(
+            name='Crowded Venture',
+            venture_type='Technology',
+            icon='🚪',
+            description='Concurrent join test',
+            status='active',
+            max_participants=self.slots,
+        )
+        self.profiles = [User.objects.create(username=f'joiner{i}').playerprofile for i in range(self.players)]
+
+    def join(self, profile, barrier, admitted, errors):
+        try:
+            barrier.wait()
+            for attempt in range(30):
+                try:
+                    Venture.objects.get(pk=self.venture.pk).join(profile)
+                    admitted.append(profile.pk)
+                    return
+                except VentureJoinError:
+                    return
+                except OperationalError:
+                    # SQLite serialises writers; back off and retry on a fresh connection
+                    connection.close()
+                    time.sleep(random.uniform(0, 0.01 * 2 ** min(attempt, 8)))
+            errors.append(f'{profile.pk} never finished joining')
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    def test_joins_never_exceed_max_participants(self):
+        barrier = threading.Barrier(self.players)
+        admitted, errors = [], []
+        threads = [
+            threading.Thread(target=self.join, args=(profile, barrier, admitted, errors))
+            for profile in self.profiles
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(admitted), self.slots)
+        self.venture.refresh_from_db()
+        self.assertEqual(self.venture.participant_count, self.slots)
+        self.assertEqual(
+            sorted(self.venture.participants.values_list('player', flat=True)),
+            sorted(admitted)
+        )
+        charged = PlayerProfile.objects.filter(tickets__lt=5).values_list('pk', flat=True)
+        self.assertEqual(sorted(charged), sorted(admitted))
+
+    def test_second_join_is_rejected_and_refunded(self):
+        profile = self.profiles[0]
+        self.venture.join(profile)
+        with self.assertRaises(VentureJoinError):
+            self.venture.join(profile)
+
+        profile.refresh_from_db()
+        self.assertEqual(profile.tickets, 4)
+        self.assertEqual(Venture.objects.get(pk=self.venture.pk).participant_count, 1)
+
+
+class LayoutCacheTests(TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LayoutCache(maxsize=2)
+        builds = []
+
+        def get(key):
+            return cache.get_or_build(key, lambda: builds.append(key) or key.upper())
+
+        self.assertEqual(get('a'), 'A')
+        get('b')
+        get('a')  # 'b' is now the least recently used
+        get('c')
+        get('a')
+        get('b')
+
+        self.assertEqual(builds, ['a', 'b', 'c', 'b'])
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (2, 4, 2))
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['hit_rate'], 2 / 6)
+
+    def test_layouts_rebuild_identically_from_their_seed(self):
+        cache = LayoutCache()
+        first = cache.get_or_build('seed', lambda: build_layout('seed', 3))
+        cache.clear()
+        again = cache.get_or_build('seed', lambda: build_layout('seed', 3))
+        self.assertIsNot(first, again)
+        self.assertEqual(first.etag, again.etag)
+        self.assertEqual(first.grid, again.grid)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+
+class SharedLayoutTests(TestCase):
+    def test_every_session_uses_the_venture_layout(self):
+        venture = make_running_venture(players=3)
+        sessions = list(MazeSession.objects.filter(venture=venture))
+        layout = venture.maze_layout
+
+        self.assertEqual({session.maze_configuration['seed'] for session in sessions}, {venture.maze_seed})
+        for session in sessions:
+            self.assertIs(session.layout, layout)
+            self.assertEqual(session.current_position, {'x': layout.start[0], 'y': layout.start[1]})
+
+    def test_late_session_joins_the_same_layout(self):
+        venture = make_running_venture()
+        user = User.objects.create(username='latecomer')
+        VentureParticipation.objects.create(player=user.playerprofile, venture=venture)
+        self.client.force_login(user)
+
+        maze = self.client.get(f'/api/game/ventures/{venture.pk}/maze/').json()['maze']
+        self.assertEqual(maze['layoutEtag'], venture.maze_layout.etag)
+        start = venture.maze_layout.start
+        self.assertEqual(maze['currentPosition'], {'x': start[0], 'y': start[1]})
+
+
+class BulkSessionCreationTests(TestCase):
+    def start(self, players):
+        venture = Venture.objects.create(
+            name=f'Bulk Venture {players}',
+            venture_type='Technology',
+            icon='📦',
+            description='Bulk start test',
+            status='active',
+            max_participants=players,
+            maze_complexity=1,
+        )
+        for i in range(players):
+            user = User.objects.create(username=f'{venture.pk}-bulk{i}')
+            VentureParticipation.objects.create(player=user.playerprofile, venture=venture)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(venture.start_venture())
+        return venture, len(queries)
+
+    def test_start_cost_does_not_grow_with_participants(self):
+        small, small_queries = self.start(2)
+        large, large_queries = self.start(12)
+        self.assertEqual(small_queries, large_queries)
+
+        self.assertEqual(MazeSession.objects.filter(venture=large, status='active').count(), 12)
+        self.assertEqual(Activity.objects.filter(venture=large, activity_type='venture_join').count(), 12)
+        self.assertFalse(MazeSession.objects.filter(venture=large).exclude(deadline=large.end_time).exists())
+
+    def test_venture_starts_only_once(self):
+        venture, _ = self.start(2)
+        self.assertFalse(Venture.objects.get(pk=venture.pk).start_venture())
+        self.assertEqual(MazeSession.objects.filter(venture=venture).count(), 2)
+
+
+class MazeSocketTests(TransactionTestCase):
+    """With the hot store off, a socket leases its session and checkpoints it itself"""
+
+    def setUp(self):
+        self.venture = make_running_venture()
+        self.session = MazeSession.objects.select_related('player__user').get(venture=self.venture)
+        self.client.force_login(self.session.player.user)
+        cookie = f'{settings.SESSION_COOKIE_NAME}={self.client.cookies[settings.SESSION_COOKIE_NAME].value}'
+        self.scope = {'type': 'websocket', 'headers': [(b'cookie', cookie.encode())]}
+        self.incoming = asyncio.Queue()
+        self.outgoing = asyncio.Queue()
+
+    def stored(self):
+        return MazeSession.objects.get(pk=self.session.pk)
+
+    def http_move(self):
+        return self.client.post(
+            f'/api/game/maze/{self.session.pk}/move/',
+            {'direction': open_direction(self.stored())},
+            content_type='application/json'
+        )
+
+    async def event(self):
+        message = await asyncio.wait_for(self.outgoing.get(), 5)
+        return json.loads(message['text']) if message['type'] == 'websocket.send' else message
+
+    async def connect(self):
+        socket = MazeSessionSocket(self.scope, self.incoming.get, self.outgoing.put, str(self.session.pk))
+        task = asyncio.ensure_future(socket())
+        await self.incoming.put({'type': 'websocket.connect'})
+        self.assertEqual((await self.event())['type'], 'websocket.accept')
+        self.assertEqual((await self.event())['event'], 'state')
+        return task
+
+    async def move(self):
+        direction = open_direction(self.session)
+        frame = json.dumps({'type': 'move', 'direction': direction})
+        await self.incoming.put({'type': 'websocket.receive', 'text': frame})
+        self.assertEqual((await self.event())['event'], 'position')
+
+    async def test_leased_session_is_checkpointed_on_disconnect(self):
+        with mock.patch('gameEngine.consumers.CHECKPOINT_INTERVAL', 3600):
+            task = await self.connect()
+            self.assertTrue((await sync_to_async(self.stored)()).has_live_channel)
+            self.assertEqual((await sync_to_async(self.http_move)()).status_code, 409)
+
+            await self.move()
+            self.assertEqual((await sync_to_async(self.stored)()).moves_made, 0)
+
+            await self.incoming.put({'type': 'websocket.disconnect'})
+            await task
+
+        stored = await sync_to_async(self.stored)()
+        self.assertEqual(stored.moves_made, 1)
+        self.assertEqual(len(stored.move_history), 1)
+        self.assertIsNone(stored.channel_lease)
+        self.assertEqual((await sync_to_async(self.http_move)()).json()['movesMade'], 2)
+
+    async def test_moves_are_checkpointed_on_an_interval(self):
+        with mock.patch('gameEngine.consumers.CHECKPOINT_INTERVAL', 0.05):
+            task = await self.connect()
+            await self.move()
+            await asyncio.sleep(0.3)
+            stored = await sync_to_async(self.stored)()
+            self.assertEqual(stored.moves_made, 1)
+            self.assertTrue(stored.has_live_channel)
+
+            await self.incoming.put({'type': 'websocket.disconnect'})
+            await task
+
+    async def test_second_socket_is_refused_while_leased(self):
+        with mock.patch('gameEngine.consumers.CHECKPOINT_INTERVAL', 3600):
+            task = await self.connect()
+            second_incoming = asyncio.Queue()
+            second = MazeSessionSocket(self.scope, second_incoming.get, self.outgoing.put, str(self.session.pk))
+            await second_incoming.put({'type': 'websocket.connect'})
+            await second()
+            self.assertEqual(await self.event(), {'type': 'websocket.close', 'code': 4403})
+
+            await self.incoming.put({'type': 'websocket.disconnect'})
+            await task
+
+
+def bfs_distance(grid, start, end):
+    """Independent shortest-path length for checking distance fields"""
+    seen = {start: 0}
+    frontier = [start]
+    while frontier:
+        next_frontier = []
+        for x, y in frontier:
+            for dx, dy in DIRECTIONS.values():
+                cell = (x + dx, y + dy)
+                if cell not in seen and grid.is_open(*cell):
+                    seen[cell] = seen[(x, y)] + 1
+                    next_frontier.append(cell)
+        frontier = next_frontier
+    return seen.get(end)
+
+
+class SpectatorFeedTests(TransactionTestCase):
+    """Feeds sample the database from their own thread, so rows must be committed"""
+
+    def setUp(self):
+        self.venture = make_running_venture(players=2)
+        self.hub = SpectatorHub(tick_interval=0.02)
+        self.viewers = []
+        self.addCleanup(self.stop_feeds)
+
+    def stop_feeds(self):
+        feeds = list(self.hub._feeds.values())
+        for viewer in self.viewers:
+            self.hub.unsubscribe(self.venture.pk, viewer)
+        for feed in feeds:
+            feed._wake.set()
+            feed._thread.join(5)
+
+    def watch(self):
+        viewer = Viewer()
+        self.viewers.append(viewer)
+        self.hub.subscribe(self.venture.pk, viewer)
+        return viewer
+
+    def next_snapshot(self, viewer):
+        snapshot = viewer.wait(5)
+        self.assertIsNotNone(snapshot)
+        return snapshot
+
+    def test_viewers_share_one_feed_and_snapshot(self):
+        self.hub.tick_interval = 60  # One tick only
+        first, second = self.watch(), self.watch()
+        self.assertEqual(self.hub.stats(), {'feeds': 1, 'viewers': 2})
+
+        snapshot = self.next_snapshot(first)
+        self.assertIs(self.next_snapshot(second), snapshot)
+        payload = json.loads(snapshot.payload)
+        self.assertEqual(payload['venture'], self.venture.pk)
+        self.assertEqual(payload['status'], 'running')
+        self.assertEqual(payload['columns'], COLUMNS)
+        self.assertEqual(len(payload['players']), 2)
+        self.assertFalse(snapshot.final)
+
+        # A late joiner gets the current picture straight away
+        late = Viewer()
+        self.viewers.append(late)
+        self.hub.subscribe(self.venture.pk, late)
+        self.assertIsNotNone(late.wait(0))
+
+    def test_feed_retires_when_the_last_viewer_leaves(self):
+        viewer = self.watch()
+        self.next_snapshot(viewer)
+        feed = self.hub._feeds[self.venture.pk]
+
+        self.hub.unsubscribe(self.venture.pk, viewer)
+        feed._thread.join(5)
+        self.assertFalse(feed._thread.is_alive())
+        self.assertEqual(self.hub.stats(), {'feeds': 0, 'viewers': 0})
+
+        # Watching again starts a fresh feed
+        self.watch()
+        self.assertIsNot(self.hub._feeds[self.venture.pk], feed)
+
+    def test_feed_sends_a_final_snapshot_and_retires_when_the_race_ends(self):
+        viewer = self.watch()
+        self.next_snapshot(viewer)
+        feed = self.hub._feeds[self.venture.pk]
+
+        Venture.objects.filter(pk=self.venture.pk).update(status='completed')
+        snapshot = self.next_snapshot(viewer)
+        while not snapshot.final:
+            snapshot = self.next_snapshot(viewer)
+        self.assertEqual(json.loads(snapshot.payload)['status'], 'completed')
+
+        feed._thread.join(5)
+        self.assertFalse(feed._thread.is_alive())
+        self.assertNotIn(self.venture.pk, self.hub._feeds)
+
+    def test_snapshot_prefers_hot_session_state(self):
+        session = MazeSession.objects.filter(venture=self.venture).first()
+        session.current_position = {'x': 5, 'y': 7}
+        session.moves_made = 40
+        session.patterns_found = 2
+        with mock.patch('gameEngine.maze.spectator.session_store.peek', lambda pk: session if pk == session.pk else None):
+            payload = json.loads(build_snapshot(self.venture.pk, 3).payload)
+        self.assertEqual(payload['tick'], 3)
+        self.assertEqual(payload['players'][0], [session.player.user.username, 5, 7, 2, 40, 'active'])
+
+
+class DistanceFieldTests(TestCase):
+    def test_distances_match_breadth_first_search(self):
+        for algorithm in ALGORITHMS:
+            with self.subTest(algorithm=algorithm):
+                layout = build_layout('distance', 3, algorithm, required_patterns=0)
+                self.assertEqual(layout.distance_to_exit(*layout.end), 0)
+                self.assertEqual(layout.min_moves, bfs_distance(layout.grid, layout.start, layout.end))
+                self.assertIsNone(layout.optimal_next_step(*layout.end))
+
+    def test_following_next_step_reaches_the_exit(self):
+        layout = build_layout('follow', 4, 'kruskal', required_patterns=0)
+        x, y = layout.start
+        for _ in range(layout.min_moves):
+            dx, dy = DIRECTIONS[layout.optimal_next_step(x, y)]
+            x, y = x + dx, y + dy
+            self.assertTrue(layout.grid.is_open(x, y))
+        self.assertEqual((x, y), layout.end)
+
+    def test_walls_and_out_of_bounds_cells_have_no_distance(self):
+        grid = MazeGrid(3)
+        grid.set_wall(1, 0)
+        field = DistanceField.compute(grid, (0, 0))
+        self.assertIsNone(field.distance(1, 0))
+        self.assertIsNone(field.distance(-1, 0))
+        self.assertEqual(field.distance(2, 0), 4)
+
+    def test_hint_points_to_a_legal_neighbour(self):
+        venture = make_running_venture()
+        session = MazeSession.objects.get(venture=venture)
+        self.client.force_login(session.player.user)
+
+        hint = self.client.post(f'/api/game/maze/{session.pk}/hint/').json()
+        self.assertTrue(hint['success'])
+        self.assertTrue(session.can_move(hint['direction']))
+        self.assertEqual(hint['distanceToExit'], session.layout.min_moves)
+        dx, dy = DIRECTIONS[hint['direction']]
+        x, y = session.layout.start
+        self.assertEqual(session.layout.distance_to_exit(x + dx, y + dy), hint['distanceToExit'] - 1)
+        self.assertEqual(MazeSession.objects.get(pk=session.pk).used_hints, 1)
+
+
+class SessionTimingTests(TestCase):
+    def setUp(self):
+        self.venture = make_running_venture(players=2, maze_time_limit=60)
+        self.overdue, self.current = MazeSession.objects.filter(venture=self.venture)
+
+    def test_overdue_sessions_time_out_at_the_limit(self):
+        now = timezone.now()
+        MazeSession.objects.filter(pk=self.overdue.pk).update(
+            deadline=now - timezone.timedelta(seconds=1),
+            started_at=now - timezone.timedelta(seconds=600)
+        )
+        self.assertEqual(MazeSession.expire_overdue(now), 1)
+        self.assertEqual(MazeSession.expire_overdue(now), 0)
+
+        expired = MazeSession.objects.get(pk=self.overdue.pk)
+        self.assertEqual(expired.status, 'timeout')
+        self.assertEqual(expired.time_elapsed, 60)
+        self.assertEqual(expired.completed_at, now)
+        self.assertEqual(expired.time_remaining, 0)
+        self.assertEqual(MazeSession.objects.get(pk=self.current.pk).status, 'active')
+
+    def test_elapsed_time_follows_the_wall_clock(self):
+        session = self.current
+        self.assertEqual(session.elapsed_seconds(session.started_at + timezone.timedelta(seconds=25)), 25)
+        self.assertEqual(session.elapsed_seconds(session.started_at + timezone.timedelta(hours=1)), 60)
+        self.assertFalse(MazeSession(
+            status='active',
+            started_at=timezone.now() - timezone.timedelta(seconds=61),
+            maze_configuration={'time_limit': 60}
+        ).is_active)
+
+    def test_venture_time_remaining(self):
+        self.assertAlmostEqual(self.venture.time_remaining, 60, delta=2)
+
+        open_venture = Venture(status='active', maze_time_limit=90)
+        self.assertEqual(open_venture.time_remaining, 90)
+
+        self.venture.end_time = timezone.now() - timezone.timedelta(seconds=5)
+        self.assertEqual(self.venture.time_remaining, 0)
+        self.venture.status = 'completed'
+        self.assertEqual(self.venture.time_remaining, 0)
+
+
+class HeatmapFlushTests(TestCase):
+    def setUp(self):
+        heatmaps.discard()
+        self.addCleanup(heatmaps.discard)
+        self.venture = make_running_venture()
+        self.session = MazeSession.objects.get(venture=self.venture)
+        self.grid = self.session.maze_grid
+
+    def index(self):
+        return self.session.current_position['y'] * self.grid.width + self.session.current_position['x']
+
+    def test_moves_are_counted_in_memory_until_flushed(self):
+        with mock.patch('gameEngine.maze.heatmap.time.monotonic', side_effect=[100.0, 100.25]):
+            self.session.apply_move(open_direction(self.session))
+            first = self.index()
+            self.session.apply_move(open_direction(self.session))
+        second = self.index()
+        self.assertFalse(VentureHeatmap.objects.filter(venture=self.venture).exists())
+
+        visits, dwell = heatmaps.pending(self.venture.pk)
+        self.assertEqual(sum(visits), 2)
+        self.assertEqual(visits[second], 1)
+        self.assertEqual(dwell[first], 250)
+
+        heatmaps.flush()
+        self.assertIsNone(heatmaps.pending(self.venture.pk))
+        heatmap = VentureHeatmap.objects.get(venture=self.venture)
+        self.assertEqual((heatmap.width, heatmap.height), (self.grid.width, self.grid.height))
+        self.assertEqual(heatmap.total_visits, 2)
+        self.assertEqual(heatmap.counters()[1][first], 250)
+
+    def test_flushes_merge_into_the_stored_row(self):
+        self.session.apply_move(open_direction(self.session))
+        heatmaps.flush()
+        self.session.apply_move(open_direction(self.session))
+
+        heatmap = VentureHeatmap.objects.get(venture=self.venture)
+        self.assertEqual(heatmap.total_visits, 1)
+        self.assertEqual(sum(heatmap.counters()[0]), 2)  # stored plus pending
+
+        heatmaps.flush()
+        heatmap.refresh_from_db()
+        self.assertEqual(heatmap.total_visits, 2)
+        self.assertEqual(sum(heatmap.counters()[0]), 2)
+
+    def test_failed_flush_keeps_the_counters(self):
+        self.session.apply_move(open_direction(self.session))
+        with mock.patch.object(VentureHeatmap, 'save', side_effect=OperationalError('database is locked')), \
+                self.assertLogs('gameEngine.maze.heatmap', 'ERROR'):
+            heatmaps.flush()
+        self.assertEqual(sum(heatmaps.pending(self.venture.pk)[0]), 1)
+
+        self.session.apply_move(open_direction(self.session))
+        heatmaps.flush()
+        self.assertEqual(VentureHeatmap.objects.get(venture=self.venture).total_visits, 2)
+
+    def test_nothing_is_written_after_discard(self):
+        self.session.apply_move(open_direction(self.session))
+        heatmaps.discard()
+        with self.assertNumQueries(0):
+            heatmaps.flush()
+        self.assertFalse(VentureHeatmap.objects.filter(venture=self.venture).exists())
+
+
+class PatternDiscoveryTests(TestCase):
+    def setUp(self):
+        self.venture = make_running_venture(required_patterns=3)
+        self.session = MazeSession.objects.get(venture=self.venture)
+        self.layout = self.session.layout
+
+    def walk_to(self, cell):
+        field = DistanceField.compute(self.layout.grid, cell)
+        position = self.session.current_position
+        while (position['x'], position['y']) != cell:
+            self.assertTrue(self.session.apply_move(field.next_step(position['x'], position['y'])))
+            position = self.session.current_position
+
+    def test_each_pattern_sets_its_bit_once(self):
+        pattern = self.layout.patterns[1]
+        cell = (pattern['location']['x'], pattern['location']['y'])
+        self.assertIs(self.layout.pattern_at(*cell), pattern)
+
+        self.walk_to(cell)
+        mask, found = self.session.discovered_mask, self.session.patterns_found
+        self.assertTrue(mask & 1 << (pattern['id'] - 1))
+        self.assertEqual(bin(mask).count('1'), found)
+        self.assertIn(pattern, self.session.discovered_patterns)
+
+        # Leave and come back: the bit is already set
+        self.session.apply_move(open_direction(self.session))
+        self.walk_to(cell)
+        self.assertEqual(self.session.discovered_mask, mask)
+        self.assertEqual(self.session.patterns_found, found)
+
+    def test_all_patterns_fill_the_mask(self):
+        for pattern in self.layout.patterns:
+            self.walk_to((pattern['location']['x'], pattern['location']['y']))
+        self.assertEqual(self.session.patterns_found, 3)
+        self.assertEqual(self.session.discovered_mask, 0b111)
+        self.assertEqual(self.session.discovered_patterns, self.layout.patterns)
+
+
+class MazeDeliveryTests(TestCase):
+    def setUp(self):
+        self.venture = make_running_venture(maze_complexity=10)
+        self.session = MazeSession.objects.get(venture=self.venture)
+        self.layout = self.session.layout
+        self.client.force_login(self.session.player.user)
+
+    def get_maze(self, **params):
+        return self.client.get(f'/api/game/ventures/{self.venture.pk}/maze/', params)
+
+    def get_chunk(self, cx, cy, **headers):
+        return self.client.get(f'/api/game/maze/{self.session.pk}/chunks/{cx}/{cy}/', {'encoding': 'rle'}, **headers)
+
+    def test_grid_encodings_round_trip(self):
+        grid = self.layout.grid
+        self.assertEqual(MazeGrid.from_rle(grid.to_rle(), grid.width), grid)
+        self.assertEqual(MazeGrid.from_base64(grid.to_base64(), grid.width), grid)
+
+    def test_viewport_is_clipped_around_the_player(self):
+        response = self.get_maze(viewport=3, encoding='rle')
+        maze = response.json()['maze']
+        region = maze['mazeLayout']['region']
+        x, y = self.layout.start
+        x0, y0 = max(0, x - 3), max(0, y - 3)
+        width = min(self.layout.size, x + 4) - x0
+        height = min(self.layout.size, y + 4) - y0
+        self.assertEqual((region['x'], region['y'], region['width'], region['height']), (x0, y0, width, height))
+        self.assertEqual(
+            MazeGrid.from_rle(region['grid'], width, height),
+            self.layout.grid.region(x0, y0, width, height)
+        )
+        self.assertEqual(response['ETag'], f'"{maze["layoutEtag"]}"')
+
+    def test_known_layout_is_omitted(self):
+        maze = self.get_maze(layoutEtag=self.layout.etag).json()['maze']
+        self.assertIsNone(maze['mazeLayout'])
+        self.assertEqual(maze['layoutEtag'], self.layout.etag)
+
+    def test_chunks_are_bounded_and_revalidated(self):
+        response = self.get_chunk(0, 0)
+        chunk = response.json()['chunk']
+        self.assertEqual(
+            MazeGrid.from_rle(chunk['grid'], chunk['width'], chunk['height']),
+            self.layout.grid.region(0, 0, chunk['width'], chunk['height'])
+        )
+
+        not_modified = self.get_chunk(0, 0, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+        edge = self.layout.chunks_per_side
+        self.assertEqual(self.get_chunk(edge - 1, edge - 1).status_code, 200)
+        self.assertEqual(self.get_chunk(edge, 0).status_code, 404)
+        self.assertEqual(self.get_chunk(-1, 0).status_code, 404)
+
+
+class MinimapTests(TestCase):
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_dir = cache_dir.name
+        self.settings = override_settings(MAZE_MINIMAP_CACHE_DIR=self.cache_dir)
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+        self.venture = make_running_venture(maze_complexity=3)
+        self.session = MazeSession.objects.get(venture=self.venture)
+        self.layout = self.session.layout
+        self.client.force_login(self.session.player.user)
+
+    def open_image(self, png):
+        from PIL import Image
+        return Image.open(io.BytesIO(png))
+
+    def test_base_image_is_rendered_once_and_read_back(self):
+        render = mock.Mock(wraps=minimap._render)
+        with mock.patch.object(minimap, '_render', render):
+            first = minimap.minimap_png(self.layout, 2)
+            again = minimap.minimap_png(self.layout, 2)
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first, again)
+
+        cached = list(Path(self.cache_dir).rglob('*.png'))
+        self.assertEqual([path.name for path in cached], [f'{self.layout.etag}-2.png'])
+        self.assertEqual(cached[0].read_bytes(), first)
+        self.assertEqual(list(Path(self.cache_dir).rglob('*.tmp')), [])
+
+        image = self.open_image(first)
+        grid = self.layout.grid
+        self.assertEqual(image.size, (grid.width * 2, grid.height * 2))
+        (x, y), (ex, ey) = self.layout.start, self.layout.end
+        self.assertEqual(image.getpixel((x * 2, y * 2)), minimap.START)
+        self.assertEqual(image.getpixel((ex * 2, ey * 2)), minimap.END)
+
+    def test_unwritable_cache_still_renders(self):
+        blocker = Path(self.cache_dir) / 'file'
+        blocker.write_bytes(b'')
+        with override_settings(MAZE_MINIMAP_CACHE_DIR=blocker), self.assertLogs('gameEngine.maze.minimap', 'WARNING'):
+            png = minimap.minimap_png(self.layout, 1)
+        self.assertEqual(self.open_image(png).size, (self.layout.grid.width, self.layout.grid.height))
+
+    def test_player_marker_is_drawn_on_a_copy(self):
+        base = minimap.minimap_png(self.layout, 3)
+        x, y = self.layout.start
+        marked = self.open_image(minimap.minimap_with_player(self.layout, 3, (x, y)))
+        self.assertEqual(marked.getpixel((x * 3 + 1, y * 3 + 1)), minimap.PLAYER)
+        self.assertEqual(minimap.minimap_png(self.layout, 3), base)
+
+    def test_view_serves_the_cached_image(self):
+        url = f'/api/game/ventures/{self.venture.pk}/minimap.png'
+        response = self.client.get(url, {'scale': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, minimap.minimap_png(self.layout, 2))
+        self.assertEqual(response['ETag'], f'"{self.layout.etag}-2"')
+
+        response = self.client.get(url, {'scale': 2}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(url, {'scale': 2, 'player': '1'})
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        self.assertNotIn('ETag', response)
+        x, y = self.layout.start
+        self.assertEqual(self.open_image(response.content).getpixel((x * 2, y * 2)), minimap.PLAYER)
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.venture = make_running_venture(players=4)
+        self.sessions = list(MazeSession.objects.select_related('player__user').filter(venture=self.venture))
+        leaderboards.invalidate()
+        self.addCleanup(leaderboards.invalidate)
+
+    def ordered(self):
+        """Finishers as the database orders them"""
+        return list(
+            MazeSession.objects.filter(venture=self.venture, status='completed')
+            .order_by('completed_at', 'id')
+            .values_list('player_id', flat=True)
+        )
+
+    def assertMatchesDatabase(self, board):
+        expected = self.ordered()
+        self.assertEqual([entry.player_id for entry in board.top(10)], expected)
+        for rank, player_id in enumerate(expected, 1):
+            self.assertEqual(board.rank_of(player_id), rank)
+
+    def test_completions_are_inserted_in_finishing_order(self):
+        board = leaderboards.get(self.venture.pk)
+        for session in reversed(self.sessions[1:]):
+            with self.captureOnCommitCallbacks(execute=True):
+                session.complete_session(success=True)
+
+        self.assertIs(leaderboards.get(self.venture.pk), board)
+        self.assertEqual(len(board), 3)
+        self.assertMatchesDatabase(board)
+        self.assertIsNone(board.rank_of(self.sessions[0].player_id))
+        self.assertEqual(board.entry_of(self.sessions[-1].player_id).username, self.sessions[-1].player.user.username)
+
+    def test_ties_and_rebuilds_match_order_by(self):
+        for session in self.sessions:
+            session.complete_session(success=True)
+        stale = leaderboards.get(self.venture.pk)
+        self.assertMatchesDatabase(stale)
+
+        # Another worker's view of the finish: three players tie exactly
+        tied = timezone.now()
+        MazeSession.objects.filter(pk__in=[s.pk for s in self.sessions[:3]]).update(completed_at=tied)
+        self.assertIs(leaderboards.get(self.venture.pk), stale)
+        with mock.patch.object(leaderboards, 'ttl', 0):
+            rebuilt = leaderboards.get(self.venture.pk)
+        self.assertIsNot(rebuilt, stale)
+        self.assertMatchesDatabase(rebuilt)
+
+
+class CalibratedLayoutClaimTests(TransactionTestCase):
+    """Starting ventures race for pre-generated layouts; each layout may be used once"""
+
+    ventures = 12
+    layouts = 5
+
+    def setUp(self):
+        CalibratedLayout.objects.bulk_create([
+            CalibratedLayout(
+                seed=f'calibrated-{i}',
+                complexity=1,
+                algorithm='backtracker',
+                required_patterns=5,
+                solution_length=10,
+                dead_ends=2,
+                branching_factor=1.0,
+                difficulty=1.0
+            )
+            for i in range(self.layouts)
+        ])
+
+    def make_venture(self, i):
+        return Venture.objects.create(
+            name=f'Pool Venture {i}',
+            venture_type='Technology',
+            icon='🎲',
+            description='Layout pool test',
+            maze_complexity=1,
+        )
+
+    def claim(self, venture, barrier, seeds, errors):
+        try:
+            barrier.wait()
+            for attempt in range(30):
+                try:
+                    seeds.append(CalibratedLayout.claim(venture, attempts=self.layouts))
+                    return
+                except OperationalError:
+                    # SQLite serialises writers; back off and retry on a fresh connection
+                    connection.close()
+                    time.sleep(random.uniform(0, 0.01 * 2 ** min(attempt, 8)))
+            errors.append(f'{venture.pk} never claimed')
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    def test_concurrent_claims_never_share_a_layout(self):
+        ventures = [self.make_venture(i) for i in range(self.ventures)]
+        barrier = threading.Barrier(len(ventures))
+        seeds, errors = [], []
+        threads = [
+            threading.Thread(target=self.claim, args=(venture, barrier, seeds, errors))
+            for venture in ventures
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        claimed = [seed for seed in seeds if seed is not None]
+        self.assertEqual(len(claimed), len(set(claimed)))
+        self.assertEqual(len(claimed), CalibratedLayout.objects.filter(claimed_at__isnull=False).count())
+        self.assertLessEqual(len(claimed), self.layouts)
+
+    def test_deleting_a_venture_does_not_recycle_its_layout(self):
+        venture = self.make_venture(0)
+        seed = CalibratedLayout.claim(venture)
+        self.assertIsNotNone(seed)
+        venture.delete()
+
+        self.assertEqual(CalibratedLayout.available(1, 'backtracker', 5), self.layouts - 1)
+        other = self.make_venture(1)
+        for _ in range(self.layouts - 1):
+            self.assertNotEqual(CalibratedLayout.claim(other), seed)
+        self.assertIsNone(CalibratedLayout.claim(other))
+
+
+class VentureSchedulerTests(TestCase):
+    def setUp(self):
+        self.scheduler = VentureScheduler()
+        self.now = timezone.now()
+
+    def later(self, seconds):
+        return self.now + timezone.timedelta(seconds=seconds)
+
+    def test_deadlines_pop_in_order_and_earlier_entries_win(self):
+        self.scheduler.schedule(1, self.later(30))
+        self.scheduler.schedule(2, self.later(10))
+        self.scheduler.schedule(3, self.later(20))
+        self.scheduler.schedule(3, self.later(5))    # Supersedes the 20s entry
+        self.scheduler.schedule(2, self.later(40))   # Later than the pending entry; ignored
+        self.scheduler.schedule(4, None)
+        self.assertEqual(len(self.scheduler), 3)
+
+        self.assertEqual(self.scheduler._pop_due(self.now), [])
+        self.assertEqual(self.scheduler._pop_due(self.later(25)), [3, 2])
+        self.assertEqual(self.scheduler._pop_due(self.later(60)), [1])
+        self.assertEqual(len(self.scheduler), 0)
+        self.assertEqual(self.scheduler._heap, [])
+
+    def test_active_ventures_without_start_time_are_never_scheduled(self):
+        open_venture = make_open_venture()
+        timed = make_open_venture(start_time=self.later(60))
+        running = make_running_venture()
+
+        self.assertIsNone(VentureScheduler.deadline_of(open_venture))
+        self.assertEqual(self.scheduler.load(), 2)
+        self.assertEqual(self.scheduler._scheduled, {timed.pk: timed.start_time, running.pk: running.end_time})
+
+        self.assertIsNone(self.scheduler.fire(open_venture.pk, self.later(3600)))
+        open_venture.refresh_from_db()
+        self.assertEqual(open_venture.status, 'active')
+        self.assertNotIn(open_venture.pk, self.scheduler._scheduled)
+
+    def test_refresh_only_reloads_recently_changed_ventures(self):
+        stale = make_open_venture(start_time=self.later(60))
+        Venture.objects.filter(pk=stale.pk).update(updated_at=self.later(-120))
+        fresh = make_open_venture(start_time=self.later(90))
+
+        self.assertEqual(self.scheduler.load(since=self.later(-60)), 1)
+        self.assertEqual(list(self.scheduler._scheduled), [fresh.pk])
+
+    def test_fire_starts_an_overdue_venture_and_queues_its_end(self):
+        venture = make_open_venture(start_time=self.later(-5))
+        self.assertEqual(self.scheduler.fire(venture.pk, self.now), f'🚀 Started: {venture.name}')
+
+        venture.refresh_from_db()
+        self.assertEqual(venture.status, 'running')
+        self.assertEqual(MazeSession.objects.filter(venture=venture).count(), 1)
+        self.assertEqual(self.scheduler._scheduled, {venture.pk: venture.end_time})
+
+    def test_fire_requeues_a_start_that_is_not_due(self):
+        venture = make_open_venture(start_time=self.later(60))
+        self.assertIsNone(self.scheduler.fire(venture.pk, self.now))
+        venture.refresh_from_db()
+        self.assertEqual(venture.status, 'active')
+        self.assertEqual(self.scheduler._scheduled, {venture.pk: venture.start_time})
+
+    def test_fire_closes_an_overdue_venture_and_times_out_its_sessions(self):
+        venture = make_running_venture(players=2)
+        Venture.objects.filter(pk=venture.pk).update(end_time=self.later(-1))
+        MazeSession.objects.filter(venture=venture).update(deadline=self.later(-1))
+
+        message = self.scheduler.fire(venture.pk, self.now)
+        self.assertEqual(message, f'✅ Completed: {venture.name} (timed out 2 maze sessions)')
+        venture.refresh_from_db()
+        self.assertEqual(venture.status, 'completed')
+        self.assertEqual(set(MazeSession.objects.filter(venture=venture).values_list('status', flat=True)), {'timeout'})
+        self.assertIsNone(self.scheduler.fire(venture.pk, self.now))
+
+    def test_fire_requeues_an_end_that_is_not_due(self):
+        venture = make_running_venture()
+        self.assertIsNone(self.scheduler.fire(venture.pk, self.now))
+        self.assertEqual(self.scheduler._scheduled, {venture.pk: venture.end_time})
+        self.assertEqual(Venture.objects.get(pk=venture.pk).status, 'running')
+
+
+class VentureSchedulerLoopTests(TransactionTestCase):
+    """The worker loop reads from its own thread, so rows must be committed"""
+
+    def test_refresh_picks_up_ventures_saved_by_other_processes(self):
+        # A private scheduler: post_save only reaches the process-wide one,
+        # so this venture can only arrive through the refresh
+        scheduler = VentureScheduler(refresh_interval=0.05)
+        loads = []
+        load = scheduler.load
+        scheduler.load = lambda since=None: loads.append(since) or load(since)
+        events = []
+        worker = threading.Thread(target=scheduler.run, kwargs={'on_event': events.append})
+        worker.start()
+        self.addCleanup(worker.join, 5)
+        self.addCleanup(scheduler.stop)
+
+        deadline = time.monotonic() + 5
+        while not loads and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIsNone(loads[0])  # The initial full load has run
+
+        venture = make_open_venture(start_time=timezone.now() - timezone.timedelta(seconds=1))
+        while not events and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        self.assertEqual(events, [f'🚀 Started: {venture.name}'])
+        self.assertEqual(Venture.objects.get(pk=venture.pk).status, 'running')
+        self.assertIn(venture.pk, scheduler._scheduled)  # Now waiting for its end_time
+        self.assertIsNotNone(loads[-1])
@@ -1,6 +1,20 @@
-from django.urls import path
+from django.urls import path, register_converter
 from . import views
 
+
+class SignedIntConverter:
+    """Like <int:...> but also matches negatives (infinite-maze chunk coordinates)"""
+    regex = '-?[0-9]+'
+
+    def to_python(self, value):
+        return int(value)
+
+    def to_url(self, value):
+        return str(value)
+
+
+register_converter(SignedIntConverter, 'sint')
+
 urlpatterns = [
     # Template rendering URLs
     path('', views.landing_page, name='landing'),
@@ -29,7 +43,16 @@ urlpatterns = [
     path('api/game/ventures/active/', views.get_active_venture_games, name='active_venture_games'),
     path('api/game/ventures/<int:venture_id>/join/', views.api_join_venture, name='api_join_venture'),
     path('api/game/ventures/<int:venture_id>/maze/', views.get_venture_maze, name='get_venture_maze'),
+    path('api/game/maze/<uuid:session_id>/chunks/<sint:cx>/<sint:cy>/', views.get_maze_chunk, name='get_maze_chunk'),
     path('api/game/maze/<uuid:session_id>/move/', views.make_maze_move, name='make_maze_move'),
+    path('api/game/maze/<uuid:session_id>/moves/', views.make_maze_moves, name='make_maze_moves'),
+    path('api/game/maze/<uuid:session_id>/hint/', views.get_maze_hint, name='get_maze_hint'),
+    path('api/game/maze/<uuid:session_id>/replay/', views.get_maze_replay, name='get_maze_replay'),
     path('api/game/ventures/<int:venture_id>/leaderboard/', views.venture_game_leaderboard, name='venture_game_leaderboard'),
+    path('api/game/ventures/<int:venture_id>/minimap.png', views.venture_minimap, name='venture_minimap'),
+    path('api/game/ventures/<int:venture_id>/spectate/', views.venture_spectate, name='venture_spectate'),
+    path('api/game/ventures/<int:venture_id>/heatmap/', views.venture_heatmap, name='venture_heatmap'),
+    path('api/game/ventures/<int:venture_id>/heatmap.png', views.venture_heatmap_png, name='venture_heatmap_png'),
     path('api/ventures/<int:venture_id>/start/', views.api_start_venture, name='api_start_venture'),
+    path('api/game/maze/cache/stats/', views.maze_cache_stats, name='maze_cache_stats'),
 ]
\ No newline at end of file
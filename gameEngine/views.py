@@ -2,15 +2,25 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, Http404, HttpResponseNotModified, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.shortcuts import render, get_object_or_404
 from django.db import transaction
 from django.utils import timezone
 import json
+import asyncio
 from django.db import models
-from .models import PlayerProfile, Venture, PlayerVenture, Activity, PlayerBadge, Badge, VentureParticipation, NFTBadge, MazeSession, HederaTransaction
+from .models import PlayerProfile, Venture, PlayerVenture, Activity, PlayerBadge, Badge, VentureParticipation, NFTBadge, MazeSession, HederaTransaction, VentureHeatmap, VentureJoinError, session_start_position
+from .maze.grid import DIRECTIONS
+from .maze.cache import chunk_cache, layout_cache
+from .maze.layout import CHUNK_SIZE, ENCODINGS
+from .maze.leaderboard import leaderboards
+from .maze.heatmap import render_png as render_heatmap_png
+from .maze.minimap import minimap_png, minimap_scale, minimap_with_player
+from .maze.spectator import Viewer, spectators
+from .maze.store import session_store
 from web3.models import UserWallet
 from hiero_sdk_python import (
     AccountId,
@@ -18,7 +28,6 @@ from hiero_sdk_python import (
 import logging
 from hiero.utils import create_new_account
 from hiero.ft import associate_token
-import random
 logger = logging.getLogger(__name__)
 
 def assign_user_wallet(name):
@@ -497,6 +506,7 @@ def api_ventures(request):
                 'created_at': venture.created_at.isoformat(),
                 'maze_complexity': venture.maze_complexity,
                 'maze_time_limit': venture.maze_time_limit,
+                'time_remaining': venture.time_remaining,
                 'required_patterns': venture.required_patterns
             })
         
@@ -512,151 +522,6 @@ def api_ventures(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
-@login_required
-def api_join_venture(request, venture_id):
-    """Join a venture"""
-    try:
-        # Get the venture - use status filter instead of is_active
-        venture = get_object_or_404(Venture, id=venture_id, status='active')
-        
-        # Get player profile
-        player_profile = get_object_or_404(PlayerProfile, user=request.user)
-        
-        # Check if player already joined
-        if VentureParticipation.objects.filter(player=player_profile, venture=venture).exists():
-            return JsonResponse({
-                'success': False,
-                'error': f'You have already joined {venture.name}'
-            }, status=400)
-        
-        # Check if venture is full
-        if venture.current_participants >= venture.max_participants:
-            return JsonResponse({
-                'success': False,
-                'error': f'{venture.name} is full'
-            }, status=400)
-        
-        # Check if player has enough tickets
-        if player_profile.tickets < venture.entry_ticket_cost:
-            return JsonResponse({
-                'success': False,
-                'error': f'Not enough tickets. Required: {venture.entry_ticket_cost}, You have: {player_profile.tickets}'
-            }, status=400)
-        
-        # Check level requirement
-        if player_profile.level < venture.min_level_required:
-            return JsonResponse({
-                'success': False,
-                'error': f'Level {venture.min_level_required} required to join this venture (Current: {player_profile.level})'
-            }, status=400)
-        
-        # Check if venture is joinable (using the property from your model)
-        if not venture.is_joinable:
-            return JsonResponse({
-                'success': False,
-                'error': f'{venture.name} is not currently accepting new participants'
-            }, status=400)
-        
-        # All checks passed - process the join
-        
-        # 1. Deduct tickets from player
-        player_profile.tickets -= venture.entry_ticket_cost
-        
-        # 2. Add XP for joining venture
-        player_profile.add_xp(10)
-        
-        # 3. Update venture participation stats
-        player_profile.total_ventures_joined += 1
-        player_profile.save()
-        
-        # 4. Create venture participation record
-        participation = VentureParticipation.objects.create(
-            player=player_profile,
-            venture=venture,
-            entry_tickets_used=venture.entry_ticket_cost,
-            equity_earned=0.0  # Will be calculated when venture completes
-        )
-        
-        # 5. Create activity
-        Activity.objects.create(
-            player=player_profile,
-            activity_type='venture_join',
-            icon='⚔️',
-            description=f'Joined venture: {venture.name}',
-            venture=venture
-        )
-        
-        # 6. Calculate equity share for this player
-        # Each participant gets equal share of participant_equity
-        equity_share = venture.participant_equity / venture.max_participants
-        
-        # 7. Create PlayerVenture relationship for equity tracking
-        from .models import PlayerVenture
-        player_venture = PlayerVenture.objects.create(
-            player=player_profile,
-            venture=venture,
-            equity_share=equity_share,
-            initial_investment=venture.entry_ticket_cost * 100,  # Convert to currency value
-            current_value=venture.entry_ticket_cost * 100  # Initial value same as investment
-        )
-        
-        # 8. Submit HCS message (if HCS is configured)
-        try:
-            from hiero.hcs import submit_venture_update
-            submit_venture_update(
-                venture_name=venture.name,
-                topic_id=venture.hcs_topic_id,
-                update_type="player_joined",
-                data={
-                    "player_id": player_profile.id,
-                    "player_username": player_profile.user.username,
-                    "equity_earned": equity_share,
-                    "tickets_spent": venture.entry_ticket_cost,
-                    "current_participants": venture.current_participants + 1,
-                    "available_slots": venture.available_slots - 1
-                }
-            )
-        except Exception as hcs_error:
-            print(f"HCS message failed: {hcs_error}")
-            # Continue even if HCS fails
-        
-        # 9. Check if venture should start automatically
-        venture.check_and_start()
-        
-        return JsonResponse({
-            'success': True,
-            'message': f'Successfully joined {venture.name}!',
-            'equity_share': equity_share,
-            'tickets_remaining': player_profile.tickets,
-            'xp_gained': 10,
-            'venture': {
-                'id': venture.id,
-                'name': venture.name,
-                'current_participants': venture.current_participants + 1,
-                'available_slots': venture.available_slots - 1
-            }
-        })
-        
-    except Venture.DoesNotExist:
-        return JsonResponse({
-            'success': False,
-            'error': 'Venture not found or not active'
-        }, status=404)
-    except PlayerProfile.DoesNotExist:
-        return JsonResponse({
-            'success': False,
-            'error': 'Player profile not found'
-        }, status=404)
-    except Exception as e:
-        import traceback
-        print(f"Error joining venture: {str(e)}")
-        print(traceback.format_exc())
-        return JsonResponse({
-            'success': False,
-            'error': f'Failed to join venture: {str(e)}'
-        }, status=500)
-@csrf_exempt
-@require_http_methods(["POST"])
 def api_buy_tickets(request):
     """Purchase tickets"""
     if not request.user.is_authenticated:
@@ -846,9 +711,16 @@ def get_active_venture_games(request):
             status__in=['active', 'running']
         ).order_by('-created_at')
         
+        joined_ids = set(
+            VentureParticipation.objects.filter(
+                player=player,
+                venture__status__in=['active', 'running']
+            ).values_list('venture_id', flat=True)
+        )
+        
         ventures_data = []
         for venture in active_ventures:
-            has_joined = venture.participants.filter(player=player).exists()
+            has_joined = venture.id in joined_ids
             
             venture_data = {
                 'id': venture.id,
@@ -864,6 +736,7 @@ def get_active_venture_games(request):
                 'ceo_equity': venture.ceo_equity,
                 'participant_equity': venture.participant_equity,
                 'time_limit': venture.maze_time_limit,
+                'time_remaining': venture.time_remaining,
                 'required_patterns': venture.required_patterns,
                 'hcs_topic_id': venture.hcs_topic_id,
                 'is_joinable': venture.is_joinable,
@@ -886,7 +759,7 @@ def get_active_venture_games(request):
 @require_http_methods(["POST"])
 @login_required
 def api_join_venture(request, venture_id):
-    """Join a venture"""
+    """Join a venture; tickets and the slot are claimed atomically by Venture.join"""
     try:
         # Get the venture - use status filter instead of is_active
         venture = get_object_or_404(Venture, id=venture_id, status='active')
@@ -894,82 +767,31 @@ def api_join_venture(request, venture_id):
         # Get player profile
         player_profile = get_object_or_404(PlayerProfile, user=request.user)
         
-        # Check if player already joined
-        if VentureParticipation.objects.filter(player=player_profile, venture=venture).exists():
-            return JsonResponse({
-                'success': False,
-                'error': f'You have already joined {venture.name}'
-            }, status=400)
-        
-        # Check if venture is full
+        # Cheap pre-checks; Venture.join re-checks everything under conditional updates
         if venture.current_participants >= venture.max_participants:
             return JsonResponse({
                 'success': False,
                 'error': f'{venture.name} is full'
             }, status=400)
         
-        # Check if player has enough tickets
-        if player_profile.tickets < venture.entry_ticket_cost:
-            return JsonResponse({
-                'success': False,
-                'error': f'Not enough tickets. Required: {venture.entry_ticket_cost}, You have: {player_profile.tickets}'
-            }, status=400)
-        
-        # Check level requirement
-        if player_profile.level < venture.min_level_required:
+        if not venture.is_joinable:
             return JsonResponse({
                 'success': False,
-                'error': f'Level {venture.min_level_required} required to join this venture (Current: {player_profile.level})'
+                'error': f'{venture.name} is not currently accepting new participants'
             }, status=400)
         
-        # Check if venture is joinable (using the property from your model)
-        if not venture.is_joinable:
+        try:
+            venture.join(player_profile)
+        except VentureJoinError as e:
             return JsonResponse({
                 'success': False,
-                'error': f'{venture.name} is not currently accepting new participants'
+                'error': str(e)
             }, status=400)
         
-        # All checks passed - process the join
-        
-        # 1. Deduct tickets from player
-        player_profile.tickets -= venture.entry_ticket_cost
-        
-        # 2. Add XP for joining venture
-        player_profile.add_xp(10)
-        
-        # 3. Update venture participation stats
-        player_profile.total_ventures_joined += 1
-        player_profile.save()
-        
-        # 4. Create venture participation record
-        participation = VentureParticipation.objects.create(
-            player=player_profile,
-            venture=venture,
-            entry_tickets_used=venture.entry_ticket_cost,
-            equity_earned=0.0  # Will be calculated when venture completes
-        )
-        
-        # 5. Create PlayerVenture relationship for equity tracking
-        from .models import PlayerVenture
         equity_share = venture.participant_equity / venture.max_participants
-        player_venture = PlayerVenture.objects.create(
-            player=player_profile,
-            venture=venture,
-            equity_share=equity_share,
-            initial_investment=venture.entry_ticket_cost * 100,
-            current_value=venture.entry_ticket_cost * 100
-        )
-        
-        # 6. Create activity
-        Activity.objects.create(
-            player=player_profile,
-            activity_type='venture_join',
-            icon='⚔️',
-            description=f'Joined venture: {venture.name}',
-            venture=venture
-        )
+        player_profile.refresh_from_db(fields=['tickets'])
         
-        # 7. Submit HCS message
+        # Submit HCS message
         try:
             from hiero.hcs import submit_venture_update
             submit_venture_update(
@@ -988,7 +810,7 @@ def api_join_venture(request, venture_id):
         except Exception as hcs_error:
             print(f"HCS message failed: {hcs_error}")
         
-        # 8. ✅ REMOVED: Don't auto-start the venture
+        # ✅ REMOVED: Don't auto-start the venture
         # venture.check_and_start()  # COMMENT THIS LINE OUT
         
         return JsonResponse({
@@ -1022,11 +844,39 @@ def api_join_venture(request, venture_id):
 
 @login_required
 def get_venture_maze(request, venture_id):
-    """Get or create maze session for a venture game"""
+    """
+    Get or create maze session for a venture game.
+    
+    Optional query parameters keep the layout payload small:
+    ``encoding`` (bitmap or rle), ``viewport`` (only send cells within that
+    many steps of the player) and ``layoutEtag`` (the client already caches
+    this layout, so it is omitted). The layout's etag is also sent as the
+    ETag header, like get_maze_chunk, but the session state in the body
+    changes on every move, so responses are never served as 304.
+    """
     try:
         venture = get_object_or_404(Venture, id=venture_id)
         player = request.user.playerprofile
         
+        encoding = request.GET.get('encoding', 'bitmap')
+        if encoding not in ENCODINGS:
+            return JsonResponse({
+                'success': False,
+                'error': f'encoding must be one of {", ".join(ENCODINGS)}'
+            }, status=400)
+        
+        viewport = request.GET.get('viewport')
+        if viewport is not None:
+            try:
+                viewport = int(viewport)
+            except ValueError:
+                viewport = -1
+            if viewport < 0:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'viewport must be a non-negative integer'
+                }, status=400)
+        
         if venture.status != 'running':
             return JsonResponse({
                 'success': False, 
@@ -1041,20 +891,36 @@ def get_venture_maze(request, venture_id):
             })
         
         # Get existing active session or create new one
+        maze_config = venture.generate_maze_configuration()
         session, created = MazeSession.objects.get_or_create(
             player=player,
             venture=venture,
             status='active',
             defaults={
-                'maze_configuration': venture.generate_maze_configuration(),
-                'current_position': {'x': 0, 'y': 0},
-                'discovered_patterns': []
+                'maze_configuration': maze_config,
+                'current_position': session_start_position(maze_config),
+                'deadline': venture.end_time
             }
         )
         
-        # Update player's current maze session
-        player.current_maze_session = session
-        player.save()
+        # Moves may not have been flushed yet; the hot copy is authoritative
+        session = session_store.peek(session.pk) or session
+        
+        # Update player's current maze session only when it changes
+        if player.current_maze_session_id != session.pk:
+            player.current_maze_session = session
+            player.save(update_fields=['current_maze_session'])
+        
+        layout = session.layout
+        if request.GET.get('layoutEtag') == layout.etag:
+            maze_layout = None  # Unchanged; the client keeps its cached copy
+        elif viewport is not None:
+            x, y = session.current_position['x'], session.current_position['y']
+            maze_layout = layout.to_dict(
+                encoding, region=(x - viewport, y - viewport, 2 * viewport + 1, 2 * viewport + 1)
+            )
+        else:
+            maze_layout = layout.to_dict(encoding)
         
         maze_data = {
             'sessionId': str(session.id),
@@ -1066,15 +932,21 @@ def get_venture_maze(request, venture_id):
             'movesMade': session.moves_made,
             'patternsFound': session.patterns_found,
             'patternsRequired': venture.required_patterns,
-            'mazeLayout': session.maze_configuration.get('layout', {}),
+            'mazeLayout': maze_layout,
+            'layoutEtag': layout.etag,
+            'chunkSize': CHUNK_SIZE,
+            'chunksPerSide': layout.chunks_per_side,
             'discoveredPatterns': session.discovered_patterns,
             'status': session.status
         }
         
-        return JsonResponse({
+        response = JsonResponse({
             'success': True, 
             'maze': maze_data
         })
+        response['ETag'] = f'"{layout.etag}"'
+        response['Cache-Control'] = 'private, no-cache'
+        return response
         
     except Exception as e:
         print(f"Error creating maze session: {e}")
@@ -1083,91 +955,292 @@ def get_venture_maze(request, venture_id):
             'error': str(e)
         })
 
+def get_hot_session(session_id, player):
+    """Fetch a player's maze session through the in-memory hot store"""
+    session = session_store.get(
+        session_id,
+        lambda: MazeSession.objects.select_related('venture', 'player__user').filter(id=session_id).first()
+    )
+    if session is None or session.player_id != player.id:
+        raise Http404('Maze session not found')
+    return session
+
+@login_required
+@require_http_methods(["GET"])
+def get_maze_chunk(request, session_id, cx, cy):
+    """
+    One CHUNK_SIZE square of a session's maze grid. Layouts never change, so
+    chunks are served with an ETag and cached by the client indefinitely.
+    """
+    try:
+        session = get_hot_session(session_id, request.user.playerprofile)
+        
+        encoding = request.GET.get('encoding', 'bitmap')
+        if encoding not in ENCODINGS:
+            return JsonResponse({
+                'success': False,
+                'error': f'encoding must be one of {", ".join(ENCODINGS)}'
+            }, status=400)
+        
+        layout = session.layout
+        etag = f'"{layout.etag}-{encoding}-{cx}-{cy}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            chunk = layout.chunk_dict(cx, cy, encoding)
+            if chunk is None:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Chunk is outside the maze'
+                }, status=404)
+            response = JsonResponse({
+                'success': True,
+                'layoutEtag': layout.etag,
+                'chunk': chunk
+            })
+        
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+        return response
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
+
+def started_venture_layout(venture):
+    """
+    Layout of a venture whose race has started, else None. Read-only paths
+    must not call ``maze_layout`` earlier: assigning a seed before
+    start_venture would stop it claiming a calibrated layout.
+    """
+    if venture.status not in ('running', 'completed') or not venture.maze_seed:
+        return None
+    return venture.maze_layout
+
+@login_required
+@require_http_methods(["GET"])
+def venture_minimap(request, venture_id):
+    """
+    PNG minimap of a started venture's maze. ``size`` bounds the image in
+    pixels (or ``scale`` sets pixels per cell) and ``player=1`` marks the
+    caller's position. The layout is fixed once the race starts, so the
+    base image is immutable.
+    """
+    venture = get_object_or_404(Venture, id=venture_id)
+    if venture.maze_mode != 'fixed':
+        return JsonResponse({
+            'success': False,
+            'error': 'Minimaps are only available for fixed mazes'
+        }, status=400)
+    
+    layout = started_venture_layout(venture)
+    if layout is None:
+        raise Http404('Venture maze has not started')
+    
+    try:
+        size = int(request.GET['size']) if 'size' in request.GET else None
+        scale = int(request.GET['scale']) if 'scale' in request.GET else None
+    except ValueError:
+        return JsonResponse({
+            'success': False,
+            'error': 'size and scale must be integers'
+        }, status=400)
+    
+    scale = minimap_scale(layout, size, scale)
+    
+    if request.GET.get('player') == '1':
+        session = MazeSession.objects.filter(
+            player=request.user.playerprofile,
+            venture=venture,
+            status='active'
+        ).first()
+        if session is not None:
+            session = session_store.peek(session.pk) or session
+            position = session.current_position
+            response = HttpResponse(
+                minimap_with_player(layout, scale, (position['x'], position['y'])),
+                content_type='image/png'
+            )
+            response['Cache-Control'] = 'private, no-cache'
+            return response
+    
+    etag = f'"{layout.etag}-{scale}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(minimap_png(layout, scale), content_type='image/png')
+    
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+# A websocket holding the session lease owns its state; HTTP moves would be overwritten
+LIVE_CHANNEL_ERROR = 'Maze session is being played over a live connection'
+
 @login_required
 @csrf_exempt
 @require_http_methods(["POST"])
 def make_maze_move(request, session_id):
     """Process a move in the maze"""
     try:
-        session = get_object_or_404(
-            MazeSession, 
-            id=session_id, 
-            player=request.user.playerprofile
-        )
-        
-        if session.status != 'active':
-            return JsonResponse({
-                'success': False, 
-                'error': 'Maze session is not active'
-            })
+        session = get_hot_session(session_id, request.user.playerprofile)
         
         data = json.loads(request.body)
         direction = data.get('direction')
         
-        if direction not in ['up', 'down', 'left', 'right']:
+        if direction not in DIRECTIONS:
             return JsonResponse({
                 'success': False, 
                 'error': 'Invalid direction'
             })
         
-        # Update session time
-        session.time_elapsed = min(
-            session.time_elapsed + 1, 
-            session.maze_configuration.get('time_limit', 3600)
-        )
+        with session_store.lock(session.pk):
+            if session.status != 'active':
+                return JsonResponse({
+                    'success': False, 
+                    'error': 'Maze session is not active'
+                })
+            if session.has_live_channel:
+                return JsonResponse({
+                    'success': False,
+                    'error': LIVE_CHANNEL_ERROR
+                }, status=409)
+            
+            changed = session.apply_move(direction)
+            if not changed:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Blocked by a wall' if session.is_active else 'Maze session is not active',
+                    'newPosition': session.current_position
+                })
+            
+            # Check if maze completed (reach end position with enough patterns)
+            if session.check_completion():
+                # Completions are written synchronously, not via the flusher;
+                # complete_session also runs the atomic CEO election
+                session.complete_session(success=True)
+                session_store.discard(session.pk)
+            else:
+                session_store.mark_dirty(session, changed)
         
-        # Process move (simplified - in production, implement proper maze logic)
-        session.moves_made += 1
-        
-        # Update position based on direction
-        current_x = session.current_position.get('x', 0)
-        current_y = session.current_position.get('y', 0)
-        
-        if direction == 'up':
-            session.current_position = {'x': current_x, 'y': current_y - 1}
-        elif direction == 'down':
-            session.current_position = {'x': current_x, 'y': current_y + 1}
-        elif direction == 'left':
-            session.current_position = {'x': current_x - 1, 'y': current_y}
-        elif direction == 'right':
-            session.current_position = {'x': current_x + 1, 'y': current_y}
-        
-        # Check for pattern discovery (simplified)
-        maze_layout = session.maze_configuration.get('layout', {})
-        if random.random() > 0.8:  # 20% chance to find pattern
-            session.patterns_found = min(
-                session.patterns_found + 1, 
-                session.maze_configuration.get('required_patterns', 5)
-            )
-            session.discovered_patterns.append({
-                'pattern_id': len(session.discovered_patterns) + 1,
-                'type': f'pattern_{random.randint(1, 5)}',
-                'discovered_at': timezone.now().isoformat()
-            })
+        return JsonResponse({
+            'success': True,
+            'newPosition': session.current_position,
+            'movesMade': session.moves_made,
+            'patternsFound': session.patterns_found,
+            'timeRemaining': session.time_remaining,
+            'completed': session.status == 'completed'
+        })
         
-        # Check if maze completed (simplified - reach end position)
-        end_pos = maze_layout.get('end', {'x': 9, 'y': 9})
-        patterns_required = session.maze_configuration.get('required_patterns', 5)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
+
+# Limits for batched move submission
+MAX_MOVES_PER_BATCH = 500
+MOVE_CLOCK_SKEW_MS = 5000
+
+def validate_move_batch(session, moves):
+    """
+    Apply an ordered batch of moves to the session in memory.
+    
+    Returns (applied, first_rejected, reason, changed_fields). Processing stops at the
+    first rejected move because every later move depends on its position.
+    Moves whose sequence number was already applied are skipped so a client
+    can safely resend a batch after a dropped response.
+    """
+    now_ms = int(timezone.now().timestamp() * 1000)
+    started_ms = int(session.started_at.timestamp() * 1000) - MOVE_CLOCK_SKEW_MS
+    last_ts = started_ms
+    applied = 0
+    changed = {'last_move_seq'}
+    
+    for index, move in enumerate(moves):
+        if not isinstance(move, dict):
+            return applied, index, 'Malformed move', changed
+        
+        seq = move.get('seq')
+        ts = move.get('ts')
+        direction = move.get('direction')
+        
+        if not isinstance(seq, int) or seq < 1:
+            return applied, index, 'Invalid sequence number', changed
+        if seq <= session.last_move_seq:
+            continue  # Already applied in an earlier batch
+        if not isinstance(ts, (int, float)) or ts < last_ts or ts > now_ms + MOVE_CLOCK_SKEW_MS:
+            return applied, index, 'Invalid timestamp', changed
+        if direction not in DIRECTIONS:
+            return applied, index, 'Invalid direction', changed
+        move_changed = session.apply_move(direction)
+        if not move_changed:
+            reason = 'Blocked by a wall' if session.is_active else 'Maze session is not active'
+            return applied, index, reason, changed
+        
+        changed.update(move_changed)
+        session.last_move_seq = seq
+        last_ts = ts
+        applied += 1
+        
+        if session.check_completion():
+            if index + 1 < len(moves):
+                return applied, index + 1, 'Maze already completed', changed
+            break
+    
+    return applied, None, None, changed
+
+@login_required
+@csrf_exempt
+@require_http_methods(["POST"])
+def make_maze_moves(request, session_id):
+    """Process an ordered batch of maze moves and persist the result once"""
+    try:
+        session = get_hot_session(session_id, request.user.playerprofile)
+        
+        data = json.loads(request.body)
+        moves = data.get('moves')
+        
+        if not isinstance(moves, list) or not moves:
+            return JsonResponse({
+                'success': False,
+                'error': 'moves must be a non-empty list'
+            }, status=400)
+        
+        if len(moves) > MAX_MOVES_PER_BATCH:
+            return JsonResponse({
+                'success': False,
+                'error': f'Cannot submit more than {MAX_MOVES_PER_BATCH} moves at once'
+            }, status=400)
         
-        if (session.current_position == end_pos and 
-            session.patterns_found >= patterns_required):
-            session.complete_session(success=True)
+        with session_store.lock(session.pk):
+            if session.status != 'active':
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Maze session is not active'
+                })
+            if session.has_live_channel:
+                return JsonResponse({
+                    'success': False,
+                    'error': LIVE_CHANNEL_ERROR
+                }, status=409)
             
-            # Check if this player is the first to complete
-            existing_winners = MazeSession.objects.filter(
-                venture=session.venture,
-                status='completed',
-                completed_at__lt=session.completed_at
-            ).exists()
+            applied, first_rejected, reason, changed = validate_move_batch(session, moves)
             
-            if not existing_winners:
-                # This player is the first to complete - they become CEO!
-                session.venture.complete_venture(session.player)
-        
-        session.save()
+            if applied and session.check_completion():
+                session.complete_session(success=True)
+                session_store.discard(session.pk)
+            elif applied:
+                session_store.mark_dirty(session, changed)
         
         return JsonResponse({
             'success': True,
+            'applied': applied,
+            'firstRejected': first_rejected,
+            'rejectReason': reason,
+            'lastSeq': session.last_move_seq,
             'newPosition': session.current_position,
             'movesMade': session.moves_made,
             'patternsFound': session.patterns_found,
@@ -1175,49 +1248,180 @@ def make_maze_move(request, session_id):
             'completed': session.status == 'completed'
         })
         
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'error': 'Invalid JSON data'
+        }, status=400)
     except Exception as e:
         return JsonResponse({
             'success': False,
             'error': str(e)
         })
 
+# Hints a player may request per maze session
+MAX_HINTS_PER_SESSION = 3
+
+@login_required
+@csrf_exempt
+@require_http_methods(["POST"])
+def get_maze_hint(request, session_id):
+    """Reveal the next move on the shortest path to the exit"""
+    try:
+        session = get_hot_session(session_id, request.user.playerprofile)
+        
+        with session_store.lock(session.pk):
+            if session.status != 'active':
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Maze session is not active'
+                })
+            
+            if session.used_hints >= MAX_HINTS_PER_SESSION:
+                return JsonResponse({
+                    'success': False,
+                    'error': f'No hints left ({MAX_HINTS_PER_SESSION} per maze)'
+                })
+            
+            if session.is_infinite:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Hints are not available in infinite mazes'
+                })
+            
+            position = session.current_position
+            direction = session.layout.optimal_next_step(position['x'], position['y'])
+            if direction is None:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'No path to the exit from here'
+                })
+            
+            session.used_hints += 1
+            session_store.mark_dirty(session, ['used_hints'])
+        
+        return JsonResponse({
+            'success': True,
+            'direction': direction,
+            'distanceToExit': session.distance_to_exit,
+            'hintsUsed': session.used_hints,
+            'hintsRemaining': MAX_HINTS_PER_SESSION - session.used_hints
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
+
+@login_required
+@require_http_methods(["GET"])
+def get_maze_replay(request, session_id):
+    """
+    Move log of a maze session plus the replayed state after ``?step=N`` moves.
+    Players can replay their own runs; everyone can replay finished runs once
+    the venture is over.
+    """
+    try:
+        session = get_object_or_404(MazeSession.objects.select_related('venture', 'player'), id=session_id)
+        session = session_store.peek(session.pk) or session
+        
+        is_owner = session.player.user_id == request.user.id
+        is_public = session.status == 'completed' and session.venture.status == 'completed'
+        if not (is_owner or is_public or request.user.is_staff):
+            return JsonResponse({
+                'success': False,
+                'error': 'This run cannot be replayed yet'
+            }, status=403)
+        
+        step = request.GET.get('step')
+        try:
+            step = int(step) if step is not None else None
+        except ValueError:
+            return JsonResponse({
+                'success': False,
+                'error': 'step must be an integer'
+            }, status=400)
+        
+        history = session.move_history
+        state = session.replay(step)
+        final = state if step is None else session.replay()
+        consistent = (
+            final.invalid_at is None and
+            history.count == session.moves_made and
+            {'x': final.position[0], 'y': final.position[1]} == session.current_position and
+            final.discovered_mask == session.discovered_mask and
+            final.patterns_found == session.patterns_found
+        )
+        
+        return JsonResponse({
+            'success': True,
+            'sessionId': str(session.id),
+            'player': session.player.user.username,
+            'status': session.status,
+            'moveCount': history.count,
+            'path': history.to_path(),
+            'timestamps': list(history.timestamps),
+            'state': state.to_dict(),
+            'consistent': consistent
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
+
+# Largest top-N the leaderboard endpoint will return
+MAX_LEADERBOARD_SIZE = 100
+
 @login_required
 def venture_game_leaderboard(request, venture_id):
-    """Get leaderboard for a venture game"""
+    """Get leaderboard for a venture game from the in-memory race board"""
     try:
         venture = get_object_or_404(Venture, id=venture_id)
         player = request.user.playerprofile
         
-        # Get completed sessions ordered by completion time
-        completed_sessions = MazeSession.objects.filter(
-            venture=venture,
-            status='completed'
-        ).select_related('player').order_by('completed_at')[:10]
+        try:
+            limit = min(max(int(request.GET.get('limit', 10)), 1), MAX_LEADERBOARD_SIZE)
+        except ValueError:
+            limit = 10
+        
+        board = leaderboards.get(venture.id)
         
         leaderboard = []
-        for session in completed_sessions:
-            is_ceo = (session.player.is_ceo and 
-                     session.player.ceo_of_venture == venture)
-            
+        for entry in board.top(limit):
             leaderboard.append({
-                'player': session.player.user.username,
-                'completionTime': session.time_elapsed,
-                'movesMade': session.moves_made,
-                'patternsFound': session.patterns_found,
-                'isCEO': is_ceo
+                'player': entry.username,
+                'completionTime': entry.time_elapsed,
+                'movesMade': entry.moves_made,
+                'patternsFound': entry.patterns_found,
+                'isCEO': entry.player_id == venture.winning_player_id
             })
         
+        my_rank = board.rank_of(player.id)
+        my_entry = None
+        if my_rank is not None:
+            entry = board.entry_of(player.id)
+            my_entry = {
+                'rank': my_rank,
+                'completionTime': entry.time_elapsed,
+                'movesMade': entry.moves_made,
+                'patternsFound': entry.patterns_found
+            }
+        
         # Add current player if they're active but not completed
         current_session = MazeSession.objects.filter(
             venture=venture,
             player=player,
             status='active'
-        ).first()
+        ).only('id', 'moves_made', 'patterns_found').first()
+        if current_session:
+            current_session = session_store.peek(current_session.pk) or current_session
         
-        if current_session and not any(entry['player'] == player.user.username 
-                                     for entry in leaderboard):
+        if current_session and my_rank is None:
             leaderboard.append({
-                'player': player.user.username + ' (You)',
+                'player': request.user.username + ' (You)',
                 'completionTime': 'In Progress',
                 'movesMade': current_session.moves_made,
                 'patternsFound': current_session.patterns_found,
@@ -1226,7 +1430,10 @@ def venture_game_leaderboard(request, venture_id):
         
         return JsonResponse({
             'success': True,
-            'leaderboard': leaderboard
+            'leaderboard': leaderboard,
+            'totalFinishers': len(board),
+            'myRank': my_rank,
+            'myEntry': my_entry
         })
         
     except Exception as e:
@@ -1235,6 +1442,200 @@ def venture_game_leaderboard(request, venture_id):
             'error': str(e)
         })
 
+@login_required
+def maze_cache_stats(request):
+    """Metrics for the in-process maze layout/chunk caches and hot session store (staff only)"""
+    if not request.user.is_staff:
+        return JsonResponse({
+            'success': False,
+            'error': 'Staff access required'
+        }, status=403)
+    
+    return JsonResponse({
+        'success': True,
+        'layoutCache': layout_cache.stats(),
+        'chunkCache': chunk_cache.stats(),
+        'sessionStore': session_store.stats(),
+        'spectators': spectators.stats()
+    })
+
+SPECTATOR_KEEPALIVE = 15  # Seconds between SSE comments when no snapshot arrives
+
+def spectator_event(snapshot):
+    return f'id: {snapshot.tick}\nevent: snapshot\ndata: {snapshot.payload}\n\n'
+
+def spectator_events(venture_id):
+    """SSE stream for WSGI workers; blocks a worker thread per viewer"""
+    viewer = Viewer()
+    spectators.subscribe(venture_id, viewer)
+    try:
+        while True:
+            snapshot = viewer.wait(SPECTATOR_KEEPALIVE)
+            if snapshot is None:
+                yield ': keepalive\n\n'
+                continue
+            yield spectator_event(snapshot)
+            if snapshot.final:
+                return
+    finally:
+        spectators.unsubscribe(venture_id, viewer)
+
+async def spectator_events_async(venture_id):
+    """SSE stream for ASGI; viewers wait on the event loop instead of threads"""
+    viewer = Viewer(asyncio.get_running_loop())
+    spectators.subscribe(venture_id, viewer)
+    try:
+        while True:
+            try:
+                snapshot = await asyncio.wait_for(viewer.next(), SPECTATOR_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield spectator_event(snapshot)
+            if snapshot.final:
+                return
+    finally:
+        spectators.unsubscribe(venture_id, viewer)
+
+@login_required
+@require_http_methods(["GET"])
+def venture_spectate(request, venture_id):
+    """
+    Server-sent events feed of a running venture race. Every viewer gets
+    the same per-tick snapshot; see ``maze.spectator`` for the format.
+    """
+    venture = get_object_or_404(Venture, id=venture_id)
+    if venture.status != 'running':
+        return JsonResponse({
+            'success': False,
+            'error': 'Venture maze is not currently running'
+        }, status=400)
+    
+    if not venture.can_spectate(request.user):
+        return JsonResponse({
+            'success': False,
+            'error': 'You cannot spectate a race you are running in'
+        }, status=403)
+    
+    if isinstance(request, ASGIRequest):
+        events = spectator_events_async(venture.id)
+    else:
+        events = spectator_events(venture.id)
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def venture_heatmap_counters(venture):
+    """Layout plus (visits, dwell_ms) counters for a started fixed-layout venture, else None"""
+    layout = started_venture_layout(venture)
+    if layout is None:
+        return None
+    heatmap = VentureHeatmap.objects.filter(venture=venture).first()
+    if heatmap is None:
+        heatmap = VentureHeatmap(venture=venture, width=layout.grid.width, height=layout.grid.height)
+    visits, dwell_ms = heatmap.counters()
+    return layout, visits, dwell_ms
+
+@login_required
+@require_http_methods(["GET"])
+def venture_heatmap(request, venture_id):
+    """Cell visit and dwell-time heatmap of a venture's maze (staff only)"""
+    if not request.user.is_staff:
+        return JsonResponse({
+            'success': False,
+            'error': 'Staff access required'
+        }, status=403)
+    
+    try:
+        venture = get_object_or_404(Venture, id=venture_id)
+        if venture.maze_mode != 'fixed':
+            return JsonResponse({
+                'success': False,
+                'error': 'Heatmaps are only recorded for fixed mazes'
+            }, status=400)
+        
+        counters = venture_heatmap_counters(venture)
+        if counters is None:
+            return JsonResponse({
+                'success': False,
+                'error': 'Venture maze has not started'
+            }, status=404)
+        
+        layout, visits, dwell_ms = counters
+        grid = layout.grid
+        width = grid.width
+        
+        def cell(index):
+            return {
+                'x': index % width,
+                'y': index // width,
+                'visits': visits[index],
+                'dwellMs': dwell_ms[index]
+            }
+        
+        dead_ends = [
+            y * width + x for x, y in grid.open_cells()
+            if sum(1 for _ in grid.neighbors(x, y)) == 1
+        ]
+        
+        return JsonResponse({
+            'success': True,
+            'width': width,
+            'height': grid.height,
+            'totalVisits': sum(visits),
+            'visits': [list(visits[row * width:(row + 1) * width]) for row in range(grid.height)],
+            'dwellMs': [list(dwell_ms[row * width:(row + 1) * width]) for row in range(grid.height)],
+            'hotspots': [cell(i) for i in sorted(range(len(visits)), key=visits.__getitem__, reverse=True)[:10] if visits[i]],
+            'deadEndDwellMs': sum(dwell_ms[i] for i in dead_ends),
+            'deadEnds': [cell(i) for i in sorted(dead_ends, key=dwell_ms.__getitem__, reverse=True)[:10]]
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
+
+@login_required
+@require_http_methods(["GET"])
+def venture_heatmap_png(request, venture_id):
+    """Heatmap rendered as a PNG; ?metric=visits|dwell (staff only)"""
+    if not request.user.is_staff:
+        return JsonResponse({
+            'success': False,
+            'error': 'Staff access required'
+        }, status=403)
+    
+    venture = get_object_or_404(Venture, id=venture_id)
+    if venture.maze_mode != 'fixed':
+        return JsonResponse({
+            'success': False,
+            'error': 'Heatmaps are only recorded for fixed mazes'
+        }, status=400)
+    
+    metric = request.GET.get('metric', 'visits')
+    if metric not in ('visits', 'dwell'):
+        return JsonResponse({
+            'success': False,
+            'error': 'metric must be visits or dwell'
+        }, status=400)
+    
+    try:
+        scale = min(max(int(request.GET.get('scale', 12)), 1), 32)
+    except ValueError:
+        scale = 12
+    
+    counters = venture_heatmap_counters(venture)
+    if counters is None:
+        raise Http404('Venture maze has not started')
+    
+    layout, visits, dwell_ms = counters
+    png = render_heatmap_png(layout.grid, visits if metric == 'visits' else dwell_ms, scale)
+    response = HttpResponse(png, content_type='image/png')
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
 # Utility function to start venture games (can be called via admin or cron)
 def start_venture_game(venture_id):
     """Start a venture game (maze competition)"""